@@ -0,0 +1,406 @@
+# encoding: utf-8
+
+"""
+httprunner.aio
+~~~~~~~~~~~~~~
+
+Optional asyncio transport, drive many testcases concurrently in one process.
+This module requires Python 3.5.3+ and aiohttp, install with:
+
+    pip install httprunner[async]
+
+Examples:
+    >>> import asyncio
+    >>> from httprunner.aio import AsyncRunner
+
+    >>> async def run_testcase(parsed_testcase):
+            test_runner = AsyncRunner(parsed_testcase["config"])
+            try:
+                for test_dict in parsed_testcase["teststeps"]:
+                    await test_runner.run_test(test_dict)
+            finally:
+                await test_runner.close()
+
+    >>> testcases = parser.parse_tests(tests_mapping)
+    >>> loop = asyncio.get_event_loop()
+    >>> loop.run_until_complete(
+            asyncio.gather(*[run_testcase(testcase) for testcase in testcases])
+        )
+
+"""
+
+import asyncio
+import datetime
+import json
+import socket
+import ssl
+import time
+
+import aiohttp
+import requests
+from aiohttp.abc import AbstractResolver
+from httprunner import exceptions, logger
+from httprunner.client import RECORD_LEVELS, ApiResponse, HttpSession, PreparedJSON
+from httprunner.connection import DNSResolver
+from httprunner.runner import Runner
+from requests import PreparedRequest, Request, Response
+from requests.compat import urlencode, urlparse
+from requests.cookies import cookiejar_from_dict
+from requests.exceptions import ConnectionError, InvalidURL, Timeout
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+class AsyncHttpSession(HttpSession):
+    """ asyncio version of HttpSession, requests are sent with aiohttp.
+
+        Responses are converted to requests.Response, thus meta_data recording,
+        ResponseObject extraction and ApiResponse error semantics are kept the same
+        as HttpSession. Cookies are kept in the aiohttp session of each instance.
+
+    Args:
+        record_level (str): request and response details recorded to meta_data,
+            one of RECORD_LEVELS, default is full.
+        keep_alive (bool): keep connections alive for reuse, default True.
+        dns_cache (bool/float): seconds to cache resolved addresses in aiohttp connector,
+            True for default TTL, see httprunner.connection.DNSResolver
+        hosts (dict): static mapping of hostname to address, e.g. {"api.example.com": "127.0.0.1"}
+
+    Raises:
+        exceptions.ParamsError: requests transport options are specified, which are
+            not supported by aiohttp, e.g. http2 and http_adapter.
+
+    """
+    def __init__(self, *args, **kwargs):
+        record_level = kwargs.pop("record_level", "full")
+        if record_level not in RECORD_LEVELS:
+            raise ValueError("record_level should be one of {}, given: {}".format(
+                RECORD_LEVELS, record_level))
+
+        keep_alive = kwargs.pop("keep_alive", True)
+        resolver = DNSResolver(kwargs.pop("dns_cache", None), kwargs.pop("hosts", None))
+        unsupported_options = [
+            option
+            for option in ["pool_connections", "pool_maxsize", "http2", "http_adapter"]
+            if kwargs.pop(option, None)
+        ]
+        if unsupported_options:
+            raise exceptions.ParamsError(
+                "{} not supported by AsyncHttpSession.".format(", ".join(unsupported_options)))
+
+        # requests transport adapters of HttpSession are not used by aiohttp
+        requests.Session.__init__(self, *args, **kwargs)
+        self.adapters.clear()
+        self.record_level = record_level
+        self.shared_adapter = None
+        self.keep_alive = keep_alive
+        self.resolver = resolver
+        self._aio_session = None
+        self.init_meta_data()
+
+    def _get_aio_session(self):
+        """ aiohttp.ClientSession should be created inside event loop.
+        """
+        if self._aio_session is None:
+            connector = aiohttp.TCPConnector(
+                resolver=HostsResolver(self.resolver.hosts) if self.resolver.hosts else None,
+                use_dns_cache=bool(self.resolver.ttl),
+                ttl_dns_cache=self.resolver.ttl or None,
+                force_close=not self.keep_alive
+            )
+            self._aio_session = aiohttp.ClientSession(
+                connector=connector,
+                # allow cookies for IP address hosts, e.g. 127.0.0.1
+                cookie_jar=aiohttp.CookieJar(unsafe=True)
+            )
+
+        return self._aio_session
+
+    async def close(self):
+        """ close underlying aiohttp session.
+        """
+        if self._aio_session is not None:
+            await self._aio_session.close()
+            self._aio_session = None
+
+        super(AsyncHttpSession, self).close()
+
+    async def request(self, method, url, name=None, **kwargs):
+        """ send request asynchronously, takes the same arguments as HttpSession.request
+            and returns requests.Response object.
+        """
+        self.init_meta_data()
+
+        # record test name
+        self.meta_data["name"] = name
+
+        # record original request info
+        self.meta_data["data"][0]["request"]["method"] = method
+        self.meta_data["data"][0]["request"]["url"] = url
+        kwargs.setdefault("timeout", 120)
+        self.meta_data["data"][0]["request"].update(kwargs)
+
+        start_timestamp = time.perf_counter()
+        response = await self._send_request_safe_mode(method, url, **kwargs)
+        response_time_ms = round((time.perf_counter() - start_timestamp) * 1000, 2)
+
+        self._record_response(response, response_time_ms)
+        return response
+
+    async def _send_request_safe_mode(self, method, url, **kwargs):
+        """ send request with aiohttp, and catch any exception that might occur due to
+            connection problems.
+        """
+        msg = "processed request:\n"
+        msg += "> {method} {url}\n".format(method=method, url=url)
+        msg += "> kwargs: {kwargs}".format(kwargs=kwargs)
+        logger.log_debug(msg)
+
+        aio_kwargs, request_body = _prepare_aio_kwargs(url, kwargs)
+        try:
+            start_timestamp = time.perf_counter()
+            async with self._get_aio_session().request(method, url, **aio_kwargs) as aio_resp:
+                elapsed = datetime.timedelta(seconds=time.perf_counter() - start_timestamp)
+                content = await aio_resp.read()
+                return _build_response(aio_resp, content, elapsed, request_body)
+
+        except aiohttp.InvalidURL as ex:
+            raise InvalidURL(ex)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            if isinstance(ex, asyncio.TimeoutError):
+                error = Timeout(ex)
+            else:
+                error = ConnectionError(ex)
+
+            resp = ApiResponse()
+            resp.error = error
+            resp.status_code = 0  # with this status_code, content returns None
+            resp.request = Request(method, url).prepare()
+            return resp
+
+
+class HostsResolver(AbstractResolver):
+    """ aiohttp resolver with static host overrides, the same as /etc/hosts.
+        Other hostnames are resolved by aiohttp default resolver.
+    """
+    def __init__(self, hosts):
+        """
+        Args:
+            hosts (dict): mapping of lower case hostname to address.
+
+        """
+        self.hosts = hosts
+        self._resolver = aiohttp.DefaultResolver()
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        address = self.hosts.get(host.lower().rstrip("."), host)
+        addresses = await self._resolver.resolve(address, port, family)
+        for address_info in addresses:
+            # original hostname is used for TLS server name indication and verification
+            address_info["hostname"] = host
+
+        return addresses
+
+    async def close(self):
+        await self._resolver.close()
+
+
+def _prepare_aio_kwargs(url, kwargs):
+    """ convert requests kwargs to aiohttp kwargs.
+
+    Returns:
+        tuple: (aiohttp kwargs, request body bytes to be recorded)
+
+    """
+    aio_kwargs = {
+        "params": kwargs.get("params"),
+        "headers": dict(kwargs.get("headers") or {}),
+        "cookies": kwargs.get("cookies"),
+        "allow_redirects": kwargs.get("allow_redirects", True)
+    }
+    lower_headers = {key.lower() for key in aio_kwargs["headers"]}
+    request_body = None
+
+    # body
+    json_data = kwargs.get("json")
+    data = kwargs.get("data")
+    files = kwargs.get("files")
+    if files:
+        form_data = aiohttp.FormData()
+        for field_name, field_value in (data or {}).items():
+            form_data.add_field(field_name, str(field_value))
+
+        for field_name, file_value in files.items():
+            if isinstance(file_value, (tuple, list)):
+                form_data.add_field(
+                    field_name,
+                    file_value[1],
+                    filename=file_value[0],
+                    content_type=file_value[2] if len(file_value) > 2 else None
+                )
+            else:
+                form_data.add_field(field_name, file_value)
+
+        aio_kwargs["data"] = form_data
+
+    elif json_data is not None and not data:
+        if isinstance(json_data, PreparedJSON):
+            request_body = json_data.serialized
+        else:
+            request_body = json.dumps(json_data).encode("utf-8")
+        if "content-type" not in lower_headers:
+            aio_kwargs["headers"]["Content-Type"] = "application/json"
+        aio_kwargs["data"] = request_body
+
+    elif isinstance(data, dict):
+        request_body = urlencode(data, doseq=True)
+        if "content-type" not in lower_headers:
+            aio_kwargs["headers"]["Content-Type"] = "application/x-www-form-urlencoded"
+        aio_kwargs["data"] = request_body
+
+    elif hasattr(data, "read"):
+        # file-like object, e.g. MultipartEncoder for uploading files
+        aio_kwargs["data"] = data.read()
+
+    elif data is not None:
+        request_body = data
+        aio_kwargs["data"] = data
+
+    # timeout: float or (connect timeout, read timeout) tuple
+    timeout = kwargs.get("timeout")
+    if isinstance(timeout, (tuple, list)):
+        aio_kwargs["timeout"] = aiohttp.ClientTimeout(
+            sock_connect=timeout[0],
+            sock_read=timeout[1]
+        )
+    elif timeout is not None:
+        aio_kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+
+    # auth
+    auth = kwargs.get("auth")
+    if isinstance(auth, (tuple, list)):
+        aio_kwargs["auth"] = aiohttp.BasicAuth(*auth)
+
+    # ssl: verify and cert
+    verify = kwargs.get("verify", True)
+    cert = kwargs.get("cert")
+    if verify is False:
+        aio_kwargs["ssl"] = False
+    elif isinstance(verify, str) or cert:
+        ssl_context = ssl.create_default_context(
+            cafile=verify if isinstance(verify, str) else None
+        )
+        if isinstance(cert, (tuple, list)):
+            ssl_context.load_cert_chain(*cert)
+        elif cert:
+            ssl_context.load_cert_chain(cert)
+        aio_kwargs["ssl"] = ssl_context
+
+    # proxies
+    proxies = kwargs.get("proxies")
+    if proxies:
+        scheme = urlparse(url).scheme
+        aio_kwargs["proxy"] = proxies.get(scheme) or proxies.get("all")
+
+    return aio_kwargs, request_body
+
+
+def _build_response(aio_resp, content, elapsed, request_body=None):
+    """ convert aiohttp.ClientResponse to requests.Response.
+
+    Args:
+        aio_resp (instance): aiohttp.ClientResponse instance
+        content (bytes): response body
+        elapsed (datetime.timedelta): time elapsed until response headers received
+        request_body (bytes/str): request body sent
+
+    """
+    request = PreparedRequest()
+    request.method = aio_resp.request_info.method
+    request.url = str(aio_resp.request_info.real_url)
+    request.headers = CaseInsensitiveDict(aio_resp.request_info.headers)
+    request.body = request_body
+
+    response = Response()
+    response.status_code = aio_resp.status
+    response.reason = aio_resp.reason
+    response.url = str(aio_resp.url)
+    response.headers = CaseInsensitiveDict()
+    for key in aio_resp.headers.keys():
+        # multiple headers with the same name are joined, same as requests
+        response.headers[key] = ", ".join(aio_resp.headers.getall(key))
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.cookies = cookiejar_from_dict({
+        key: morsel.value
+        for key, morsel in aio_resp.cookies.items()
+    })
+    response.elapsed = elapsed
+    response.request = request
+    response._content = content
+
+    # 30X redirection histories, content of redirection is not kept
+    response.history = [
+        _build_response(history_resp, b"", elapsed)
+        for history_resp in aio_resp.history
+    ]
+    return response
+
+
+class AsyncRunner(Runner):
+    """ asyncio version of Runner, teststeps are run with AsyncHttpSession.
+        Each AsyncRunner holds its own session, thus many testcases can be run
+        concurrently in one event loop.
+    """
+
+    def __init__(self, config, http_client_session=None):
+        super(AsyncRunner, self).__init__(
+            config,
+            http_client_session or AsyncHttpSession(
+                dns_cache=config.get("dns_cache"),
+                hosts=config.get("hosts")
+            )
+        )
+
+    async def close(self):
+        """ close http client session.
+        """
+        await self.http_client_session.close()
+
+    async def _run_test(self, test_dict):
+        """ run single teststep asynchronously.
+        """
+        test_dict, method, parsed_url, request_name, parsed_test_request = \
+            self._prepare_test(test_dict)
+
+        # request
+        resp = await self.http_client_session.request(
+            method,
+            parsed_url,
+            name=request_name,
+            **parsed_test_request
+        )
+        self._handle_response(test_dict, resp, method, parsed_url, parsed_test_request)
+
+    async def _run_testcase(self, testcase_dict):
+        """ run single testcase asynchronously, see Runner._run_testcase.
+        """
+        test_runner, tests = self._init_testcase(testcase_dict)
+
+        for test_dict in tests:
+            with self._testcase_step_context(test_runner, test_dict):
+                await test_runner.run_test(test_dict)
+
+        self._finish_testcase(test_runner)
+
+    async def run_test(self, test_dict):
+        """ run single teststep of testcase asynchronously, see Runner.run_test.
+        """
+        self.meta_datas = None
+        if "teststeps" in test_dict:
+            # nested testcase
+            self._prepare_nested_testcase(test_dict)
+            await self._run_testcase(test_dict)
+        else:
+            # api
+            with self._api_test_context(test_dict):
+                await self._run_test(test_dict)
@@ -1,16 +1,24 @@
 # encoding: utf-8
 
+import functools
+import multiprocessing
 import os
+import pickle
+import sys
 import unittest
+from multiprocessing.pool import ThreadPool
 
-from httprunner import (__version__, exceptions, loader, logger, parser,
-                        report, runner, utils, validator)
+from httprunner import (__version__, built_in, client, compat, exceptions,
+                        loader, logger, parser, report, runner, utils, validator)
 
 
 class HttpRunner(object):
 
     def __init__(self, failfast=False, save_tests=False, report_template=None, report_dir=None,
-        log_level="INFO", log_file=None):
+        log_level="INFO", log_file=None, workers=1, processes=1, cache=False,
+        record_level="full", pool_connections=None, pool_maxsize=None, keep_alive=True,
+        share_connections=False, http2=False, stream_report=False, lazy_report=False,
+        result_sinks=None, report_body_limit=report.DEFAULT_BODY_LIMIT, report_details="all"):
         """ initialize HttpRunner.
 
         Args:
@@ -20,15 +28,50 @@ class HttpRunner(object):
             report_dir (str): html report save directory.
             log_level (str): logging level.
             log_file (str): log file path.
+            workers (int): number of testcases to run concurrently, default 1 runs in sequence.
+                test files are also loaded with the same number of threads.
+            processes (int): number of worker processes to shard testcases across, default 1
+                runs all testcases in current process.
+            cache (bool): cache parsed testcases in PWD/.httprunner_cache, unchanged test
+                files will be loaded from cache without parsing.
+            record_level (str): request/response details recorded in report for passed
+                teststeps, none, summary or full. failed teststeps are always fully recorded.
+            pool_connections (int): number of host connection pools to cache, default 10.
+            pool_maxsize (int): max number of connections kept alive for each host, default
+                10, or number of workers if connections are shared.
+            keep_alive (bool): keep connections alive for reuse in the same testcase.
+            share_connections (bool): share connection pools across testcases, thus TCP/TLS
+                connections are reused between testcases. cookies are kept in each testcase.
+            http2 (bool): send requests with HTTP/2 capable transport, requires httpx,
+                install with `pip install httprunner[http2]`.
+            stream_report (bool): store testcase summaries on disk as testcases complete,
+                and render report from the store, thus memory usage is flat for long runs.
+                summary["details"] is report.ResultStore instead of list.
+            lazy_report (bool): render html report index page with aggregates only, records
+                of each testcase are saved in compressed chunks and loaded when expanded,
+                thus huge reports can be opened in browser. report_template is used as
+                index page template if specified.
+            result_sinks (list): report.ResultSink instances, e.g. report.JUnitXMLSink and
+                report.JSONLinesSink, fed with result of each test once completed. sinks are
+                not closed by HttpRunner, thus can be shared by multiple runs.
+            report_body_limit (int): max length of each request/response body in report and
+                summary, longer bodies are truncated, None for no limit.
+            report_details (str): request/response details in report, all or failures.
+                details of passed teststeps are reduced to url, method and status code if
+                failures, thus report of passing suites is generated quickly.
 
         """
         logger.setup_logger(log_level, log_file)
         logger.log_info("HttpRunner version: {}".format(__version__))
 
         self.exception_stage = "initialize HttpRunner()"
+        self.failfast = failfast
+        self.log_level = log_level
+        self.log_file = log_file
+        self.resultclass = functools.partial(report.HtmlTestResult, sinks=result_sinks)
         kwargs = {
             "failfast": failfast,
-            "resultclass": report.HtmlTestResult
+            "resultclass": self.resultclass
         }
         self.unittest_runner = unittest.TextTestRunner(**kwargs)
         self.test_loader = unittest.TestLoader()
@@ -36,6 +79,68 @@ class HttpRunner(object):
         self.report_template = report_template
         self.report_dir = report_dir
         self._summary = None
+        self.workers = _ensure_count("workers", workers)
+        self.processes = _ensure_count("processes", processes)
+        self.cache = cache
+        if record_level not in client.RECORD_LEVELS:
+            raise exceptions.ParamsError("record_level should be one of {}, given: {}".format(
+                client.RECORD_LEVELS, record_level))
+        self.record_level = record_level
+        self.pool_connections = None if pool_connections is None \
+            else _ensure_count("pool_connections", pool_connections)
+        self.pool_maxsize = None if pool_maxsize is None \
+            else _ensure_count("pool_maxsize", pool_maxsize)
+        self.keep_alive = keep_alive
+        self.share_connections = share_connections
+        self.http2 = http2
+        self.stream_report = stream_report
+        self.lazy_report = lazy_report
+        self.result_sinks = result_sinks or []
+        if report_details not in report.REPORT_DETAILS:
+            raise exceptions.ParamsError("report_details should be one of {}, given: {}".format(
+                report.REPORT_DETAILS, report_details))
+        self.report_details = report_details
+        self.report_body_limit = None if report_body_limit is None \
+            else _ensure_count("report_body_limit", report_body_limit)
+        # shared adapters keyed by dns options of testcase config
+        self._http_adapters = {}
+
+    def _create_http_session(self, config=None):
+        """ create HttpSession for each testcase, with connection pool options and
+            dns options of testcase config.
+        """
+        config = config or {}
+        dns_cache = config.get("dns_cache")
+        hosts = config.get("hosts")
+        kwargs = {
+            "record_level": self.record_level,
+            "keep_alive": self.keep_alive
+        }
+        if not self.share_connections:
+            kwargs["pool_connections"] = self.pool_connections
+            kwargs["pool_maxsize"] = self.pool_maxsize
+            kwargs["http2"] = self.http2
+            kwargs["dns_cache"] = dns_cache
+            kwargs["hosts"] = hosts
+            return client.HttpSession(**kwargs)
+
+        # connections to overridden hosts should not be reused by other testcases
+        adapter_key = None
+        if dns_cache or hosts:
+            adapter_key = (dns_cache, tuple(sorted((hosts or {}).items())))
+
+        if adapter_key not in self._http_adapters:
+            # testcases run in workers threads share the connection pools
+            self._http_adapters[adapter_key] = client.create_http_adapter(
+                self.pool_connections,
+                self.pool_maxsize or max(self.workers, client.DEFAULT_POOLSIZE),
+                self.http2,
+                dns_cache,
+                hosts
+            )
+
+        kwargs["http_adapter"] = self._http_adapters[adapter_key]
+        return client.HttpSession(**kwargs)
 
     def _add_tests(self, testcases):
         """ initialize testcase with Runner() and add to test suite.
@@ -81,8 +186,9 @@ class HttpRunner(object):
         test_suite = unittest.TestSuite()
         for testcase in testcases:
             config = testcase.get("config", {})
-            test_runner = runner.Runner(config)
-            TestSequense = type('TestSequense', (unittest.TestCase,), {})
+            test_runner = runner.Runner(config, self._create_http_session(config))
+            # config is used by HtmlTestResult to get testcase name
+            TestSequense = type('TestSequense', (unittest.TestCase,), {"config": config})
 
             tests = testcase.get("teststeps", [])
             for index, test_dict in enumerate(tests):
@@ -118,16 +224,96 @@ class HttpRunner(object):
             list: tests_results
 
         """
-        tests_results = []
+        return list(self._iter_suite(test_suite))
+
+    def _iter_suite(self, test_suite):
+        """ run tests in test_suite, and yield result of each testcase once completed.
+
+        Args:
+            test_suite: unittest.TestSuite()
+
+        Returns:
+            generator: (testcase, result) of each testcase, in the order of test_suite.
+
+        """
+        if self.workers == 1:
+            for testcase in test_suite:
+                yield self._run_testcase(testcase)
+
+            return
+
+        # each testcase owns its Runner and HttpSession, thus testcases are independent
+        # and can be run concurrently, results are kept in the order of test_suite.
+        pool = ThreadPool(self.workers)
+        try:
+            for testcase, result, output in pool.imap(
+                    self._run_testcase_concurrently, list(test_suite)):
+                # output of each testcase is written once completed, not interleaved
+                self.unittest_runner.stream.write(output)
+                self.unittest_runner.stream.flush()
+                yield (testcase, result)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _run_testcase(self, testcase):
+        """ run single testcase in test_suite
 
-        for testcase in test_suite:
-            testcase_name = testcase.config.get("name")
-            logger.log_info("Start to run testcase: {}".format(testcase_name))
+        Args:
+            testcase: unittest.TestSuite() of one testcase, generated by _add_tests
 
-            result = self.unittest_runner.run(testcase)
-            tests_results.append((testcase, result))
+        Returns:
+            tuple: (testcase, result)
+
+        """
+        testcase_name = testcase.config.get("name")
+        logger.log_info("Start to run testcase: {}".format(testcase_name))
+
+        result = self.unittest_runner.run(testcase)
+        return (testcase, result)
+
+    def _run_testcase_concurrently(self, testcase):
+        """ run single testcase in worker thread with its own result and stream.
+            TextTestRunner.run is not used as it swaps process-global warnings filters
+            and writes to the stream shared by all worker threads.
+
+        Args:
+            testcase: unittest.TestSuite() of one testcase, generated by _add_tests
+
+        Returns:
+            tuple: (testcase, result, output)
+
+        """
+        testcase_name = testcase.config.get("name")
+        logger.log_info("Start to run testcase: {}".format(testcase_name))
 
-        return tests_results
+        stream = compat.StringIO()
+        result = self.resultclass(unittest.runner._WritelnDecorator(stream), True, 1)
+        result.failfast = self.failfast
+        result.startTestRun()
+        try:
+            testcase(result)
+        finally:
+            result.stopTestRun()
+
+        result.printErrors()
+        return (testcase, result, stream.getvalue())
+
+    def _get_testcase_summary(self, testcase, result):
+        """ get summary of single testcase
+
+        Args:
+            testcase: unittest.TestSuite() of one testcase, generated by _add_tests
+            result: HtmlTestResult() instance of testcase
+
+        Returns:
+            dict: testcase summary, with name and in_out added.
+
+        """
+        testcase_summary = report.get_summary(result)
+        testcase_summary["name"] = testcase.config.get("name")
+        testcase_summary["in_out"] = utils.get_testcase_io(testcase)
+        return testcase_summary
 
     def _aggregate(self, tests_results):
         """ aggregate results
@@ -135,12 +321,24 @@ class HttpRunner(object):
         Args:
             tests_results (list): list of (testcase, result)
 
+        """
+        return self._aggregate_summaries(
+            self._get_testcase_summary(testcase, result)
+            for testcase, result in tests_results
+        )
+
+    def _aggregate_summaries(self, testcase_summaries):
+        """ aggregate testcase summaries
+
+        Args:
+            testcase_summaries (iterable): testcase summaries, generated by _get_testcase_summary
+
         """
         summary = {
             "success": True,
             "stat": {
                 "testcases": {
-                    "total": len(tests_results),
+                    "total": 0,
                     "success": 0,
                     "fail": 0
                 },
@@ -148,29 +346,97 @@ class HttpRunner(object):
             },
             "time": {},
             "platform": report.get_platform(),
-            "details": []
+            # testcase summaries are stringified and stored on disk once completed
+            "details": report.ResultStore() if self.stream_report else []
         }
 
-        for tests_result in tests_results:
-            testcase, result = tests_result
-            testcase_summary = report.get_summary(result)
-
+        for index, testcase_summary in enumerate(testcase_summaries):
+            summary["stat"]["testcases"]["total"] += 1
             if testcase_summary["success"]:
                 summary["stat"]["testcases"]["success"] += 1
             else:
                 summary["stat"]["testcases"]["fail"] += 1
 
             summary["success"] &= testcase_summary["success"]
-            testcase_summary["name"] = testcase.config.get("name")
-            testcase_summary["in_out"] = utils.get_testcase_io(testcase)
 
             report.aggregate_stat(summary["stat"]["teststeps"], testcase_summary["stat"])
             report.aggregate_stat(summary["time"], testcase_summary["time"])
 
+            if self.stream_report:
+                report.stringify_testcase_summary(
+                    testcase_summary, index, self.report_body_limit, self.report_details)
+
             summary["details"].append(testcase_summary)
 
         return summary
 
+    def _run_in_processes(self, tests_mapping):
+        """ shard loaded tests across worker processes, each shard is parsed and run
+            in worker process, testcase summaries are streamed back in loaded order.
+
+        Args:
+            tests_mapping (dict): loaded tests mapping
+
+        Returns:
+            generator: testcase summaries
+
+        """
+        project_mapping = tests_mapping.get("project_mapping", {})
+        project_data, debugtalk_path, functions = _split_project_mapping(project_mapping)
+
+        # each testcase/testsuite/api is one shard item, keep the order of parse_tests
+        shards = []
+        for test_type in tests_mapping:
+            if test_type not in ["testsuites", "testcases", "apis"]:
+                continue
+
+            for test_content in tests_mapping[test_type]:
+                shards.append({
+                    "project_mapping": project_data,
+                    test_type: [test_content]
+                })
+
+        runner_kwargs = {
+            "failfast": self.failfast,
+            "log_level": self.log_level,
+            "log_file": self.log_file,
+            "workers": self.workers,
+            "record_level": self.record_level,
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "keep_alive": self.keep_alive,
+            "share_connections": self.share_connections,
+            "http2": self.http2,
+            "report_body_limit": self.report_body_limit,
+            "report_details": self.report_details
+        }
+        chunksize = max(1, len(shards) // (self.processes * 4))
+        pool = multiprocessing.Pool(
+            min(self.processes, len(shards)) or 1,
+            initializer=_init_process_worker,
+            initargs=(runner_kwargs, project_data, debugtalk_path, functions)
+        )
+        try:
+            for testcase_summaries in pool.imap(_run_shard, shards, chunksize):
+                for testcase_summary in testcase_summaries:
+                    # results are fed to sinks in current process once shard completes
+                    self._feed_result_sinks(testcase_summary)
+                    yield testcase_summary
+        finally:
+            pool.close()
+            pool.join()
+
+    def _feed_result_sinks(self, testcase_summary):
+        """ feed result sinks with records of testcase summary run in worker process.
+        """
+        testcase_name = u"{}".format(testcase_summary["name"] or "")
+        records = testcase_summary["records"]
+        for sink in self.result_sinks:
+            for record in records:
+                sink.add_record(testcase_name, record)
+
+            sink.end_testcase(testcase_name, records)
+
     def run_tests(self, tests_mapping):
         """ run testcase/testsuite data
         """
@@ -178,36 +444,52 @@ class HttpRunner(object):
         if self.save_tests:
             utils.dump_logs(tests_mapping, project_mapping, "loaded")
 
-        # parse tests
-        self.exception_stage = "parse tests"
-        parsed_testcases = parser.parse_tests(tests_mapping)
+        if self._summary and isinstance(self._summary["details"], report.ResultStore):
+            # remove store file of former run
+            self._summary["details"].close()
 
-        if self.save_tests:
-            utils.dump_logs(parsed_testcases, project_mapping, "parsed")
+        if self.processes > 1:
+            # parse, run and aggregate in worker processes
+            self.exception_stage = "run tests in processes"
+            self._summary = self._aggregate_summaries(
+                self._run_in_processes(tests_mapping)
+            )
+
+        else:
+            # parse tests
+            self.exception_stage = "parse tests"
+            parsed_testcases = parser.parse_tests(tests_mapping)
 
-        # add tests to test suite
-        self.exception_stage = "add tests to test suite"
-        test_suite = self._add_tests(parsed_testcases)
+            if self.save_tests:
+                utils.dump_logs(parsed_testcases, project_mapping, "parsed")
 
-        # run test suite
-        self.exception_stage = "run test suite"
-        results = self._run_suite(test_suite)
+            # add tests to test suite
+            self.exception_stage = "add tests to test suite"
+            test_suite = self._add_tests(parsed_testcases)
 
-        # aggregate results
-        self.exception_stage = "aggregate results"
-        self._summary = self._aggregate(results)
+            # run test suite, and aggregate results of each testcase once completed
+            self.exception_stage = "run test suite"
+            results = self._iter_suite(test_suite)
+            self._summary = self._aggregate(results)
 
         # generate html report
         self.exception_stage = "generate html report"
-        report.stringify_summary(self._summary)
-
-        if self.save_tests:
+        report.stringify_summary(self._summary, self.report_body_limit, self.report_details)
+
+        if self.save_tests and self.stream_report:
+            # dump testcase summaries one at a time
+            report.dump_summary(
+                self._summary,
+                utils.get_dump_file_path(project_mapping, "summary")
+            )
+        elif self.save_tests:
             utils.dump_logs(self._summary, project_mapping, "summary")
 
         report_path = report.render_html_report(
             self._summary,
             self.report_template,
-            self.report_dir
+            self.report_dir,
+            lazy=self.lazy_report
         )
 
         return report_path
@@ -255,7 +537,13 @@ class HttpRunner(object):
         """
         # load tests
         self.exception_stage = "load tests"
-        tests_mapping = loader.load_tests(path, dot_env_path)
+        # parsed tests are related to mapping, thus cache is disabled if mapping specified
+        tests_mapping = loader.load_tests(
+            path,
+            dot_env_path,
+            cache=self.cache and not mapping,
+            workers=self.workers
+        )
         tests_mapping["project_mapping"]["test_path"] = path
 
         if mapping:
@@ -286,6 +574,121 @@ class HttpRunner(object):
         return self._summary
 
 
+def _ensure_count(name, count):
+    """ ensure concurrency count is a positive integer.
+
+    Raises:
+        exceptions.ParamsError: count is not digit or less than 1.
+
+    """
+    try:
+        count = int(count)
+    except (TypeError, ValueError):
+        raise exceptions.ParamsError(
+            "{} should be digit, given: {}".format(name, count))
+
+    if count < 1:
+        raise exceptions.ParamsError(
+            "{} should be greater than 0, given: {}".format(name, count))
+
+    return count
+
+
+_process_runner = None
+""" HttpRunner() instance of worker process, initialized by _init_process_worker.
+"""
+
+
+def _split_project_mapping(project_mapping):
+    """ split project_mapping into data which can be sent to worker processes, and
+        functions. debugtalk.py functions are loaded again in worker process, other
+        functions are pickled, which fails for lambdas or nested functions.
+
+    Returns:
+        tuple: (project_data, debugtalk_path, functions)
+
+    Raises:
+        exceptions.ParamsError: functions can not be pickled.
+
+    """
+    project_data = {
+        key: value
+        for key, value in project_mapping.items()
+        if key != "functions"
+    }
+    functions = project_mapping.get("functions") or {}
+
+    project_working_directory = project_mapping.get("PWD")
+    if project_working_directory:
+        debugtalk_path = os.path.join(project_working_directory, "debugtalk.py")
+        if os.path.isfile(debugtalk_path):
+            return project_data, debugtalk_path, None
+
+    try:
+        pickle.dumps(functions)
+    except (pickle.PicklingError, AttributeError, TypeError) as ex:
+        raise exceptions.ParamsError(
+            "functions can not be sent to worker processes: {}. "
+            "Define them in debugtalk.py or at module level, "
+            "or run with workers instead of processes.".format(ex)
+        )
+
+    return project_data, None, functions
+
+
+def _init_process_worker(runner_kwargs, project_data, debugtalk_path, functions):
+    """ initialize worker process with its own HttpRunner and loader.project_mapping,
+        debugtalk.py functions are loaded in worker process if debugtalk_path is specified.
+    """
+    global _process_runner
+
+    # log handlers are inherited from parent process when forked
+    del logger.logger.handlers[:]
+
+    loader.project_mapping.update(project_data)
+    project_working_directory = project_data.get("PWD")
+    if project_working_directory:
+        loader.tests_def_mapping["PWD"] = project_working_directory
+        built_in.PWD = project_working_directory
+
+    if debugtalk_path:
+        debugtalk_dir = os.path.dirname(debugtalk_path)
+        if debugtalk_dir not in sys.path:
+            sys.path.insert(0, debugtalk_dir)
+        functions = loader.load_debugtalk_functions()
+
+    loader.project_mapping["functions"] = functions or {}
+    _process_runner = HttpRunner(**runner_kwargs)
+
+
+def _run_shard(tests_mapping):
+    """ parse and run shard of tests in worker process.
+
+    Returns:
+        list: stringified testcase summaries, which can be sent back to parent process.
+
+    """
+    # functions are not sent with shards, use project_mapping of worker process
+    tests_mapping["project_mapping"] = loader.project_mapping
+    parsed_testcases = parser.parse_tests(tests_mapping)
+    test_suite = _process_runner._add_tests(parsed_testcases)
+    tests_results = _process_runner._run_suite(test_suite)
+    testcase_summaries = [
+        _process_runner._get_testcase_summary(testcase, result)
+        for testcase, result in tests_results
+    ]
+
+    # convert file objects, cookie jars, etc. in records to plain data
+    for testcase_summary in testcase_summaries:
+        report.stringify_records(
+            testcase_summary["records"],
+            _process_runner.report_body_limit,
+            _process_runner.report_details
+        )
+
+    return testcase_summaries
+
+
 def prepare_locust_tests(path):
     """ prepare locust testcases
 
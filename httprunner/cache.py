@@ -0,0 +1,283 @@
+# encoding: utf-8
+
+import hashlib
+import io
+import os
+import pickle
+import platform
+import threading
+import time
+
+from httprunner import __version__, logger
+from httprunner.compat import OrderedDict
+
+# cached parsed tests are saved in PWD/.httprunner_cache
+CACHE_DIR_NAME = ".httprunner_cache"
+
+
+def get_file_stat(file_path):
+    """ get file modify time and size, used to check if file is changed.
+    """
+    stat = os.stat(file_path)
+    return (stat.st_mtime, stat.st_size)
+
+
+def get_file_md5(file_path):
+    """ get md5 of file content, returns empty string if file not exist.
+    """
+    if not file_path or not os.path.isfile(file_path):
+        return ""
+
+    with io.open(file_path, "rb") as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+class TestsCache(object):
+    """ on-disk cache of parsed tests, each test file is corresponding to one cache file.
+
+        Cache file is keyed by test file path, parser.py, response.py, client.py, debugtalk.py
+        and api definitions, and is invalid if the test file or any file loaded with it has
+        been changed.
+
+    Examples:
+        >>> tests_cache = TestsCache(project_working_directory, api_files)
+        >>> cached_content = tests_cache.load(path)
+        >>> if cached_content is None:
+                cache_info = tests_cache.gen_cache_info(path, loaded_files)
+                # after parsing
+                dump_parsed_tests(cache_info, "testcase", parsed_testcases)
+
+    """
+    def __init__(self, project_working_directory, api_files=None):
+        """ init with project fingerprint.
+
+        Args:
+            project_working_directory (str): PWD, debugtalk.py is located in.
+            api_files (list): api definition files loaded from PWD/api folder.
+
+        """
+        self.cache_dir = os.path.join(project_working_directory, CACHE_DIR_NAME)
+
+        fingerprint = [
+            __version__,
+            platform.python_version(),
+            # cached tests are pickled parser objects, e.g. LazyString, Extractor, PreparedJSON
+            get_file_md5(os.path.join(os.path.dirname(__file__), "parser.py")),
+            get_file_md5(os.path.join(os.path.dirname(__file__), "response.py")),
+            get_file_md5(os.path.join(os.path.dirname(__file__), "client.py")),
+            get_file_md5(os.path.join(project_working_directory, "debugtalk.py"))
+        ]
+        for api_file in sorted(api_files or []):
+            fingerprint.append("{}:{}".format(api_file, get_file_stat(api_file)))
+
+        self.fingerprint = "\n".join(fingerprint)
+
+    def get_cache_path(self, path):
+        cache_key = hashlib.md5(
+            u"{}\n{}".format(self.fingerprint, os.path.abspath(path)).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.cache_dir, "{}.pickle".format(cache_key))
+
+    def load(self, path):
+        """ load cached content of test file.
+
+        Returns:
+            dict: cached content, None if not cached or cache is invalid.
+
+                {
+                    "type": "testcase",
+                    "files": {path: (mtime, size)},
+                    "parsed_testcases": [...]
+                }
+
+        """
+        cache_path = self.get_cache_path(path)
+        if not os.path.isfile(cache_path):
+            return None
+
+        try:
+            with io.open(cache_path, "rb") as f:
+                cached_content = pickle.load(f)
+
+            for file_path, file_stat in cached_content["files"].items():
+                if get_file_stat(file_path) != file_stat:
+                    return None
+
+        except Exception as ex:
+            # file removed, debugtalk.py function renamed, incompatible pickle, etc.
+            logger.log_debug("invalid tests cache for {}: {}".format(path, ex))
+            return None
+
+        logger.log_debug("load parsed tests from cache: {}".format(path))
+        return cached_content
+
+    def gen_cache_info(self, path, loaded_files):
+        """ generate cache info before loading test file, which will be used to dump
+            parsed tests.
+
+        Args:
+            path (str): test file path
+            loaded_files (list): files loaded with test file, e.g. referenced testcases.
+
+        """
+        files = {
+            file_path: get_file_stat(file_path)
+            for file_path in set(loaded_files) | {path}
+        }
+        return {
+            "cache_path": self.get_cache_path(path),
+            "files": files
+        }
+
+
+def dump_parsed_tests(cache_info, test_type, parsed_testcases):
+    """ dump parsed tests of one test file to cache file.
+
+    Args:
+        cache_info (dict): generated by TestsCache.gen_cache_info
+        test_type (str): testcase or api
+        parsed_testcases (list): parsed testcases of test file
+
+    """
+    cache_path = cache_info["cache_path"]
+    cached_content = {
+        "type": test_type,
+        "files": cache_info["files"],
+        "parsed_testcases": parsed_testcases
+    }
+
+    try:
+        content = pickle.dumps(cached_content, pickle.HIGHEST_PROTOCOL)
+    except Exception as ex:
+        # e.g. lambda in debugtalk.py can not be pickled
+        logger.log_debug("failed to cache parsed tests: {}".format(ex))
+        return
+
+    cache_dir = os.path.dirname(cache_path)
+    if not os.path.isdir(cache_dir):
+        try:
+            os.makedirs(cache_dir)
+        except OSError:
+            # created by other process
+            pass
+
+    # write to temp file first, avoid reading incomplete cache file
+    temp_cache_path = "{}.{}".format(cache_path, os.getpid())
+    with io.open(temp_cache_path, "wb") as f:
+        f.write(content)
+
+    try:
+        os.rename(temp_cache_path, cache_path)
+    except OSError:
+        # Windows does not allow renaming to an existing file
+        os.remove(cache_path)
+        os.rename(temp_cache_path, cache_path)
+
+
+class LRUCache(object):
+    """ thread-safe LRU cache with size limit, each item may expire after ttl seconds.
+
+    Examples:
+        >>> lru_cache = LRUCache(maxsize=2)
+        >>> lru_cache.set("a", 1)
+        >>> lru_cache.get("a")
+        (True, 1)
+        >>> lru_cache.get("b")
+        (False, None)
+        >>> lru_cache.stats
+        {"hits": 1, "misses": 1, "size": 1, "maxsize": 2}
+
+    """
+    def __init__(self, maxsize=1024, ttl=None):
+        """
+        Args:
+            maxsize (int): max number of cached items, least recently used item
+                will be evicted when exceeded.
+            ttl (float): default seconds before cached item expired, None never expires.
+
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """ get cached value of key.
+
+        Returns:
+            tuple: (hit, value), value is None if not hit.
+
+        """
+        with self._lock:
+            try:
+                value, expire_at = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return False, None
+
+            if expire_at is not None and expire_at <= time.time():
+                self.misses += 1
+                return False, None
+
+            # move to the end as most recently used
+            self._items[key] = (value, expire_at)
+            self.hits += 1
+            return True, value
+
+    def set(self, key, value, ttl=None):
+        """ cache value of key, ttl overrides default ttl of cache.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expire_at = None if ttl is None else time.time() + ttl
+
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = (value, expire_at)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._items),
+            "maxsize": self.maxsize
+        }
+
+
+def cacheable(func=None, ttl=None):
+    """ mark function in debugtalk.py as cacheable, calling results with the same
+        arguments will be reused until expired or evicted.
+
+    Examples:
+        >>> from httprunner.cache import cacheable
+
+        >>> @cacheable
+            def get_token(user):
+                ...
+
+        >>> @cacheable(ttl=60)
+            def get_timestamp():
+                ...
+
+    """
+    def mark(func):
+        func.httprunner_cacheable = {"ttl": ttl}
+        return func
+
+    if func is None:
+        return mark
+
+    return mark(func)
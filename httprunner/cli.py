@@ -6,7 +6,7 @@ def main_hrun():
     import sys
     import argparse
     from httprunner.logger import color_print
-    from httprunner import __description__, __version__
+    from httprunner import __description__, __version__, report
     from httprunner.api import HttpRunner
     from httprunner.compat import is_py2
     from httprunner.validator import validate_json_file
@@ -41,6 +41,49 @@ def main_hrun():
     parser.add_argument(
         '--save-tests', action='store_true', default=False,
         help="Save loaded tests and parsed tests to JSON file.")
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="Specify number of testcases to run concurrently, default is 1.")
+    parser.add_argument(
+        '--processes', type=int, default=1,
+        help="Specify number of worker processes to shard testcases across, default is 1.")
+    parser.add_argument(
+        '--record-level', default="full", choices=["none", "summary", "full"],
+        help="Specify request/response details recorded for passed teststeps, default is full.")
+    parser.add_argument(
+        '--pool-maxsize', type=int,
+        help="Specify max number of connections kept alive for each host, default is 10.")
+    parser.add_argument(
+        '--share-connections', action='store_true', default=False,
+        help="Share connection pools across testcases, cookies are still kept in each testcase.")
+    parser.add_argument(
+        '--no-keep-alive', action='store_true', default=False,
+        help="Close connection after each request.")
+    parser.add_argument(
+        '--http2', action='store_true', default=False,
+        help="Send requests with HTTP/2 capable transport, requires httpx.")
+    parser.add_argument(
+        '--stream-report', action='store_true', default=False,
+        help="Store testcase results on disk once completed, and render report from the store.")
+    parser.add_argument(
+        '--lazy-report', action='store_true', default=False,
+        help="Render report index with aggregates only, testcase details are loaded on demand.")
+    parser.add_argument(
+        '--report-details', choices=report.REPORT_DETAILS, default="all",
+        help="Request and response details in report, default is all. "
+             "Details of passed teststeps are reduced to summary if failures.")
+    parser.add_argument(
+        '--report-body-limit', type=int, default=report.DEFAULT_BODY_LIMIT,
+        help="Max length of each request and response body in report, default is 102400.")
+    parser.add_argument(
+        '--junit-xml',
+        help="Write results in JUnit XML format to specified file as testcases complete.")
+    parser.add_argument(
+        '--json-lines',
+        help="Write result of each test as one line of JSON to specified file once completed.")
+    parser.add_argument(
+        '--cache', action='store_true', default=False,
+        help="Cache parsed testcases, unchanged test files will not be parsed again.")
     parser.add_argument(
         '--startproject',
         help="Specify new project name.")
@@ -72,13 +115,32 @@ def main_hrun():
         create_scaffold(project_name)
         exit(0)
 
+    result_sinks = []
+    if args.junit_xml:
+        result_sinks.append(report.JUnitXMLSink(args.junit_xml))
+    if args.json_lines:
+        result_sinks.append(report.JSONLinesSink(args.json_lines))
+
     runner = HttpRunner(
         failfast=args.failfast,
         save_tests=args.save_tests,
         report_template=args.report_template,
         report_dir=args.report_dir,
         log_level=args.log_level,
-        log_file=args.log_file
+        log_file=args.log_file,
+        workers=args.workers,
+        processes=args.processes,
+        cache=args.cache,
+        record_level=args.record_level,
+        pool_maxsize=args.pool_maxsize,
+        keep_alive=not args.no_keep_alive,
+        share_connections=args.share_connections,
+        http2=args.http2,
+        stream_report=args.stream_report,
+        lazy_report=args.lazy_report,
+        result_sinks=result_sinks,
+        report_body_limit=args.report_body_limit,
+        report_details=args.report_details
     )
     try:
         for path in args.testcase_paths:
@@ -86,6 +148,9 @@ def main_hrun():
     except Exception:
         color_print("!!!!!!!!!! exception stage: {} !!!!!!!!!!".format(runner.exception_stage), "YELLOW")
         raise
+    finally:
+        for sink in result_sinks:
+            sink.close()
 
     if runner.summary and runner.summary["success"]:
         sys.exit(0)
@@ -1,17 +1,144 @@
 # encoding: utf-8
 
-import time
+import logging
 
 import requests
 import urllib3
 from httprunner import logger
+from httprunner.compat import monotonic_time
+from httprunner.connection import DNSResolver, TimedHTTPAdapter, get_timing_stat
 from httprunner.utils import lower_dict_keys, omit_long_data
 from requests import Request, Response
+from requests.adapters import DEFAULT_POOLSIZE
+from requests.compat import json as complexjson
 from requests.exceptions import (InvalidSchema, InvalidURL, MissingSchema,
                                  RequestException)
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# request and response details recorded to meta_data for each request
+#   - full: record all details, e.g. headers, body, cookies
+#   - summary: only record url, method, status_code, reason and content_type
+#   - none: record nothing
+# failed tests are always recorded with full details.
+RECORD_LEVELS = ("none", "summary", "full")
+
+
+def get_response_json(resp_obj):
+    """ decode response body as json. decoded result (or decoding error) is cached in
+        response object, thus response body is decoded at most once and the decoded
+        object is shared by meta_data recording, extraction and validation.
+
+    Args:
+        resp_obj (instance): requests.Response instance
+
+    Raises:
+        ValueError: response body is not valid json.
+
+    """
+    try:
+        decoded, value = resp_obj._httprunner_json
+    except AttributeError:
+        try:
+            decoded, value = True, resp_obj.json()
+        except ValueError as ex:
+            decoded, value = False, ex
+
+        resp_obj._httprunner_json = (decoded, value)
+
+    if not decoded:
+        raise value
+
+    return value
+
+
+def is_body_streamed(resp_obj):
+    """ check if response body is streamed and not loaded, i.e. request is sent with
+        stream=True, and response content has not been accessed.
+    """
+    return resp_obj.raw is not None and getattr(resp_obj, "_content", None) is False
+
+
+class PreparedJSON(dict):
+    """ static json request body, serialized once when parsing tests and sent as bytes
+        each time teststep is run. It is still a dict, thus can be referenced as $request.json,
+        but should not be modified after created.
+    """
+    def __init__(self, *args, **kwargs):
+        super(PreparedJSON, self).__init__(*args, **kwargs)
+        # serialized the same as requests does for json body
+        body = complexjson.dumps(self)
+        if not isinstance(body, bytes):
+            body = body.encode("utf-8")
+
+        self.serialized = body
+
+
+def use_prepared_body(request_kwargs, session_headers=None):
+    """ replace PreparedJSON body in request kwargs with its serialized bytes, content type
+        is set to application/json unless specified, the same as requests does for json body.
+
+    Args:
+        request_kwargs (dict): request kwargs, not modified.
+        session_headers (dict): headers of session, merged into request headers by requests.
+
+    Returns:
+        dict: request kwargs with serialized body, the same request_kwargs if json body
+            is not prepared.
+
+    """
+    json_body = request_kwargs.get("json")
+    if not isinstance(json_body, PreparedJSON) \
+            or request_kwargs.get("data") or request_kwargs.get("files"):
+        return request_kwargs
+
+    request_kwargs = dict(request_kwargs)
+    del request_kwargs["json"]
+    request_kwargs["data"] = json_body.serialized
+
+    headers = dict(request_kwargs.get("headers") or {})
+    header_names = {key.lower() for key in headers}
+    header_names.update(key.lower() for key in (session_headers or {}))
+    if "content-type" not in header_names:
+        headers["Content-Type"] = "application/json"
+        request_kwargs["headers"] = headers
+
+    return request_kwargs
+
+
+def create_http_adapter(pool_connections=None, pool_maxsize=None, http2=False,
+                        dns_cache=None, hosts=None):
+    """ create requests transport adapter with connection pool options, the adapter is
+        thread-safe and can be shared by multiple sessions.
+
+    Args:
+        pool_connections (int): number of host connection pools to cache, default 10.
+        pool_maxsize (int): max number of connections kept alive in each host pool,
+            default 10. connections more than pool_maxsize are discarded after use.
+        http2 (bool): create HTTP/2 capable adapter, requires httpx, install with:
+            pip install httprunner[http2]
+        dns_cache (bool/float): seconds to cache resolved addresses in process, True for
+            default TTL, see httprunner.connection.DNSResolver
+        hosts (dict): static mapping of hostname to address, e.g. {"api.example.com": "127.0.0.1"}
+
+    """
+    pool_connections = pool_connections or DEFAULT_POOLSIZE
+    pool_maxsize = pool_maxsize or DEFAULT_POOLSIZE
+    resolver = DNSResolver(dns_cache, hosts) if dns_cache or hosts else None
+    if http2:
+        if resolver is not None:
+            logger.log_warning(
+                "dns_cache and hosts are not supported by HTTP/2 transport, ignored.")
+
+        from httprunner.http2 import HTTP2Adapter
+        return HTTP2Adapter(pool_connections, pool_maxsize)
+
+    return TimedHTTPAdapter(
+        resolver=resolver,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize
+    )
+
 
 class ApiResponse(Response):
 
@@ -29,14 +156,67 @@ class HttpSession(requests.Session):
 
     This is a slightly extended version of `python-request <http://python-requests.org>`_'s
     :py:class:`requests.Session` class and mostly this class works exactly the same.
+
+    Args:
+        record_level (str): request and response details recorded to meta_data,
+            one of RECORD_LEVELS, default is full.
+        pool_connections (int): number of host connection pools to cache.
+        pool_maxsize (int): max number of connections kept alive in each host pool.
+        keep_alive (bool): keep connections alive for reuse, default True.
+        http2 (bool): send requests with HTTP/2 capable transport, see httprunner.http2
+        dns_cache (bool/float): seconds to cache resolved addresses in process, True for
+            default TTL, see httprunner.connection.DNSResolver
+        hosts (dict): static mapping of hostname to address, e.g. {"api.example.com": "127.0.0.1"}
+        http_adapter (instance): requests transport adapter shared with other sessions, thus
+            connections are reused across sessions while cookies are kept in each session.
+            shared adapter is not closed with session, pool, http2 and dns options are ignored.
+
     """
     def __init__(self, *args, **kwargs):
+        record_level = kwargs.pop("record_level", "full")
+        if record_level not in RECORD_LEVELS:
+            raise ValueError("record_level should be one of {}, given: {}".format(
+                RECORD_LEVELS, record_level))
+
+        pool_connections = kwargs.pop("pool_connections", None)
+        pool_maxsize = kwargs.pop("pool_maxsize", None)
+        keep_alive = kwargs.pop("keep_alive", True)
+        http2 = kwargs.pop("http2", False)
+        dns_cache = kwargs.pop("dns_cache", None)
+        hosts = kwargs.pop("hosts", None)
+        http_adapter = kwargs.pop("http_adapter", None)
+
         super(HttpSession, self).__init__(*args, **kwargs)
+        self.record_level = record_level
+        self.shared_adapter = http_adapter
+
+        if http_adapter is None:
+            http_adapter = create_http_adapter(
+                pool_connections, pool_maxsize, http2, dns_cache, hosts)
+
+        self.mount("https://", http_adapter)
+        self.mount("http://", http_adapter)
+
+        if not keep_alive:
+            self.headers["Connection"] = "close"
+
         self.init_meta_data()
 
+    def close(self):
+        """ close session and its adapters, shared adapter is closed by its owner.
+        """
+        if self.shared_adapter is not None:
+            for prefix, adapter in list(self.adapters.items()):
+                if adapter is self.shared_adapter:
+                    del self.adapters[prefix]
+
+        super(HttpSession, self).close()
+
     def init_meta_data(self):
         """ initialize meta_data, it will store detail data of request and response
         """
+        # response and redirection histories of last request, used to record details
+        self._last_responses = []
         self.meta_data = {
             "name": "",
             "data": [
@@ -58,6 +238,11 @@ class HttpSession(requests.Session):
                 "content_size": "N/A",
                 "response_time_ms": "N/A",
                 "elapsed_ms": "N/A",
+                "dns_ms": "N/A",
+                "connect_ms": "N/A",
+                "tls_ms": "N/A",
+                "ttfb_ms": "N/A",
+                "download_ms": "N/A"
             }
         }
 
@@ -65,6 +250,9 @@ class HttpSession(requests.Session):
         """ get request and response info from Response() object.
         """
         def log_print(req_resp_dict, r_type):
+            if not logger.logger.isEnabledFor(logging.DEBUG):
+                return
+
             msg = "\n================== {} details ==================\n".format(r_type)
             for key, value in req_resp_dict[r_type].items():
                 msg += "{:<16} : {}\n".format(key, repr(value))
@@ -108,13 +296,16 @@ class HttpSession(requests.Session):
         content_type = lower_resp_headers.get("content-type", "")
         req_resp_dict["response"]["content_type"] = content_type
 
-        if "image" in content_type:
+        if is_body_streamed(resp_obj):
+            # streamed response body is parsed incrementally, never loaded in memory
+            req_resp_dict["response"]["text"] = "streamed response body (OMITTED)"
+        elif "image" in content_type:
             # response is image type, record bytes content only
             req_resp_dict["response"]["content"] = resp_obj.content
         else:
             try:
                 # try to record json data
-                req_resp_dict["response"]["json"] = resp_obj.json()
+                req_resp_dict["response"]["json"] = get_response_json(resp_obj)
             except ValueError:
                 # only record at most 512 text charactors
                 resp_text = resp_obj.text
@@ -125,6 +316,34 @@ class HttpSession(requests.Session):
 
         return req_resp_dict
 
+    def get_req_resp_summary(self, resp_obj):
+        """ get request and response summary from Response() object.
+        """
+        return {
+            "request": {
+                "url": resp_obj.request.url,
+                "method": resp_obj.request.method
+            },
+            "response": {
+                "url": resp_obj.url,
+                "status_code": resp_obj.status_code,
+                "reason": resp_obj.reason,
+                "content_type": resp_obj.headers.get("content-type", "")
+            }
+        }
+
+    def record_details(self):
+        """ record full request and response details of last request to meta_data,
+            used when test failed with lower record level.
+        """
+        if self.record_level == "full" or not self._last_responses:
+            return
+
+        self.meta_data["data"] = [
+            self.get_req_resp_record(resp_obj)
+            for resp_obj in self._last_responses
+        ]
+
     def request(self, method, url, name=None, **kwargs):
         """
         Constructs and sends a :py:class:`requests.Request`.
@@ -175,13 +394,31 @@ class HttpSession(requests.Session):
         kwargs.setdefault("timeout", 120)
         self.meta_data["data"][0]["request"].update(kwargs)
 
-        start_timestamp = time.time()
+        start_timestamp = monotonic_time()
         response = self._send_request_safe_mode(method, url, **kwargs)
-        response_time_ms = round((time.time() - start_timestamp) * 1000, 2)
+        finished_timestamp = monotonic_time()
+        response_time_ms = round((finished_timestamp - start_timestamp) * 1000, 2)
 
+        stream = kwargs.get("stream", False)
+        self._record_response(
+            response, response_time_ms, stream, None if stream else finished_timestamp)
+        return response
+
+    def _record_response(self, response, response_time_ms, stream=False, finished_at=None):
+        """ record response stat and request/response histories to meta_data,
+            and log response status.
+
+        Args:
+            response (instance): requests.Response instance
+            response_time_ms (float): wall time of sending request and receiving response
+            stream (bool): whether the response content is streamed
+            finished_at (float): monotonic time when response content is read,
+                used to measure download time.
+
+        """
         # get the length of the content, but if the argument stream is set to True, we take
         # the size from the content-length header, in order to not trigger fetching of the body
-        if kwargs.get("stream", False):
+        if stream:
             content_size = int(dict(response.headers).get("content-length") or 0)
         else:
             content_size = len(response.content or "")
@@ -189,16 +426,32 @@ class HttpSession(requests.Session):
         # record the consumed time
         self.meta_data["stat"] = {
             "response_time_ms": response_time_ms,
-            "elapsed_ms": response.elapsed.microseconds / 1000.0,
+            "elapsed_ms": round(response.elapsed.total_seconds() * 1000, 2),
             "content_size": content_size
         }
+        self.meta_data["stat"].update(get_timing_stat(response, finished_at))
 
         # record request and response histories, include 30X redirection
         response_list = response.history + [response]
-        self.meta_data["data"] = [
-            self.get_req_resp_record(resp_obj)
-            for resp_obj in response_list
-        ]
+        if self.record_level == "full":
+            self.meta_data["data"] = [
+                self.get_req_resp_record(resp_obj)
+                for resp_obj in response_list
+            ]
+        else:
+            # connection error is raised when recording full details
+            error = getattr(response, "error", None)
+            if error:
+                raise error
+
+            self._last_responses = response_list
+            if self.record_level == "summary":
+                self.meta_data["data"] = [
+                    self.get_req_resp_summary(resp_obj)
+                    for resp_obj in response_list
+                ]
+            else:
+                self.meta_data["data"] = []
 
         try:
             response.raise_for_status()
@@ -213,8 +466,6 @@ class HttpSession(requests.Session):
                 )
             )
 
-        return response
-
     def _send_request_safe_mode(self, method, url, **kwargs):
         """
         Send a HTTP request, and catch any exception that might occur due to connection problems.
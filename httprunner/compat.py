@@ -39,6 +39,12 @@ try:
 except AttributeError:
     JSONDecodeError = ValueError
 
+try:
+    # monotonic clock for measuring durations, unaffected by system clock changes
+    from time import perf_counter as monotonic_time
+except ImportError:
+    from time import time as monotonic_time
+
 if is_py2:
     builtin_str = str
     bytes = str
@@ -49,6 +55,9 @@ if is_py2:
 
     FileNotFoundError = IOError
 
+    from future.backports.misc import ChainMap
+    from StringIO import StringIO
+
 elif is_py3:
     builtin_str = str
     str = str
@@ -58,3 +67,6 @@ elif is_py3:
     integer_types = (int,)
 
     FileNotFoundError = FileNotFoundError
+
+    from collections import ChainMap
+    from io import StringIO
@@ -0,0 +1,351 @@
+# encoding: utf-8
+
+"""
+httprunner.connection
+~~~~~~~~~~~~~~~~~~~~~
+
+Default transport adapter of HttpSession. Connections are instrumented with monotonic
+clock to record timing breakdown of each request:
+
+    - dns_ms: resolving hostname
+    - connect_ms: establishing TCP connection
+    - tls_ms: TLS handshake, including CONNECT tunnel if https proxy is used
+    - ttfb_ms: time to first byte, waiting for response headers after request is sent
+    - download_ms: reading response body
+
+dns_ms, connect_ms and tls_ms are 0 if connection is reused from pool.
+
+Hostnames can be resolved with DNSResolver, which caches resolved addresses in process
+with TTL and maps hosts to static addresses, configured in testcase config:
+
+    config:
+        name: demo
+        dns_cache: 60       # cache resolved addresses for 60 seconds, true for default TTL
+        hosts:
+            api.example.com: 127.0.0.1
+
+"""
+
+import functools
+import socket
+
+from httprunner import exceptions
+from httprunner.cache import LRUCache
+from httprunner.compat import basestring, monotonic_time, numeric_types
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+# timing breakdown recorded in meta_data["stat"]
+TIMING_FIELDS = ("dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms")
+
+# default seconds to cache resolved addresses, used if dns_cache is true
+DEFAULT_DNS_CACHE_TTL = 60
+
+# resolved addresses shared by all resolvers in process, keyed by (host, port, family)
+dns_cache = LRUCache(maxsize=1024)
+
+
+def _elapsed_ms(start, end):
+    return (end - start) * 1000
+
+
+def _set_socket_options(sock, socket_options):
+    for opt in socket_options or []:
+        sock.setsockopt(*opt)
+
+
+def create_connection(addresses, timeout, source_address=None, socket_options=None):
+    """ connect to resolved addresses in order, the same as urllib3 create_connection
+        except that hostname has been resolved.
+
+    Args:
+        addresses (list): resolved addresses, result of socket.getaddrinfo
+        timeout (float): connect timeout in seconds
+
+    Returns:
+        socket: connected socket.
+
+    Raises:
+        socket.error: failed to connect to all addresses.
+
+    """
+    err = None
+    for family, socktype, proto, _, sockaddr in addresses:
+        sock = None
+        try:
+            sock = socket.socket(family, socktype, proto)
+            _set_socket_options(sock, socket_options)
+            if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+            return sock
+
+        except socket.error as ex:
+            err = ex
+            if sock is not None:
+                sock.close()
+
+    if err is not None:
+        raise err
+
+    raise socket.error("getaddrinfo returns an empty list")
+
+
+class DNSResolver(object):
+    """ resolve hostname with static host overrides, resolved addresses are cached
+        in process for ttl seconds.
+
+    Examples:
+        >>> resolver = DNSResolver(dns_cache=60, hosts={"api.example.com": "127.0.0.1"})
+        >>> resolver.resolve("api.example.com", 443)
+        [(<AddressFamily.AF_INET: 2>, <SocketKind.SOCK_STREAM: 1>, 6, '', ('127.0.0.1', 443))]
+
+    """
+    def __init__(self, dns_cache=None, hosts=None):
+        """
+        Args:
+            dns_cache (bool/float): seconds to cache resolved addresses, True for
+                DEFAULT_DNS_CACHE_TTL, None or False disables caching.
+            hosts (dict): static mapping of hostname to address, the same as /etc/hosts.
+
+        Raises:
+            exceptions.ParamsError: invalid dns_cache or hosts.
+
+        """
+        if dns_cache is True:
+            dns_cache = DEFAULT_DNS_CACHE_TTL
+        elif dns_cache is None or dns_cache is False:
+            dns_cache = 0
+        elif not isinstance(dns_cache, numeric_types) or dns_cache < 0:
+            raise exceptions.ParamsError(
+                "dns_cache should be true/false or seconds of TTL, given: {}".format(dns_cache))
+
+        hosts = hosts or {}
+        if not isinstance(hosts, dict) or \
+                not all(isinstance(address, basestring) for address in hosts.values()):
+            raise exceptions.ParamsError(
+                "hosts should be mapping of hostname to address, given: {}".format(hosts))
+
+        self.ttl = dns_cache
+        # hostname is case insensitive, trailing dot of FQDN is ignored
+        self.hosts = {
+            host.lower().rstrip("."): address
+            for host, address in hosts.items()
+        }
+
+    def resolve(self, host, port, family=socket.AF_UNSPEC):
+        """ resolve host to addresses, the same as socket.getaddrinfo for stream socket.
+        """
+        host = self.hosts.get(host.lower().rstrip("."), host)
+        if not self.ttl:
+            return socket.getaddrinfo(host, port, family, socket.SOCK_STREAM)
+
+        cache_key = (host, port, family)
+        hit, addresses = dns_cache.get(cache_key)
+        if not hit:
+            addresses = socket.getaddrinfo(host, port, family, socket.SOCK_STREAM)
+            dns_cache.set(cache_key, addresses, ttl=self.ttl)
+
+        return addresses
+
+
+class TimedConnectionMixin(object):
+    """ record timing of establishing connection, sending request and receiving response.
+    """
+    # timing of establishing connection, taken by the first response on the connection
+    connect_timings = None
+    connected_at = None
+    sent_at = None
+    received_at = None
+
+    def __init__(self, *args, **kwargs):
+        self.resolver = kwargs.pop("resolver", None)
+        super(TimedConnectionMixin, self).__init__(*args, **kwargs)
+
+    def resolve(self):
+        """ resolve hostname of connection, ipv6 address is used if available.
+        """
+        host = getattr(self, "_dns_host", self.host)
+        if host.startswith("["):
+            host = host.strip("[]")
+
+        if self.resolver is not None:
+            return self.resolver.resolve(host, self.port, allowed_gai_family())
+
+        return socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+
+    def _new_conn(self):
+        started_at = monotonic_time()
+        try:
+            addresses = self.resolve()
+            resolved_at = monotonic_time()
+            sock = create_connection(
+                addresses, self.timeout, self.source_address, self.socket_options)
+
+        except socket.timeout:
+            raise ConnectTimeoutError(
+                self,
+                "Connection to %s timed out. (connect timeout=%s)" % (self.host, self.timeout)
+            )
+
+        except socket.error as ex:
+            raise NewConnectionError(
+                self, "Failed to establish a new connection: %s" % ex)
+
+        self.connected_at = monotonic_time()
+        self.connect_timings = {
+            "dns_ms": _elapsed_ms(started_at, resolved_at),
+            "connect_ms": _elapsed_ms(resolved_at, self.connected_at),
+            "tls_ms": 0
+        }
+        return sock
+
+    def request(self, *args, **kwargs):
+        self.sent_at = self.received_at = None
+        super(TimedConnectionMixin, self).request(*args, **kwargs)
+        self.sent_at = monotonic_time()
+
+    def request_chunked(self, *args, **kwargs):
+        self.sent_at = self.received_at = None
+        super(TimedConnectionMixin, self).request_chunked(*args, **kwargs)
+        self.sent_at = monotonic_time()
+
+    def getresponse(self, *args, **kwargs):
+        response = super(TimedConnectionMixin, self).getresponse(*args, **kwargs)
+        self.received_at = monotonic_time()
+        return response
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+
+    def connect(self):
+        super(TimedHTTPSConnection, self).connect()
+        if self.connect_timings is not None:
+            self.connect_timings["tls_ms"] = _elapsed_ms(self.connected_at, monotonic_time())
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """ requests HTTPAdapter with instrumented connection pools, timing of each response
+        is attached to requests.Response and summarized with get_timing_stat.
+
+    Args:
+        resolver (instance): DNSResolver instance to resolve hostname of new connections,
+            default resolves with socket.getaddrinfo each time.
+
+    """
+    __attrs__ = HTTPAdapter.__attrs__ + ["resolver"]
+
+    def __init__(self, resolver=None, **kwargs):
+        # resolver is used by connection pools created in HTTPAdapter.__init__
+        self.resolver = resolver
+        super(TimedHTTPAdapter, self).__init__(**kwargs)
+
+    def _use_timed_pools(self, manager):
+        pool_kwargs = {"resolver": self.resolver} if self.resolver is not None else {}
+        manager.pool_classes_by_scheme = {
+            "http": functools.partial(TimedHTTPConnectionPool, **pool_kwargs),
+            "https": functools.partial(TimedHTTPSConnectionPool, **pool_kwargs)
+        }
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(TimedHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self._use_timed_pools(self.poolmanager)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super(TimedHTTPAdapter, self).proxy_manager_for(proxy, **proxy_kwargs)
+        if not proxy.lower().startswith("socks"):
+            # socks proxy manager has its own connection pools, timing is not recorded
+            self._use_timed_pools(manager)
+        return manager
+
+    def send(self, request, **kwargs):
+        started_at = monotonic_time()
+        response = super(TimedHTTPAdapter, self).send(request, **kwargs)
+        timings = getattr(response, "_httprunner_timings", None)
+        if timings is not None:
+            timings["started_at"] = started_at
+        return response
+
+    def build_response(self, req, resp):
+        response = super(TimedHTTPAdapter, self).build_response(req, resp)
+        connection = getattr(resp, "_connection", None)
+        if isinstance(connection, TimedConnectionMixin) and connection.received_at:
+            timings = {"dns_ms": 0, "connect_ms": 0, "tls_ms": 0}
+            # connection is established for this response, reused afterwards
+            timings.update(connection.connect_timings or {})
+            connection.connect_timings = None
+            timings["sent_at"] = connection.sent_at
+            timings["received_at"] = connection.received_at
+            response._httprunner_timings = timings
+
+        return response
+
+
+def get_timing_stat(response, finished_at=None):
+    """ get timing breakdown of response, phases of redirection hops are summed up.
+
+    Args:
+        response (instance): requests.Response instance
+        finished_at (float): monotonic time when response body is read,
+            None if response body is streamed.
+
+    Returns:
+        dict: timing breakdown in milliseconds, "N/A" if not recorded, e.g. connection
+            error, HTTP/2 transport or response body is streamed.
+
+            {
+                "dns_ms": 1.02,
+                "connect_ms": 0.35,
+                "tls_ms": 12.5,
+                "ttfb_ms": 20.07,
+                "download_ms": 0.46
+            }
+
+    """
+    hops = [
+        getattr(resp_obj, "_httprunner_timings", None)
+        for resp_obj in response.history + [response]
+    ]
+    if not all(hops):
+        return dict.fromkeys(TIMING_FIELDS, "N/A")
+
+    stat = dict.fromkeys(TIMING_FIELDS, 0)
+    for index, timings in enumerate(hops):
+        stat["dns_ms"] += timings["dns_ms"]
+        stat["connect_ms"] += timings["connect_ms"]
+        stat["tls_ms"] += timings["tls_ms"]
+        sent_at = timings["sent_at"] or timings.get("started_at", timings["received_at"])
+        stat["ttfb_ms"] += _elapsed_ms(sent_at, timings["received_at"])
+
+        # body of redirection is read before next hop is started
+        if index + 1 < len(hops):
+            downloaded_at = hops[index + 1].get("started_at")
+        else:
+            downloaded_at = finished_at
+
+        if downloaded_at is None or stat["download_ms"] == "N/A":
+            stat["download_ms"] = "N/A"
+        else:
+            stat["download_ms"] += _elapsed_ms(timings["received_at"], downloaded_at)
+
+    return {
+        field: value if value == "N/A" else round(value, 2)
+        for field, value in stat.items()
+    }
@@ -1,9 +1,17 @@
-from httprunner import exceptions, logger, parser, utils
+from httprunner import exceptions, logger, parser, response, utils
+from httprunner.compat import ChainMap
 
 
 class SessionContext(object):
     """ HttpRunner session, store runtime variables.
 
+        test variables are looked up in layered scopes, from top to bottom:
+            - test scope: variables updated in current test, e.g. request/response
+            - session scope: testcase config variables and extracted variables
+            - step scope: evaluated teststep variables
+        thus starting a test only evaluates teststep variables, session variables
+        are not copied.
+
     Examples:
         >>> variables = {"SECRET_KEY": "DebugTalk"}
         >>> context = SessionContext(variables)
@@ -19,7 +27,7 @@ class SessionContext(object):
         self.init_test_variables()
         self.validation_results = []
 
-    def init_test_variables(self, variables_mapping=None):
+    def init_test_variables(self, variables_mapping=None, variables_resolution=None):
         """ init test variables, called when each test(api) starts.
             variables_mapping will be evaluated first.
 
@@ -31,17 +39,43 @@ class SessionContext(object):
                     "data": '{"name": "user", "password": "123456"}',
                     "TOKEN": "debugtalk",
                 }
+            variables_resolution (parser.VariablesResolution): cached resolution orders of
+                teststep variables, prepared when parsing tests.
 
         """
         variables_mapping = variables_mapping or {}
         variables_mapping = utils.ensure_mapping_format(variables_mapping)
-        variables_mapping.update(self.session_variables_mapping)
-        parsed_variables_mapping = parser.parse_variables_mapping(variables_mapping)
 
-        self.test_variables_mapping = {}
         # priority: extracted variable > teststep variable
-        self.test_variables_mapping.update(parsed_variables_mapping)
-        self.test_variables_mapping.update(self.session_variables_mapping)
+        step_variables_mapping = {
+            var_name: value
+            for var_name, value in variables_mapping.items()
+            if var_name not in self.session_variables_mapping
+        }
+        resolution_order = None
+        if variables_resolution is not None:
+            shadowed_names = frozenset(
+                var_name
+                for var_name in variables_mapping
+                if var_name not in step_variables_mapping
+            )
+            resolution_order = variables_resolution.get_order(
+                shadowed_names,
+                step_variables_mapping,
+                self.session_variables_mapping
+            )
+
+        parsed_variables_mapping = parser.parse_variables_mapping(
+            step_variables_mapping,
+            self.session_variables_mapping,
+            resolution_order
+        )
+
+        self.test_variables_mapping = ChainMap(
+            {},
+            self.session_variables_mapping,
+            parsed_variables_mapping
+        )
 
     def update_test_variables(self, variable_name, variable_value):
         """ update test variables, these variables are only valid in the current test.
@@ -54,7 +88,11 @@ class SessionContext(object):
         """
         variables_mapping = utils.ensure_mapping_format(variables_mapping)
         self.session_variables_mapping.update(variables_mapping)
-        self.test_variables_mapping.update(self.session_variables_mapping)
+
+        # session variables override variables updated in current test
+        test_scope_variables_mapping = self.test_variables_mapping.maps[0]
+        for var_name in variables_mapping:
+            test_scope_variables_mapping.pop(var_name, None)
 
     def eval_content(self, content):
         """ evaluate content recursively, take effect on each variable and function in content.
@@ -72,6 +110,7 @@ class SessionContext(object):
                 3, dict or list, maybe containing variable/function reference, e.g. {"var": "$abc"}
                 4, string joined by delimiter. e.g. "status_code", "headers.content-type"
                 5, regex string, e.g. "LB[\d]*(.*)RB[\d]*"
+                formats 4/5 may have been compiled to response.Extractor when parsing.
 
             resp_obj: response object
 
@@ -127,6 +166,10 @@ class SessionContext(object):
             validator.update_args([check_value, expect_value])
 
             comparator = validator.func_name
+            if isinstance(check_item, response.Extractor):
+                # record field string of compiled extractor
+                check_item = check_item.field
+
             validator_dict = {
                 "comparator": comparator,
                 "check": check_item,
@@ -0,0 +1,230 @@
+# encoding: utf-8
+
+"""
+httprunner.http2
+~~~~~~~~~~~~~~~~
+
+Optional HTTP/2 transport, requests of HttpSession are sent with httpx and multiplexed
+over one connection for each host. This module requires Python 3.6+ and httpx, install with:
+
+    pip install httprunner[http2]
+
+HTTP2Adapter is a requests transport adapter, thus redirection, cookies, meta_data
+recording and ApiResponse error semantics are kept the same as HttpSession.
+
+Examples:
+    >>> from httprunner.client import HttpSession
+    >>> session = HttpSession(http2=True)
+
+    >>> # or mount the adapter explicitly, it can be shared by multiple sessions
+    >>> from httprunner.http2 import HTTP2Adapter
+    >>> session = HttpSession(http_adapter=HTTP2Adapter())
+
+"""
+
+import threading
+from http.client import HTTPMessage
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+
+import httpx
+from requests import Response
+from requests.adapters import DEFAULT_POOLSIZE, BaseAdapter
+from requests.cookies import extract_cookies_to_jar
+from requests.exceptions import (ConnectionError, ConnectTimeout, InvalidURL,
+                                 ProxyError, ReadTimeout, SSLError)
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# read file-like request body by chunks of 64KB
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# connection-specific headers are not allowed in HTTP/2
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"
+}
+
+
+class RawResponse(object):
+    """ file-like wrapper of httpx.Response, used as requests.Response.raw, thus response
+        body can be read at once or streamed with requests API.
+    """
+    def __init__(self, httpx_resp):
+        self._httpx_resp = httpx_resp
+        self._chunks = httpx_resp.iter_bytes()
+        self._buffer = b""
+        self.version = 20 if httpx_resp.http_version == "HTTP/2" else 11
+
+        # response headers used by requests to extract cookies
+        self._original_response = _OriginalResponse(httpx_resp.headers)
+
+    def stream(self, amt=None, decode_content=True):
+        if self._buffer:
+            yield self._buffer
+            self._buffer = b""
+
+        for chunk in self._chunks:
+            yield chunk
+
+    def read(self, amt=None, decode_content=True, **kwargs):
+        if amt is None:
+            content = self._buffer + b"".join(self._chunks)
+            self._buffer = b""
+            return content
+
+        while len(self._buffer) < amt:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+
+        content, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return content
+
+    def close(self):
+        self._httpx_resp.close()
+
+    release_conn = close
+
+
+class _OriginalResponse(object):
+    """ mimic http.client.HTTPResponse for requests.cookies.extract_cookies_to_jar
+    """
+    def __init__(self, headers):
+        self.msg = HTTPMessage()
+        for key, value in headers.multi_items():
+            self.msg[key] = value
+
+
+class HTTP2Adapter(BaseAdapter):
+    """ requests transport adapter sending requests with httpx, HTTP/2 is negotiated
+        with ALPN for https, falls back to HTTP/1.1 if server does not support it.
+
+        The adapter is thread-safe and can be shared by multiple sessions, cookies are
+        kept in requests session instead of httpx client.
+    """
+    def __init__(self, pool_connections=DEFAULT_POOLSIZE, pool_maxsize=DEFAULT_POOLSIZE):
+        """
+        Args:
+            pool_connections (int): number of host connections to cache.
+            pool_maxsize (int): max number of connections kept alive for each host.
+
+        """
+        super(HTTP2Adapter, self).__init__()
+        self.limits = httpx.Limits(
+            max_connections=None,
+            max_keepalive_connections=pool_connections * pool_maxsize
+        )
+        # httpx clients keyed by ssl and proxies options
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _get_client(self, verify, cert, proxies):
+        proxies = {
+            key if "://" in key else "{}://".format(key): value
+            for key, value in (proxies or {}).items()
+            if value
+        }
+        client_key = (
+            verify,
+            tuple(cert) if isinstance(cert, (tuple, list)) else cert,
+            tuple(sorted(proxies.items()))
+        )
+        with self._lock:
+            client = self._clients.get(client_key)
+            if client is None:
+                client = httpx.Client(
+                    http2=True,
+                    verify=verify,
+                    cert=cert,
+                    proxies=proxies or None,
+                    limits=self.limits,
+                    # cookies are handled by requests session, reject all in httpx client
+                    cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+                    trust_env=False
+                )
+                self._clients[client_key] = client
+
+        return client
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        """ send PreparedRequest with httpx, and build requests.Response.
+        """
+        client = self._get_client(verify, cert, proxies)
+
+        if isinstance(timeout, (tuple, list)):
+            connect_timeout, read_timeout = timeout
+            timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        else:
+            timeout = httpx.Timeout(timeout)
+
+        headers = [
+            (key, value)
+            for key, value in request.headers.items()
+            if key.lower() not in HOP_BY_HOP_HEADERS
+        ]
+        body = request.body
+        if hasattr(body, "read"):
+            # file-like object, e.g. MultipartEncoder for uploading files
+            body = iter(lambda: body.read(DEFAULT_CHUNK_SIZE), b"")
+
+        try:
+            httpx_request = httpx.Request(
+                request.method, request.url, headers=headers, content=body)
+            httpx_resp = client.send(
+                httpx_request,
+                stream=True,
+                allow_redirects=False,
+                timeout=timeout
+            )
+        except httpx.ConnectTimeout as ex:
+            raise ConnectTimeout(ex, request=request)
+        except httpx.TimeoutException as ex:
+            raise ReadTimeout(ex, request=request)
+        except httpx.ProxyError as ex:
+            raise ProxyError(ex, request=request)
+        except httpx.UnsupportedProtocol as ex:
+            raise InvalidURL(ex, request=request)
+        except httpx.ConnectError as ex:
+            if "SSL" in str(ex) or "CERTIFICATE" in str(ex):
+                raise SSLError(ex, request=request)
+            raise ConnectionError(ex, request=request)
+        except httpx.RequestError as ex:
+            raise ConnectionError(ex, request=request)
+
+        return self.build_response(request, httpx_resp, stream)
+
+    def build_response(self, request, httpx_resp, stream=False):
+        """ convert httpx.Response to requests.Response.
+        """
+        response = Response()
+        response.status_code = httpx_resp.status_code
+        response.reason = httpx_resp.reason_phrase
+        response.url = request.url
+        response.headers = CaseInsensitiveDict()
+        for key in httpx_resp.headers.keys():
+            # multiple headers with the same name are joined, same as requests
+            response.headers[key] = ", ".join(httpx_resp.headers.get_list(key))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = RawResponse(httpx_resp)
+        response.request = request
+        response.connection = self
+        extract_cookies_to_jar(response.cookies, request, response.raw)
+
+        if not stream:
+            try:
+                response._content = response.raw.read()
+            except httpx.RequestError as ex:
+                raise ConnectionError(ex, request=request)
+            finally:
+                response.raw.close()
+
+            response._content_consumed = True
+
+        return response
+
+    def close(self):
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
@@ -3,19 +3,21 @@ import copy
 import csv
 import importlib
 import io
-import json
 import os
 import sys
+import threading
+from multiprocessing.pool import ThreadPool
 
 import yaml
 from httprunner import built_in, exceptions, logger, parser, utils, validator
+from httprunner.cache import TestsCache
+from httprunner.compat import json
 
 try:
-    # PyYAML version >= 5.1
-    # ref: https://github.com/yaml/pyyaml/wiki/PyYAML-yaml.load(input)-Deprecation
-    yaml.warnings({'YAMLLoadWarning': False})
-except AttributeError:
-    pass
+    # libyaml C extension is several times faster than pure python loader
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 
 ###############################################################################
 ##   file loader
@@ -42,7 +44,7 @@ def load_yaml_file(yaml_file):
     """ load yaml file and check file content format
     """
     with io.open(yaml_file, 'r', encoding='utf-8') as stream:
-        yaml_content = yaml.load(stream)
+        yaml_content = yaml.load(stream, Loader=YamlLoader)
         _check_format(yaml_file, yaml_content)
         return yaml_content
 
@@ -105,10 +107,20 @@ def load_csv_file(csv_file):
     return csv_content_list
 
 
+loaded_files_recorder = threading.local()
+""" record loaded file paths in each thread if loaded_files_recorder.files is set to list,
+    used to check if cached tests are changed.
+"""
+
+
 def load_file(file_path):
     if not os.path.isfile(file_path):
         raise exceptions.FileNotFound("{} does not exist.".format(file_path))
 
+    recorded_files = getattr(loaded_files_recorder, "files", None)
+    if recorded_files is not None:
+        recorded_files.append(file_path)
+
     file_suffix = os.path.splitext(file_path)[1].lower()
     if file_suffix == '.json':
         return load_json_file(file_path)
@@ -164,6 +176,30 @@ def load_folder_files(folder_path, recursive=True):
     return file_list
 
 
+def load_files_concurrently(load_func, files_list, workers=1):
+    """ load files with thread pool, I/O latency of files loading will be overlapped.
+
+    Args:
+        load_func (function): function to load one file, e.g. load_file
+        files_list (list): files to be loaded
+        workers (int): number of threads, default 1 loads files in sequence.
+
+    Returns:
+        list: loaded contents, in the same order as files_list.
+
+    """
+    workers = min(workers, len(files_list))
+    if workers <= 1:
+        return [load_func(file_path) for file_path in files_list]
+
+    pool = ThreadPool(workers)
+    try:
+        return pool.map(load_func, files_list)
+    finally:
+        pool.close()
+        pool.join()
+
+
 def load_dot_env_file(dot_env_path):
     """ load .env file.
 
@@ -647,11 +683,12 @@ def load_test_file(path):
     return loaded_content
 
 
-def load_folder_content(folder_path):
+def load_folder_content(folder_path, workers=1):
     """ load api/testcases/testsuites definitions from folder.
 
     Args:
         folder_path (str): api/testcases/testsuites files folder.
+        workers (int): number of threads to load files concurrently.
 
     Returns:
         dict: api definition mapping.
@@ -666,17 +703,20 @@ def load_folder_content(folder_path):
     """
     items_mapping = {}
 
-    for file_path in load_folder_files(folder_path):
-        items_mapping[file_path] = load_file(file_path)
+    files_list = load_folder_files(folder_path)
+    loaded_items = load_files_concurrently(load_file, files_list, workers)
+    for file_path, items in zip(files_list, loaded_items):
+        items_mapping[file_path] = items
 
     return items_mapping
 
 
-def load_api_folder(api_folder_path):
+def load_api_folder(api_folder_path, workers=1):
     """ load api definitions from api folder.
 
     Args:
         api_folder_path (str): api files folder.
+        workers (int): number of threads to load api files concurrently.
 
             api file should be in the following format:
             [
@@ -713,7 +753,7 @@ def load_api_folder(api_folder_path):
     """
     api_definition_mapping = {}
 
-    api_items_mapping = load_folder_content(api_folder_path)
+    api_items_mapping = load_folder_content(api_folder_path, workers)
 
     for api_file_path, api_items in api_items_mapping.items():
         # TODO: add JSON schema validation
@@ -760,13 +800,14 @@ def locate_debugtalk_py(start_path):
     return debugtalk_path
 
 
-def load_project_tests(test_path, dot_env_path=None):
+def load_project_tests(test_path, dot_env_path=None, workers=1):
     """ load api, testcases, .env, debugtalk.py functions.
         api/testcases folder is relative to project_working_directory
 
     Args:
         test_path (str): test file/folder path, locate pwd from this path.
         dot_env_path (str): specified .env file path
+        workers (int): number of threads to load api files concurrently.
 
     Returns:
         dict: project loaded api/testcases definitions, environments and debugtalk.py functions.
@@ -805,11 +846,14 @@ def load_project_tests(test_path, dot_env_path=None):
     project_mapping["functions"] = debugtalk_functions
 
     # load api
-    tests_def_mapping["api"] = load_api_folder(os.path.join(project_working_directory, "api"))
+    tests_def_mapping["api"] = load_api_folder(
+        os.path.join(project_working_directory, "api"),
+        workers
+    )
     tests_def_mapping["PWD"] = project_working_directory
 
 
-def load_tests(path, dot_env_path=None):
+def load_tests(path, dot_env_path=None, cache=False, workers=1):
     """ load testcases from file path, extend and merge with api/testcase definitions.
 
     Args:
@@ -818,6 +862,10 @@ def load_tests(path, dot_env_path=None):
                 - absolute/relative file path
                 - absolute/relative folder path
         dot_env_path (str): specified .env file path
+        cache (bool): load parsed testcases/apis from cache in PWD/.httprunner_cache if
+            test file is unchanged, cached content is in "parsed_testcases" field.
+        workers (int): number of threads to load test files concurrently, loaded tests
+            are kept in the same order as loading in sequence.
 
     Returns:
         dict: tests mapping, include project_mapping and testcases.
@@ -870,17 +918,60 @@ def load_tests(path, dot_env_path=None):
     if not os.path.isabs(path):
         path = os.path.join(os.getcwd(), path)
 
-    load_project_tests(path, dot_env_path)
+    load_project_tests(path, dot_env_path, workers)
     tests_mapping = {
         "project_mapping": project_mapping
     }
 
+    if cache:
+        api_files = load_folder_files(os.path.join(project_mapping["PWD"], "api"))
+        tests_cache = TestsCache(project_mapping["PWD"], api_files)
+
     def __load_file_content(path):
+        if cache:
+            return __load_cached_file_content(path)
+
+        try:
+            return load_test_file(path)
+        except exceptions.FileFormatError:
+            logger.log_warning("Invalid test file format: {}".format(path))
+            return None
+
+    def __load_cached_file_content(path):
+        cached_content = tests_cache.load(path)
+        if cached_content:
+            return {
+                "path": path,
+                "type": cached_content["type"],
+                "parsed_testcases": cached_content["parsed_testcases"]
+            }
+
+        loaded_files = loaded_files_recorder.files = []
         try:
             loaded_content = load_test_file(path)
         except exceptions.FileFormatError:
             logger.log_warning("Invalid test file format: {}".format(path))
+            return None
+        finally:
+            loaded_files_recorder.files = None
 
+        # testsuite config variables and parameters are evaluated when parsing,
+        # thus only testcase and api are cached.
+        if loaded_content["type"] in ["testcase", "api"]:
+            loaded_content["cache"] = tests_cache.gen_cache_info(path, loaded_files)
+
+        return loaded_content
+
+    if os.path.isdir(path):
+        files_list = load_folder_files(path)
+    elif os.path.isfile(path):
+        files_list = [path]
+    else:
+        files_list = []
+
+    # load concurrently, and then add to tests_mapping in files order
+    loaded_contents = load_files_concurrently(__load_file_content, files_list, workers)
+    for loaded_content in loaded_contents:
         if not loaded_content:
             pass
         elif loaded_content["type"] == "testsuite":
@@ -890,12 +981,4 @@ def load_tests(path, dot_env_path=None):
         elif loaded_content["type"] == "api":
             tests_mapping.setdefault("apis", []).append(loaded_content)
 
-    if os.path.isdir(path):
-        files_list = load_folder_files(path)
-        for path in files_list:
-            __load_file_content(path)
-
-    elif os.path.isfile(path):
-        __load_file_content(path)
-
     return tests_mapping
@@ -5,8 +5,8 @@ import builtins
 import os
 import re
 
-from httprunner import exceptions, utils, validator
-from httprunner.compat import basestring, builtin_str, numeric_types, str
+from httprunner import cache, client, exceptions, response, utils, validator
+from httprunner.compat import ChainMap, basestring, builtin_str, numeric_types, str
 
 # use $$ to escape $ notation
 dolloar_regex_compile = re.compile(r"\$\$")
@@ -367,6 +367,8 @@ class LazyFunction(object):
             self.functions_mapping
         )
         self.func_name = self._func.__name__
+        # marked with @cacheable, see httprunner.cache.cacheable
+        self.cache_options = getattr(self._func, "httprunner_cacheable", None)
         self._args = prepare_lazy_data(
             function_meta.get("args", []),
             self.functions_mapping,
@@ -387,11 +389,57 @@ class LazyFunction(object):
                 raise exceptions.ParamsError("ENV() should only pass in one argument!")
             self._args = [self._args[0]]
 
+        self.__compile_args()
+
+    def __compile_args(self):
+        """ bind args and kwargs with their renderers, args and kwargs without
+            variables or functions are evaluated only once.
+        """
+        def make_renderer(value):
+            if isinstance(value, LazyString):
+                return value.to_value
+            else:
+                return lambda variables_mapping: parse_lazy_data(value, variables_mapping)
+
+        if any(isinstance(arg, LazyString) for arg in self._args) \
+                or any(isinstance(value, LazyString) for value in self._kwargs.values()):
+            self._static_args = None
+            self._args_renderers = [make_renderer(arg) for arg in self._args]
+            self._kwargs_renderers = [
+                (key, make_renderer(value))
+                for key, value in self._kwargs.items()
+            ]
+        else:
+            self._static_args = (self._args, self._kwargs)
+
+    def __eval_args(self, variables_mapping):
+        if self._static_args is not None:
+            return self._static_args
+
+        args = [render(variables_mapping) for render in self._args_renderers]
+        kwargs = {
+            key: render(variables_mapping)
+            for key, render in self._kwargs_renderers
+        }
+        return args, kwargs
+
+    def __getstate__(self):
+        # compiled renderers are not picklable, compile again when unpickled
+        state = self.__dict__.copy()
+        for key in ["_static_args", "_args_renderers", "_kwargs_renderers"]:
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__compile_args()
+
     def get_args(self):
         return self._args
 
     def update_args(self, args):
         self._args = args
+        self.__compile_args()
 
     def __repr__(self):
         args_string = ""
@@ -417,15 +465,39 @@ class LazyFunction(object):
         """ parse lazy data with evaluated variables mapping.
             Notice: variables_mapping should not contain any variable or function.
         """
-        variables_mapping = variables_mapping or {}
-        args = parse_lazy_data(self._args, variables_mapping)
-        kwargs = parse_lazy_data(self._kwargs, variables_mapping)
+        args, kwargs = self.__eval_args(variables_mapping or {})
         self.cache_key = self.__prepare_cache_key(args, kwargs)
         return self._func(*args, **kwargs)
 
+    def call(self, variables_mapping):
+        """ same as to_value, but cache_key is not prepared.
+        """
+        args, kwargs = self.__eval_args(variables_mapping)
+        return self._func(*args, **kwargs)
+
+    def call_with_cache(self, variables_mapping):
+        """ same as to_value, but reuse calling result with the same arguments
+            from function_results_cache.
+        """
+        args, kwargs = self.__eval_args(variables_mapping)
+        # LazyFunction is shared by threads, cache key of this call is kept local,
+        # self.cache_key is only assigned for compatibility and never read back
+        cache_key = self.__prepare_cache_key(args, kwargs)
+        self.cache_key = cache_key
+
+        hit, value = function_results_cache.get(cache_key)
+        if hit:
+            return value
 
-cached_functions_mapping = {}
-""" cached function calling results.
+        value = self._func(*args, **kwargs)
+        ttl = self.cache_options.get("ttl") if self.cache_options else None
+        function_results_cache.set(cache_key, value, ttl)
+        return value
+
+
+function_results_cache = cache.LRUCache(maxsize=1024)
+""" cached function calling results, for functions in cached config or marked with
+    @cacheable. keyed by function name and arguments.
 """
 
 
@@ -441,6 +513,9 @@ class LazyString(object):
         self.check_variables_set = check_variables_set or set()
         self.cached = cached
         self.__parse(raw_string)
+        self._render = self.__compile()
+        # referenced variables, including variables in function arguments
+        self.variables = set(regex_findall_variables(raw_string))
 
     def __parse(self, raw_string):
         """ parse raw string, replace function and variable with {}
@@ -521,33 +596,86 @@ class LazyString(object):
 
             self._string += escape_braces(remain_string)
 
-    def __repr__(self):
-        return "LazyString({})".format(self.raw_string)
+    def __compile(self):
+        """ compile parsed string to renderer function, which is called with
+            variables_mapping and returns evaluated value.
 
-    def to_value(self, variables_mapping=None):
-        """ parse lazy data with evaluated variables mapping.
-            Notice: variables_mapping should not contain any variable or function.
+            literal segments are folded into one format string once, variables are
+            fetched directly by name, and functions are bound with their lazy args.
         """
-        variables_mapping = variables_mapping or {}
+        if not self._args:
+            # constant string, e.g. "ABC$$DE{}" => "ABC$DE{}"
+            constant = self._string.format()
+            return lambda variables_mapping: constant
 
-        args = []
-        for arg in self._args:
+        if self._string == "{}":
+            # only one variable or function, keep its original type
+            arg = self._args[0]
             if isinstance(arg, LazyFunction):
-                if self.cached and arg.cache_key and arg.cache_key in cached_functions_mapping:
-                    value = cached_functions_mapping[arg.cache_key]
-                else:
-                    value = arg.to_value(variables_mapping)
-                    cached_functions_mapping[arg.cache_key] = value
-                args.append(value)
+                return self.__bind_function(arg)
+
+            def render_variable(variables_mapping):
+                try:
+                    return variables_mapping[arg]
+                except KeyError:
+                    raise exceptions.VariableNotFound("{} is not found.".format(arg))
+
+            return render_variable
+
+        string_format = self._string.format
+
+        if not any(isinstance(arg, LazyFunction) for arg in self._args):
+            # variables only, e.g. "/api/users/$uid?token=$token"
+            var_names = tuple(self._args)
+
+            def render_variables(variables_mapping):
+                try:
+                    return string_format(*[variables_mapping[name] for name in var_names])
+                except KeyError as ex:
+                    raise exceptions.VariableNotFound("{} is not found.".format(ex.args[0]))
+
+            return render_variables
+
+        def make_getter(arg):
+            if isinstance(arg, LazyFunction):
+                return self.__bind_function(arg)
             else:
-                # variable
-                var_value = get_mapping_variable(arg, variables_mapping)
-                args.append(var_value)
+                return lambda variables_mapping: get_mapping_variable(arg, variables_mapping)
 
-        if self._string == "{}":
-            return args[0]
+        getters = tuple(make_getter(arg) for arg in self._args)
+
+        def render(variables_mapping):
+            return string_format(*[getter(variables_mapping) for getter in getters])
+
+        return render
+
+    def __bind_function(self, lazy_func):
+        """ bind function with its lazy args, calling results are reused from
+            function_results_cache only if cached or function is cacheable.
+        """
+        if self.cached or lazy_func.cache_options:
+            return lazy_func.call_with_cache
         else:
-            return self._string.format(*args)
+            return lazy_func.call
+
+    def __getstate__(self):
+        # compiled renderer is not picklable, compile again when unpickled
+        state = self.__dict__.copy()
+        del state["_render"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._render = self.__compile()
+
+    def __repr__(self):
+        return "LazyString({})".format(self.raw_string)
+
+    def to_value(self, variables_mapping=None):
+        """ parse lazy data with evaluated variables mapping.
+            Notice: variables_mapping should not contain any variable or function.
+        """
+        return self._render(variables_mapping or {})
 
 
 def prepare_lazy_data(content, functions_mapping=None, check_variables_set=None, cached=False):
@@ -619,6 +747,10 @@ def parse_lazy_data(content, variables_mapping=None):
         variables_mapping = utils.ensure_mapping_format(variables_mapping or {})
         return content.to_value(variables_mapping)
 
+    elif isinstance(content, client.PreparedJSON):
+        # static json body, serialized when parsing tests
+        return content
+
     elif isinstance(content, (list, set, tuple)):
         return [
             parse_lazy_data(item, variables_mapping)
@@ -669,12 +801,105 @@ def extract_variables(content):
         return variables
 
     elif isinstance(content, LazyString):
-        return set(regex_findall_variables(content.raw_string))
+        return content.variables
 
     return set()
 
 
-def parse_variables_mapping(variables_mapping):
+def get_variables_resolution_order(variables_mapping, evaluated_variables_mapping=None):
+    """ sort variables topologically by references, each variable is placed after
+        all the variables it references.
+
+    Args:
+        variables_mapping (dict): prepared variables mapping
+            {
+                "varA": LazyString(123$varB),
+                "varB": LazyString(456$varC),
+                "varC": 789
+            }
+        evaluated_variables_mapping (dict): variables already evaluated, which can be
+            referenced by variables_mapping.
+
+    Returns:
+        list: variable names in resolution order, e.g. ["varC", "varB", "varA"]
+
+    Raises:
+        exceptions.VariableNotFound: reference variable is not defined, or variables
+            reference each other circularly, e.g. "varA -> varB -> varA".
+
+    """
+    evaluated_variables_mapping = evaluated_variables_mapping or {}
+    dependencies = {
+        var_name: extract_variables(value)
+        for var_name, value in variables_mapping.items()
+    }
+    resolution_order = []
+    resolved = set()
+    visiting = []
+
+    def visit(var_name):
+        if var_name in resolved:
+            return
+
+        if var_name in visiting:
+            cycle_path = visiting[visiting.index(var_name):] + [var_name]
+            raise exceptions.VariableNotFound(
+                "circular reference: {}".format(" -> ".join(cycle_path)))
+
+        visiting.append(var_name)
+        for ref_var_name in sorted(dependencies[var_name]):
+            if ref_var_name in dependencies:
+                visit(ref_var_name)
+            elif ref_var_name not in evaluated_variables_mapping:
+                raise exceptions.VariableNotFound(
+                    "{} is not found, referenced by {}".format(ref_var_name, var_name))
+
+        visiting.pop()
+        resolved.add(var_name)
+        resolution_order.append(var_name)
+
+    for var_name in variables_mapping:
+        visit(var_name)
+
+    return resolution_order
+
+
+class VariablesResolution(object):
+    """ resolution orders of prepared teststep variables, each order is computed once
+        for the set of variable names shadowed by session variables, and reused when
+        the teststep is run again.
+
+    Examples:
+        >>> resolution = VariablesResolution()
+        >>> resolution.get_order(frozenset(), step_variables_mapping, session_variables_mapping)
+        ["varC", "varB", "varA"]
+
+    """
+    def __init__(self):
+        self.orders = {}
+
+    def get_order(self, shadowed_names, variables_mapping, evaluated_variables_mapping=None):
+        """ get resolution order of variables_mapping, see get_variables_resolution_order.
+
+        Args:
+            shadowed_names (frozenset): teststep variable names shadowed by session variables,
+                which are excluded from variables_mapping.
+
+        """
+        try:
+            return self.orders[shadowed_names]
+        except KeyError:
+            resolution_order = get_variables_resolution_order(
+                variables_mapping, evaluated_variables_mapping)
+            self.orders[shadowed_names] = resolution_order
+            return resolution_order
+
+    def __repr__(self):
+        return "VariablesResolution({})".format(len(self.orders))
+
+
+def parse_variables_mapping(variables_mapping, evaluated_variables_mapping=None,
+        resolution_order=None):
     """ eval each prepared variable and function in variables_mapping.
 
     Args:
@@ -688,6 +913,10 @@ def parse_variables_mapping(variables_mapping):
                 "c": {"key": LazyString($b)},
                 "d": [LazyString($a), 3]
             }
+        evaluated_variables_mapping (dict): variables already evaluated, which can be
+            referenced by variables_mapping but are not included in result.
+        resolution_order (list): precomputed resolution order of variables_mapping,
+            computed with get_variables_resolution_order if not specified.
 
     Returns:
         dict: parsed variables_mapping should not contain any variable or function.
@@ -702,48 +931,101 @@ def parse_variables_mapping(variables_mapping):
             }
 
     """
-    run_times = 0
     parsed_variables_mapping = {}
+    if evaluated_variables_mapping:
+        referable_variables_mapping = ChainMap(
+            parsed_variables_mapping, evaluated_variables_mapping)
+    else:
+        referable_variables_mapping = parsed_variables_mapping
+
+    if resolution_order is None:
+        resolution_order = get_variables_resolution_order(
+            variables_mapping, evaluated_variables_mapping)
+
+    for var_name in resolution_order:
+        parsed_variables_mapping[var_name] = parse_lazy_data(
+            variables_mapping[var_name],
+            referable_variables_mapping
+        )
 
-    while len(parsed_variables_mapping) != len(variables_mapping):
-        for var_name in variables_mapping:
+    return parsed_variables_mapping
 
-            run_times += 1
-            if run_times > len(variables_mapping) * 4:
-                not_found_variables = {
-                    key: variables_mapping[key]
-                    for key in variables_mapping
-                    if key not in parsed_variables_mapping
-                }
-                raise exceptions.VariableNotFound(not_found_variables)
 
-            if var_name in parsed_variables_mapping:
-                continue
+def _compile_extractors(test_dict):
+    """ compile extractors and validators' check items of prepared teststep to Extractor,
+        thus extract fields are not parsed again each time teststep is run.
 
-            value = variables_mapping[var_name]
-            variables = extract_variables(value)
-
-            # check if reference variable itself
-            if var_name in variables:
-                # e.g.
-                # var_name = "token"
-                # variables_mapping = {"token": LazyString($token)}
-                # var_name = "key"
-                # variables_mapping = {"key": [LazyString($key), 2]}
-                raise exceptions.VariableNotFound(var_name)
-
-            if variables:
-                # reference other variable, or function call with other variable
-                # e.g. {"varA": "123$varB", "varB": "456$varC"}
-                # e.g. {"varC": "${sum_two($a, $b)}"}
-                if any([_var_name not in parsed_variables_mapping for _var_name in variables]):
-                    # reference variable not parsed
-                    continue
+    Args:
+        test_dict (dict): prepared teststep, validators have been converted to LazyFunction.
+
+    """
+    extractors = test_dict.get("extract")
+    if isinstance(extractors, list):
+        test_dict["extract"] = [
+            {
+                key: response.compile_extractor(field)
+                for key, field in extractor.items()
+            }
+            for extractor in extractors
+        ]
+    elif isinstance(extractors, dict):
+        test_dict["extract"] = {
+            key: response.compile_extractor(field)
+            for key, field in extractors.items()
+        }
 
-            parsed_value = parse_lazy_data(value, parsed_variables_mapping)
-            parsed_variables_mapping[var_name] = parsed_value
+    for _validator in test_dict.get("validate", []):
+        check_item, expect_item = _validator.get_args()
+        if isinstance(check_item, basestring):
+            _validator.update_args([response.Extractor(check_item), expect_item])
 
-    return parsed_variables_mapping
+
+def is_static_data(content):
+    """ check if prepared content is static, i.e. no variable or function in content,
+        thus it is evaluated to the same value each time.
+    """
+    if isinstance(content, (LazyString, LazyFunction)):
+        return False
+
+    elif isinstance(content, dict):
+        return all(
+            is_static_data(key) and is_static_data(value)
+            for key, value in content.items()
+        )
+
+    elif isinstance(content, (list, set, tuple)):
+        return all(is_static_data(item) for item in content)
+
+    return True
+
+
+def _prepare_static_body(test_dict):
+    """ serialize static json body of prepared teststep request to PreparedJSON, thus
+        it is neither evaluated nor serialized again each time teststep is run.
+
+        json body is kept as it is if teststep has hooks, because hooks may modify
+        $request in place, e.g. ${modify_request_json($request, android)}.
+
+    Args:
+        test_dict (dict): prepared teststep with request.
+
+    """
+    request = test_dict["request"]
+    json_body = request.get("json")
+    if not isinstance(json_body, dict) or isinstance(json_body, client.PreparedJSON):
+        return
+
+    if test_dict.get("setup_hooks") or test_dict.get("teardown_hooks"):
+        return
+
+    if not is_static_data(json_body):
+        return
+
+    try:
+        request["json"] = client.PreparedJSON(json_body)
+    except (TypeError, ValueError):
+        # not json serializable, serialized by requests when sending request
+        pass
 
 
 def _extend_with_api(test_dict, api_def_dict):
@@ -1008,6 +1290,12 @@ def __prepare_testcase_tests(tests, config, project_mapping, session_variables_s
             functions,
             teststep_variables_set
         )
+        if "request" in prepared_test_dict:
+            _compile_extractors(prepared_test_dict)
+            _prepare_static_body(prepared_test_dict)
+            # variables resolution order is computed once and reused on each run
+            prepared_test_dict["variables_resolution"] = VariablesResolution()
+
         prepared_testcase_tests.append(prepared_test_dict)
 
     return prepared_testcase_tests
@@ -1244,12 +1532,27 @@ def parse_tests(tests_mapping):
 
         elif test_type == "testcases":
             for testcase in tests_mapping["testcases"]:
+                if "parsed_testcases" in testcase:
+                    # loaded from cache
+                    testcases.extend(testcase["parsed_testcases"])
+                    continue
+
+                cache_info = testcase.pop("cache", None)
                 parsed_testcase = _parse_testcase(testcase, project_mapping)
                 testcases.append(parsed_testcase)
 
+                if cache_info:
+                    cache.dump_parsed_tests(cache_info, "testcase", [parsed_testcase])
+
         elif test_type == "apis":
             # encapsulate api as a testcase
             for api_content in tests_mapping["apis"]:
+                if "parsed_testcases" in api_content:
+                    # loaded from cache
+                    testcases.extend(api_content["parsed_testcases"])
+                    continue
+
+                cache_info = api_content.pop("cache", None)
                 testcase = {
                     "config": {
                         "name": api_content.get("name")
@@ -1259,4 +1562,7 @@ def parse_tests(tests_mapping):
                 parsed_testcase = _parse_testcase(testcase, project_mapping)
                 testcases.append(parsed_testcase)
 
+                if cache_info:
+                    cache.dump_parsed_tests(cache_info, "api", [parsed_testcase])
+
     return testcases
@@ -1,18 +1,46 @@
 # encoding: utf-8
 
+import gzip
 import io
 import os
 import platform
+import re
+import tempfile
+import threading
 import time
 import unittest
 from base64 import b64encode
 from collections import Iterable
 from datetime import datetime
+from xml.etree import ElementTree
 
 import requests
-from httprunner import __version__, loader, logger
+from httprunner import __version__, loader, logger, utils
 from httprunner.compat import basestring, bytes, json, numeric_types
-from jinja2 import Template, escape
+from jinja2 import (BaseLoader, Environment, FileSystemBytecodeCache, TemplateNotFound,
+                    escape)
+
+# default html report template
+DEFAULT_REPORT_TEMPLATE = os.path.join(
+    os.path.abspath(os.path.dirname(__file__)),
+    "templates",
+    "report_template.html"
+)
+# max length of each request/response body in report, longer bodies are truncated
+DEFAULT_BODY_LIMIT = 100 * 1024
+
+# request/response details of records in report, all or failures only
+REPORT_DETAILS = ("all", "failures")
+
+# records with these status keep full details if report details is failures
+FAILED_STATUSES = ("failure", "error", "UnexpectedSuccess")
+
+# default index page template of lazily loaded html report
+DEFAULT_LAZY_REPORT_TEMPLATE = os.path.join(
+    os.path.abspath(os.path.dirname(__file__)),
+    "templates",
+    "report_lazy_template.html"
+)
 
 
 def get_platform():
@@ -88,24 +116,71 @@ def aggregate_stat(origin_stat, new_stat):
             origin_stat[key] += new_stat[key]
 
 
-def stringify_summary(summary):
+def stringify_summary(summary, body_limit=DEFAULT_BODY_LIMIT, details="all"):
     """ stringify summary, in order to dump json file and generate html report.
+        testcase summaries in ResultStore have been stringified when stored.
+
+    Args:
+        summary (dict): summary of test run.
+        body_limit (int): max length of each request/response body, longer bodies are
+            truncated with utils.omit_long_data, None for no limit.
+        details (str): request/response details of records, one of REPORT_DETAILS.
+            all keeps details of all records, failures keeps details of failed records
+            only, and passed records are reduced to url, method and status code.
+
     """
+    if isinstance(summary["details"], ResultStore):
+        return
+
     for index, suite_summary in enumerate(summary["details"]):
+        stringify_testcase_summary(suite_summary, index, body_limit, details)
+
+
+def stringify_testcase_summary(testcase_summary, index, body_limit=DEFAULT_BODY_LIMIT,
+        details="all"):
+    """ stringify records of testcase summary, testcase is named by index if not specified.
+    """
+    if not testcase_summary.get("name"):
+        testcase_summary["name"] = "testcase {}".format(index)
+
+    stringify_records(testcase_summary.get("records"), body_limit, details)
 
-        if not suite_summary.get("name"):
-            suite_summary["name"] = "testcase {}".format(index)
 
-        for record in suite_summary.get("records"):
-            meta_datas = record['meta_datas']
-            __stringify_meta_datas(meta_datas)
-            meta_datas_expanded = []
-            __expand_meta_datas(meta_datas, meta_datas_expanded)
-            record["meta_datas_expanded"] = meta_datas_expanded
-            record["response_time"] = __get_total_response_time(meta_datas_expanded)
+def stringify_records(records, body_limit=DEFAULT_BODY_LIMIT, details="all"):
+    """ stringify records of testcase summary.
+    """
+    for record in records:
+        meta_datas = record['meta_datas']
+        summarized = details == "failures" and record["status"] not in FAILED_STATUSES
+        __stringify_meta_datas(meta_datas, body_limit, summarized)
+        meta_datas_expanded = []
+        __expand_meta_datas(meta_datas, meta_datas_expanded)
+        record["meta_datas_expanded"] = meta_datas_expanded
+        record["response_time"] = __get_total_response_time(meta_datas_expanded)
+
+
+def __omit_long_data(value, body_limit):
+    if body_limit is None:
+        return value
+
+    return utils.omit_long_data(value, body_limit)
+
+
+def __omit_long_dict(value, body_limit):
+    """ dict body is kept as is if not longer than body_limit in json format,
+        otherwise it is truncated and escaped as string.
+    """
+    if body_limit is None:
+        return value
+
+    value_json = json.dumps(value, ensure_ascii=False, default=str)
+    if len(value_json) <= body_limit:
+        return value
+
+    return escape(utils.omit_long_data(value_json, body_limit))
 
 
-def __stringify_request(request_data):
+def __stringify_request(request_data, body_limit=DEFAULT_BODY_LIMIT):
     """ stringfy HTTP request data
 
     Args:
@@ -136,15 +211,19 @@ def __stringify_request(request_data):
     for key, value in request_data.items():
 
         if isinstance(value, list):
-            value = json.dumps(value, indent=2, ensure_ascii=False)
+            value = __omit_long_data(json.dumps(value, indent=2, ensure_ascii=False), body_limit)
 
         elif isinstance(value, bytes):
             try:
                 encoding = "utf-8"
-                value = escape(value.decode(encoding))
+                value = escape(__omit_long_data(value.decode(encoding), body_limit))
             except UnicodeDecodeError:
                 pass
 
+        elif isinstance(value, dict) and key not in ["headers", "cookies"]:
+            # json or form body
+            value = __omit_long_dict(value, body_limit)
+
         elif not isinstance(value, (basestring, numeric_types, Iterable)):
             # class instance, e.g. MultipartEncoder()
             value = repr(value)
@@ -155,7 +234,7 @@ def __stringify_request(request_data):
         request_data[key] = value
 
 
-def __stringify_response(response_data):
+def __stringify_response(response_data, body_limit=DEFAULT_BODY_LIMIT):
     """ stringfy HTTP response data
 
     Args:
@@ -185,7 +264,7 @@ def __stringify_response(response_data):
     for key, value in response_data.items():
 
         if isinstance(value, list):
-            value = json.dumps(value, indent=2, ensure_ascii=False)
+            value = __omit_long_data(json.dumps(value, indent=2, ensure_ascii=False), body_limit)
 
         elif isinstance(value, bytes):
             try:
@@ -194,16 +273,23 @@ def __stringify_response(response_data):
                     encoding = "utf-8"
 
                 if key == "content" and "image" in response_data["content_type"]:
-                    # display image
-                    value = "data:{};base64,{}".format(
-                        response_data["content_type"],
-                        b64encode(value).decode(encoding)
-                    )
+                    if body_limit is not None and len(value) > body_limit:
+                        value = "image content of {} bytes (OMITTED)".format(len(value))
+                    else:
+                        # display image
+                        value = "data:{};base64,{}".format(
+                            response_data["content_type"],
+                            b64encode(value).decode(encoding)
+                        )
                 else:
-                    value = escape(value.decode(encoding))
+                    value = escape(__omit_long_data(value.decode(encoding), body_limit))
             except UnicodeDecodeError:
                 pass
 
+        elif isinstance(value, dict) and key not in ["headers", "cookies"]:
+            # json or form body
+            value = __omit_long_dict(value, body_limit)
+
         elif not isinstance(value, (basestring, numeric_types, Iterable)):
             # class instance, e.g. MultipartEncoder()
             value = repr(value)
@@ -259,32 +345,223 @@ def __get_total_response_time(meta_datas_expanded):
         return "N/A"
 
 
-def __stringify_meta_datas(meta_datas):
+def __summarize_req_resp(req_resp):
+    """ reduce request and response data to summary, the same as record_level summary.
+    """
+    return {
+        "request": {
+            key: req_resp["request"][key]
+            for key in ["url", "method"]
+            if key in req_resp["request"]
+        },
+        "response": {
+            key: req_resp["response"][key]
+            for key in ["url", "status_code", "reason", "content_type"]
+            if key in req_resp["response"]
+        }
+    }
+
+
+def __stringify_meta_datas(meta_datas, body_limit=DEFAULT_BODY_LIMIT, summarized=False):
 
     if isinstance(meta_datas, list):
         for _meta_data in meta_datas:
-            __stringify_meta_datas(_meta_data)
+            __stringify_meta_datas(_meta_data, body_limit, summarized)
     elif isinstance(meta_datas, dict):
+        if summarized:
+            meta_datas["data"] = [
+                __summarize_req_resp(data)
+                for data in meta_datas["data"]
+            ]
+
         data_list = meta_datas["data"]
         for data in data_list:
-            __stringify_request(data["request"])
-            __stringify_response(data["response"])
+            __stringify_request(data["request"], body_limit)
+            __stringify_response(data["response"], body_limit)
+
+
+class ResultStore(object):
+    """ on-disk store of stringified testcase summaries. Testcase summaries are appended in
+        JSON lines format once testcases complete, and loaded back one at a time when
+        iterated, thus memory usage is flat regardless of the number of testcases.
+
+        ResultStore is used as summary["details"] when HttpRunner(stream_report=True).
+
+    Examples:
+        >>> result_store = ResultStore()
+        >>> result_store.append(testcase_summary)
+        >>> for testcase_summary in result_store:
+                print(testcase_summary["name"])
+        >>> result_store.close()
+
+    """
+    def __init__(self, dir=None):
+        """
+        Args:
+            dir (str): directory of temporary store file, default is system temp directory.
+                store file is removed when closed.
+
+        """
+        self._file = tempfile.TemporaryFile(mode="w+b", suffix=".jsonl", dir=dir)
+        # offset of each testcase summary in store file
+        self._offsets = []
+
+    def append(self, testcase_summary):
+        """ append stringified testcase summary, objects can not be serialized to json are
+            stored as strings.
+        """
+        line = json.dumps(testcase_summary, default=str)
+        self._file.seek(0, os.SEEK_END)
+        self._offsets.append(self._file.tell())
+        self._file.write(line.encode("utf-8") + b"\n")
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        self._file.seek(self._offsets[index])
+        return json.loads(self._file.readline().decode("utf-8"))
+
+    def __iter__(self):
+        for index in range(len(self._offsets)):
+            yield self[index]
+
+    def close(self):
+        self._file.close()
+
+
+def dump_summary(summary, file_path):
+    """ dump summary to json file, testcase summaries are written one at a time, thus
+        details in ResultStore are not loaded in memory as a whole.
+    """
+    with io.open(file_path, "w", encoding="utf-8") as fp:
+        fp.write(u"{\n")
+        for key, value in summary.items():
+            if key == "details":
+                continue
+            fp.write(u"    {}: {},\n".format(json.dumps(key), json.dumps(value, default=str)))
+
+        fp.write(u'    "details": [')
+        for index, testcase_summary in enumerate(summary["details"]):
+            fp.write(u",\n" if index else u"\n")
+            fp.write(u"        {}".format(json.dumps(testcase_summary, default=str)))
+
+        fp.write(u"\n    ]\n}\n")
+
+    logger.log_info("dump summary file: {}".format(file_path))
+
+
+class ReportTemplateLoader(BaseLoader):
+    """ load report template by file path, template is reloaded once its mtime changes.
+    """
+    def get_source(self, environment, template):
+        template_path = os.path.abspath(template)
+        try:
+            mtime = os.path.getmtime(template_path)
+            with io.open(template_path, "r", encoding="utf-8") as f:
+                source = f.read()
+        except (IOError, OSError):
+            raise TemplateNotFound(template)
+
+        def uptodate():
+            try:
+                return os.path.getmtime(template_path) == mtime
+            except OSError:
+                return False
+
+        return source, template_path, uptodate
+
 
+# shared by default and custom report templates, created on first rendering
+_template_environment = None
 
-def render_html_report(summary, report_template=None, report_dir=None):
+
+def get_template_environment():
+    """ get jinja environment of report templates. Compiled templates are cached in memory
+        and checked with file mtime, bytecode is cached on disk in system temp directory,
+        thus templates are not compiled again across runs unless modified.
+    """
+    global _template_environment
+    if _template_environment is None:
+        try:
+            bytecode_cache = FileSystemBytecodeCache(pattern="__httprunner_report_%s.cache")
+        except (OSError, RuntimeError) as ex:
+            # temp directory is not writable
+            logger.log_debug("report template bytecode cache is disabled: {}".format(ex))
+            bytecode_cache = None
+
+        _template_environment = Environment(
+            loader=ReportTemplateLoader(),
+            extensions=["jinja2.ext.loopcontrols"],
+            bytecode_cache=bytecode_cache,
+            auto_reload=True
+        )
+
+    return _template_environment
+
+
+def get_report_template(report_template=None):
+    """ get compiled report template from template cache.
+
+    Args:
+        report_template (str): report template path, default template is used if not specified.
+
+    Returns:
+        jinja2.Template: compiled report template.
+
+    """
+    report_template = os.path.abspath(report_template or DEFAULT_REPORT_TEMPLATE)
+    return get_template_environment().get_template(report_template)
+
+
+def dump_report_chunk(chunk_path, suite_index, records):
+    """ dump records of testcase to report chunk, which is a script passing gzip compressed
+        json of records in base64 to httprunnerReport.loadChunk, thus chunks can be loaded
+        on demand by index page opened from local file.
+    """
+    content = json.dumps(records, default=str).encode("utf-8")
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as f:
+        f.write(content)
+
+    with io.open(chunk_path, "w", encoding="utf-8") as f:
+        f.write(u'httprunnerReport.loadChunk({}, "{}");\n'.format(
+            suite_index, b64encode(buffer.getvalue()).decode("ascii")))
+
+
+def __iter_lazy_details(details, chunks_dir):
+    """ dump records of each testcase to report chunk, and yield testcase summary with
+        aggregates only, records are replaced with relative path of chunk.
+    """
+    chunks_dir_name = os.path.basename(chunks_dir)
+    for suite_index, testcase_summary in enumerate(details, 1):
+        chunk_name = "testcase_{}.js".format(suite_index)
+        dump_report_chunk(
+            os.path.join(chunks_dir, chunk_name),
+            suite_index,
+            testcase_summary["records"]
+        )
+        lazy_testcase_summary = {
+            key: value
+            for key, value in testcase_summary.items()
+            if key != "records"
+        }
+        lazy_testcase_summary["chunk"] = "{}/{}".format(chunks_dir_name, chunk_name)
+        yield lazy_testcase_summary
+
+
+def render_html_report(summary, report_template=None, report_dir=None, lazy=False):
     """ render html report with specified report name and template
 
     Args:
         report_template (str): specify html report template path
         report_dir (str): specify html report save directory
+        lazy (bool): render index page with aggregates only, records of each testcase are
+            dumped to gzip compressed chunks in report_dir/<start_at>/ and loaded on demand.
 
     """
     if not report_template:
-        report_template = os.path.join(
-            os.path.abspath(os.path.dirname(__file__)),
-            "templates",
-            "report_template.html"
-        )
+        report_template = DEFAULT_LAZY_REPORT_TEMPLATE if lazy else DEFAULT_REPORT_TEMPLATE
         logger.log_debug("No html report template specified, use default.")
     else:
         logger.log_info("render with html report template: {}".format(report_template))
@@ -300,13 +577,18 @@ def render_html_report(summary, report_template=None, report_dir=None):
 
     report_path = os.path.join(report_dir, "{}.html".format(start_at_timestamp))
 
-    with io.open(report_template, "r", encoding='utf-8') as fp_r:
-        template_content = fp_r.read()
-        with io.open(report_path, 'w', encoding='utf-8') as fp_w:
-            rendered_content = Template(
-                template_content,
-                extensions=["jinja2.ext.loopcontrols"]
-            ).render(summary)
+    if lazy:
+        chunks_dir = os.path.join(report_dir, str(start_at_timestamp))
+        if not os.path.isdir(chunks_dir):
+            os.makedirs(chunks_dir)
+
+        summary = dict(summary)
+        summary["details"] = __iter_lazy_details(summary["details"], chunks_dir)
+
+    template = get_report_template(report_template)
+    with io.open(report_path, 'w', encoding='utf-8') as fp_w:
+        # rendered incrementally, details may be loaded one at a time from ResultStore
+        for rendered_content in template.generate(summary):
             fp_w.write(rendered_content)
 
     logger.log_info("Generated Html report: {}".format(report_path))
@@ -314,29 +596,188 @@ def render_html_report(summary, report_template=None, report_dir=None):
     return report_path
 
 
+class ResultSink(object):
+    """ base class of result sinks, which are fed by HtmlTestResult as tests complete,
+        thus results can be written in machine-readable formats during the run.
+        result sinks may be shared by testcases running concurrently, and should be
+        closed by its creator after all tests are run.
+    """
+    def add_record(self, testcase_name, record):
+        """ called once each test of testcase completes.
+
+        Args:
+            testcase_name (str): name of testcase which the test belongs to.
+            record (dict): test record, the same as records in testcase summary.
+
+                {
+                    "name": "get token",
+                    "status": "success",
+                    "attachment": "",
+                    "duration": 0.035,
+                    "meta_datas": {...}
+                }
+
+        """
+        pass
+
+    def end_testcase(self, testcase_name, records):
+        """ called once all tests of testcase complete.
+        """
+        pass
+
+    def close(self):
+        pass
+
+
+class JSONLinesSink(ResultSink):
+    """ write result of each test as one line of JSON once it completes.
+
+    Examples:
+        >>> sink = JSONLinesSink("results.jsonl")
+        >>> HttpRunner(result_sinks=[sink]).run("tests/testcases")
+        >>> sink.close()
+
+        results.jsonl:
+
+            {"testcase": "create user", "name": "get token", "status": "success", ...}
+
+    """
+    def __init__(self, file_path):
+        self._lock = threading.Lock()
+        self._file = io.open(file_path, "w", encoding="utf-8")
+
+    def add_record(self, testcase_name, record):
+        line = json.dumps({
+            "testcase": testcase_name,
+            "name": record["name"],
+            "status": record["status"],
+            "duration": record.get("duration"),
+            "attachment": record["attachment"]
+        }, default=str)
+        with self._lock:
+            self._file.write(u"{}\n".format(line))
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+# characters not allowed in XML 1.0
+_invalid_xml_chars_regex = re.compile(u"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# JUnit element of each unsuccessful test status
+_junit_status_elements = {
+    "failure": "failure",
+    "UnexpectedSuccess": "failure",
+    "error": "error",
+    "skipped": "skipped",
+    "ExpectedFailure": "skipped"
+}
+
+
+class JUnitXMLSink(ResultSink):
+    """ write results in JUnit XML format, each testcase is written as one testsuite element
+        once all its tests complete.
+
+    Examples:
+        >>> sink = JUnitXMLSink("junit.xml")
+        >>> HttpRunner(result_sinks=[sink]).run("tests/testcases")
+        >>> sink.close()
+
+    """
+    def __init__(self, file_path):
+        self._lock = threading.Lock()
+        self._file = io.open(file_path, "w", encoding="utf-8")
+        self._file.write(u'<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n')
+        self._file.flush()
+
+    def end_testcase(self, testcase_name, records):
+        testcase_name = _invalid_xml_chars_regex.sub(u"", testcase_name)
+        testsuite = ElementTree.Element("testsuite", {"name": testcase_name})
+        counts = {"failure": 0, "error": 0, "skipped": 0}
+        for record in records:
+            testcase = ElementTree.SubElement(testsuite, "testcase", {
+                "name": _invalid_xml_chars_regex.sub(u"", u"{}".format(record["name"])),
+                "classname": testcase_name,
+                "time": "{:.3f}".format(record.get("duration", 0))
+            })
+            element_name = _junit_status_elements.get(record["status"])
+            if not element_name:
+                continue
+
+            counts[element_name] += 1
+            attachment = _invalid_xml_chars_regex.sub(u"", u"{}".format(record["attachment"]))
+            element = ElementTree.SubElement(testcase, element_name, {
+                "type": record["status"],
+                "message": attachment.strip().split(u"\n")[-1]
+            })
+            element.text = attachment
+
+        testsuite.set("tests", str(len(records)))
+        testsuite.set("failures", str(counts["failure"]))
+        testsuite.set("errors", str(counts["error"]))
+        testsuite.set("skipped", str(counts["skipped"]))
+        testsuite.set("time", "{:.3f}".format(
+            sum(record.get("duration", 0) for record in records)))
+
+        content = ElementTree.tostring(testsuite).decode("utf-8")
+        with self._lock:
+            self._file.write(u"{}\n".format(content))
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+
+            self._file.write(u"</testsuites>\n")
+            self._file.close()
+
+
 class HtmlTestResult(unittest.TextTestResult):
     """ A html result class that can generate formatted html results.
         Used by TextTestRunner.
     """
-    def __init__(self, stream, descriptions, verbosity):
+    def __init__(self, stream, descriptions, verbosity, sinks=None):
+        """
+        Args:
+            sinks (list): ResultSink instances fed with each test record once completed.
+
+        """
         super(HtmlTestResult, self).__init__(stream, descriptions, verbosity)
         self.records = []
+        self.sinks = sinks or []
+        self.testcase_name = None
+        self.test_start_at = time.time()
 
     def _record_test(self, test, status, attachment=''):
         data = {
             'name': test.shortDescription(),
             'status': status,
             'attachment': attachment,
+            "duration": time.time() - self.test_start_at,
             "meta_datas": test.meta_datas
         }
         self.records.append(data)
+        for sink in self.sinks:
+            sink.add_record(self.testcase_name, data)
 
     def startTestRun(self):
         self.start_at = time.time()
 
+    def stopTestRun(self):
+        super(HtmlTestResult, self).stopTestRun()
+        for sink in self.sinks:
+            sink.end_testcase(self.testcase_name, self.records)
+
     def startTest(self, test):
         """ add start test time """
         super(HtmlTestResult, self).startTest(test)
+        self.test_start_at = time.time()
+        if self.testcase_name is None:
+            # tests of one testcase share config, set by HttpRunner._add_tests
+            self.testcase_name = u"{}".format(getattr(test, "config", {}).get("name") or "")
         logger.color_print(test.shortDescription(), "yellow")
 
     def addSuccess(self, test):
@@ -1,15 +1,110 @@
 # encoding: utf-8
 
 import json
+import logging
 import re
 
-from httprunner import exceptions, logger, utils
+from httprunner import exceptions, logger, stream, utils
+from httprunner.client import get_response_json, is_body_streamed
 from httprunner.compat import OrderedDict, basestring, is_py2
 from requests.models import PreparedRequest
 from requests.structures import CaseInsensitiveDict
 
+try:
+    import jmespath
+except ImportError:
+    jmespath = None
+
 text_extractor_regexp_compile = re.compile(r".*\(.*\).*")
 
+# extract from response json body with JMESPath expression, e.g.
+# "jmespath: items[?age > `20`].name"
+JMESPATH_PREFIX = "jmespath:"
+
+
+class Extractor(object):
+    """ extractor compiled from field string, thus the field is parsed only once and
+        reused when teststep is run repeatedly, e.g. in locust.
+
+    Examples:
+        >>> Extractor("headers.content-type")
+        >>> Extractor("content.person.name.first_name")
+        >>> Extractor("LB123(.*)RB789")
+        >>> Extractor("jmespath: items[?age > `20`].name")
+
+    """
+    def __init__(self, field):
+        self.field = field
+        self.regex = None
+        self.jmespath = None
+        self.top_query = None
+        self.sub_query = None
+        self.sub_keys = None
+
+        if field.startswith(JMESPATH_PREFIX):
+            self.jmespath = compile_jmespath(field[len(JMESPATH_PREFIX):].strip())
+            return
+
+        if text_extractor_regexp_compile.match(field):
+            self.regex = re.compile(field)
+            return
+
+        # e.g. "content.person.name" => "content", "person.name", ["person", "name"]
+        try:
+            self.top_query, self.sub_query = field.split('.', 1)
+            self.sub_keys = self.sub_query.split('.')
+        except ValueError:
+            self.top_query = field
+
+    def __eq__(self, other):
+        if isinstance(other, Extractor):
+            other = other.field
+        return self.field == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.field)
+
+    def __repr__(self):
+        return self.field
+
+    __str__ = __repr__
+
+
+def compile_jmespath(expression):
+    """ compile JMESPath expression, requires jmespath, install with:
+
+        pip install httprunner[jmespath]
+
+    Raises:
+        exceptions.ParamsError: jmespath is not installed, or expression is invalid.
+
+    """
+    if jmespath is None:
+        raise exceptions.ParamsError(
+            "jmespath is required for JMESPath extractor, install with: "
+            "pip install httprunner[jmespath]"
+        )
+
+    try:
+        return jmespath.compile(expression)
+    except jmespath.exceptions.JMESPathError as ex:
+        err_msg = u"Invalid JMESPath expression! => {}\n{}".format(expression, ex)
+        logger.log_error(err_msg)
+        raise exceptions.ParamsError(err_msg)
+
+
+def compile_extractor(field):
+    """ compile extract field to Extractor, field in other types is returned unchanged,
+        e.g. LazyString, dict.
+    """
+    if isinstance(field, basestring):
+        return Extractor(field)
+
+    return field
+
 
 class ResponseObject(object):
 
@@ -21,11 +116,13 @@ class ResponseObject(object):
 
         """
         self.resp_obj = resp_obj
+        # queries on streamed response body and resolved values
+        self._streamed_body = None
 
     def __getattr__(self, key):
         try:
             if key == "json":
-                value = self.resp_obj.json()
+                value = get_response_json(self.resp_obj)
             elif key == "cookies":
                 value =  self.resp_obj.cookies.get_dict()
             else:
@@ -38,12 +135,48 @@ class ResponseObject(object):
             logger.log_error(err_msg)
             raise exceptions.ParamsError(err_msg)
 
-    def _extract_field_with_regex(self, field):
+    def parse_streamed_body(self, fields):
+        """ parse streamed response body incrementally, values of fields on response body
+            are resolved and kept, thus response body is never loaded in memory as a whole.
+
+        Args:
+            fields (list): fields to be extracted and validated, e.g.
+                ["status_code", "content.users.0.id"]
+
+        Returns:
+            bool: True if response body is streamed, False if the whole response body
+                is required by fields, e.g. regex, content, and should be loaded.
+
+        """
+        if not is_body_streamed(self.resp_obj):
+            # response body has been loaded, e.g. accessed in teardown hooks
+            return False
+
+        extractors = [compile_extractor(field) for field in fields]
+        if any(getattr(extractor, "jmespath", None) for extractor in extractors):
+            # JMESPath is evaluated on the whole response body
+            queries = None
+        else:
+            queries = stream.get_body_queries(
+                [getattr(extractor, "field", extractor) for extractor in extractors],
+                text_extractor_regexp_compile
+            )
+
+        if queries is None:
+            logger.log_warning(
+                "whole response body is required by extractors or validators, "
+                "streamed response body will be loaded in memory.")
+            return False
+
+        self._streamed_body = stream.extract_json_fields(self.resp_obj, queries)
+        return True
+
+    def _extract_field_with_regex(self, extractor):
         """ extract field from response content with regex.
             requests.Response body could be json or html text.
 
         Args:
-            field (str): regex string that matched r".*\(.*\).*"
+            extractor (Extractor): compiled regex string that matched r".*\(.*\).*"
 
         Returns:
             str: matched content.
@@ -53,25 +186,53 @@ class ResponseObject(object):
 
         Examples:
             >>> # self.text: "LB123abcRB789"
-            >>> filed = "LB[\d]*(.*)RB[\d]*"
-            >>> _extract_field_with_regex(field)
+            >>> extractor = Extractor("LB[\d]*(.*)RB[\d]*")
+            >>> _extract_field_with_regex(extractor)
             abc
 
         """
-        matched = re.search(field, self.text)
+        matched = extractor.regex.search(self.text)
         if not matched:
-            err_msg = u"Failed to extract data with regex! => {}\n".format(field)
+            err_msg = u"Failed to extract data with regex! => {}\n".format(extractor.field)
             err_msg += u"response body: {}\n".format(self.text)
             logger.log_error(err_msg)
             raise exceptions.ExtractFailure(err_msg)
 
         return matched.group(1)
 
-    def _extract_field_with_delimiter(self, field):
+    def _extract_field_with_jmespath(self, extractor):
+        """ extract field from response json body with compiled JMESPath expression,
+            None is returned if nothing matched.
+
+        Args:
+            extractor (Extractor): compiled JMESPath extractor
+
+        Raises:
+            exceptions.ExtractFailure: response body is not json.
+
+        Examples:
+            >>> # self.json: {"items": [{"name": "a", "age": 30}, {"name": "b", "age": 18}]}
+            >>> extractor = Extractor("jmespath: items[?age > `20`].name")
+            >>> _extract_field_with_jmespath(extractor)
+            ["a"]
+
+        """
+        try:
+            body = self.json
+        except exceptions.JSONDecodeError:
+            err_msg = u"Failed to extract with JMESPath! => {}\n".format(extractor.field)
+            err_msg += u"response body is not json.\n"
+            err_msg += u"response body: {}\n".format(self.text)
+            logger.log_error(err_msg)
+            raise exceptions.ExtractFailure(err_msg)
+
+        return extractor.jmespath.search(body)
+
+    def _extract_field_with_delimiter(self, extractor):
         """ response content could be json or html text.
 
         Args:
-            field (str): string joined by delimiter.
+            extractor (Extractor): compiled string joined by delimiter.
             e.g.
                 "status_code"
                 "headers"
@@ -81,13 +242,9 @@ class ResponseObject(object):
                 "content.person.name.first_name"
 
         """
-        # string.split(sep=None, maxsplit=-1) -> list of strings
-        # e.g. "content.person.name" => ["content", "person.name"]
-        try:
-            top_query, sub_query = field.split('.', 1)
-        except ValueError:
-            top_query = field
-            sub_query = None
+        field = extractor.field
+        top_query = extractor.top_query
+        sub_query = extractor.sub_query
 
         # status_code
         if top_query in ["status_code", "encoding", "ok", "reason", "url"]:
@@ -148,6 +305,14 @@ class ResponseObject(object):
                 raise exceptions.ExtractFailure(err_msg)
 
         # response body
+        elif top_query in ["content", "text", "json"] and self._streamed_body is not None:
+            try:
+                return self._streamed_body[sub_query]
+            except KeyError:
+                err_msg = u"Failed to extract from streamed response body! => {}\n".format(field)
+                logger.log_error(err_msg)
+                raise exceptions.ExtractFailure(err_msg)
+
         elif top_query in ["content", "text", "json"]:
             try:
                 body = self.json
@@ -160,10 +325,10 @@ class ResponseObject(object):
 
             if isinstance(body, (dict, list)):
                 # content = {"xxx": 123}, content.xxx
-                return utils.query_json(body, sub_query)
+                return utils.query_json(body, extractor.sub_keys)
             elif sub_query.isdigit():
                 # content = "abcdefg", content.3 => d
-                return utils.query_json(body, sub_query)
+                return utils.query_json(body, extractor.sub_keys)
             else:
                 # content = "<html>abcdefg</html>", content.xxx
                 err_msg = u"Failed to extract attribute from response body! => {}\n".format(field)
@@ -181,10 +346,10 @@ class ResponseObject(object):
 
             if isinstance(attributes, (dict, list)):
                 # attributes = {"xxx": 123}, content.xxx
-                return utils.query_json(attributes, sub_query)
+                return utils.query_json(attributes, extractor.sub_keys)
             elif sub_query.isdigit():
                 # attributes = "abcdefg", attributes.3 => d
-                return utils.query_json(attributes, sub_query)
+                return utils.query_json(attributes, extractor.sub_keys)
             else:
                 # content = "attributes.new_attribute_not_exist"
                 err_msg = u"Failed to extract cumstom set attribute from teardown hooks! => {}\n".format(field)
@@ -203,15 +368,21 @@ class ResponseObject(object):
 
     def extract_field(self, field):
         """ extract value from requests.Response.
+
+        Args:
+            field (Extractor/str): compiled extractor, or field string to be compiled.
+
         """
-        if not isinstance(field, basestring):
+        if isinstance(field, basestring):
+            field = Extractor(field)
+        elif not isinstance(field, Extractor):
             err_msg = u"Invalid extractor! => {}\n".format(field)
             logger.log_error(err_msg)
             raise exceptions.ParamsError(err_msg)
 
-        msg = "extract: {}".format(field)
-
-        if text_extractor_regexp_compile.match(field):
+        if field.jmespath is not None:
+            value = self._extract_field_with_jmespath(field)
+        elif field.regex is not None:
             value = self._extract_field_with_regex(field)
         else:
             value = self._extract_field_with_delimiter(field)
@@ -219,8 +390,8 @@ class ResponseObject(object):
         if is_py2 and isinstance(value, unicode):
             value = value.encode("utf-8")
 
-        msg += "\t=> {}".format(value)
-        logger.log_debug(msg)
+        if logger.logger.isEnabledFor(logging.DEBUG):
+            logger.log_debug("extract: {}\t=> {}".format(field, value))
 
         return value
 
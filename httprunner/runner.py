@@ -1,9 +1,10 @@
 # encoding: utf-8
 
+import contextlib
 from unittest.case import SkipTest
 
-from httprunner import exceptions, logger, response, utils
-from httprunner.client import HttpSession
+from httprunner import exceptions, logger, parser, response, utils
+from httprunner.client import HttpSession, is_body_streamed, use_prepared_body
 from httprunner.context import SessionContext
 
 
@@ -54,10 +55,13 @@ class Runner(object):
                     "name": "ABC",
                     "variables": {},
                     "setup_hooks", [],
-                    "teardown_hooks", []
+                    "teardown_hooks", [],
+                    "dns_cache": 60,
+                    "hosts": {"api.example.com": "127.0.0.1"}
                 }
 
             http_client_session (instance): requests.Session(), or locust.client.Session() instance.
+                HttpSession with dns_cache and hosts of config is created if not specified.
 
         """
         self.verify = config.get("verify", True)
@@ -70,7 +74,10 @@ class Runner(object):
         # testcase teardown hooks
         self.testcase_teardown_hooks = config.get("teardown_hooks", [])
 
-        self.http_client_session = http_client_session or HttpSession()
+        self.http_client_session = http_client_session or HttpSession(
+            dns_cache=config.get("dns_cache"),
+            hosts=config.get("hosts")
+        )
         self.session_context = SessionContext(config_variables)
 
         if testcase_setup_hooks:
@@ -80,7 +87,7 @@ class Runner(object):
         if self.testcase_teardown_hooks:
             self.do_hook_actions(self.testcase_teardown_hooks, "teardown")
 
-    def __clear_test_data(self):
+    def _clear_test_data(self):
         """ clear request and response data
         """
         if not isinstance(self.http_client_session, HttpSession):
@@ -89,7 +96,15 @@ class Runner(object):
         self.validation_results = []
         self.http_client_session.init_meta_data()
 
-    def __get_test_data(self):
+    def _record_test_details(self):
+        """ record request/response details of failed test regardless of record level
+        """
+        if not isinstance(self.http_client_session, HttpSession):
+            return
+
+        self.http_client_session.record_details()
+
+    def _get_test_data(self):
         """ get request/response data and validate results
         """
         if not isinstance(self.http_client_session, HttpSession):
@@ -198,9 +213,40 @@ class Runner(object):
             exceptions.ValidationFailure
             exceptions.ExtractFailure
 
+        """
+        test_dict, method, parsed_url, request_name, parsed_test_request = \
+            self._prepare_test(test_dict)
+
+        # request
+        # static json body is sent as serialized bytes, parsed_test_request is kept as $request
+        request_kwargs = use_prepared_body(
+            parsed_test_request,
+            getattr(self.http_client_session, "headers", None)
+        )
+        resp = self.http_client_session.request(
+            method,
+            parsed_url,
+            name=request_name,
+            **request_kwargs
+        )
+        self._handle_response(test_dict, resp, method, parsed_url, parsed_test_request)
+
+    def _prepare_test(self, test_dict):
+        """ prepare single teststep before sending request: check skip, init test variables,
+            parse request and call setup hooks.
+
+        Args:
+            test_dict (dict): teststep info
+
+        Returns:
+            tuple: (test_dict, method, parsed_url, request_name, parsed_test_request)
+
+        Raises:
+            exceptions.ParamsError
+
         """
         # clear meta data first to ensure independence for each test
-        self.__clear_test_data()
+        self._clear_test_data()
 
         # check skip
         self._handle_skip_feature(test_dict)
@@ -208,7 +254,8 @@ class Runner(object):
         # prepare
         test_dict = utils.lower_test_dict_keys(test_dict)
         test_variables = test_dict.get("variables", {})
-        self.session_context.init_test_variables(test_variables)
+        self.session_context.init_test_variables(
+            test_variables, test_dict.get("variables_resolution"))
 
         # teststep name
         test_name = self.session_context.eval_content(test_dict.get("name", ""))
@@ -246,13 +293,24 @@ class Runner(object):
         logger.log_info("{method} {url}".format(method=method, url=parsed_url))
         logger.log_debug("request kwargs(raw): {kwargs}".format(kwargs=parsed_test_request))
 
-        # request
-        resp = self.http_client_session.request(
-            method,
-            parsed_url,
-            name=(group_name or test_name),
-            **parsed_test_request
-        )
+        return test_dict, method, parsed_url, (group_name or test_name), parsed_test_request
+
+    def _handle_response(self, test_dict, resp, method, parsed_url, parsed_test_request):
+        """ handle response of single teststep: call teardown hooks, extract and validate.
+
+        Args:
+            test_dict (dict): teststep info, returned by _prepare_test
+            resp (instance): requests.Response instance
+            method (str): request method
+            parsed_url (str): request url
+            parsed_test_request (dict): request kwargs
+
+        Raises:
+            exceptions.ParamsError
+            exceptions.ValidationFailure
+            exceptions.ExtractFailure
+
+        """
         resp_obj = response.ResponseObject(resp)
 
         # teardown hooks
@@ -261,13 +319,24 @@ class Runner(object):
             self.session_context.update_test_variables("response", resp_obj)
             self.do_hook_actions(teardown_hooks, "teardown")
 
-        # extract
         extractors = test_dict.get("extract", {})
+        validators = test_dict.get("validate") or test_dict.get("validators") or []
+
+        # streamed response body is parsed once with all fields to be extracted and validated
+        if parsed_test_request.get("stream"):
+            fields = list(utils.ensure_mapping_format(extractors).values()) if extractors else []
+            fields.extend(
+                validator.get_args()[0]
+                for validator in validators
+                if isinstance(validator, parser.LazyFunction)
+            )
+            resp_obj.parse_streamed_body(fields)
+
+        # extract
         extracted_variables_mapping = resp_obj.extract_response(extractors)
         self.session_context.update_session_variables(extracted_variables_mapping)
 
         # validate
-        validators = test_dict.get("validate") or test_dict.get("validators") or []
         try:
             self.session_context.validate(validators, resp_obj)
         except (exceptions.ParamsError, exceptions.ValidationFailure, exceptions.ExtractFailure):
@@ -288,7 +357,10 @@ class Runner(object):
             err_msg += "====== response details ======\n"
             err_msg += "status_code: {}\n".format(resp_obj.status_code)
             err_msg += "headers: {}\n".format(resp_obj.headers)
-            err_msg += "body: {}\n".format(repr(resp_obj.text))
+            if is_body_streamed(resp):
+                err_msg += "body: streamed response body (OMITTED)\n"
+            else:
+                err_msg += "body: {}\n".format(repr(resp_obj.text))
             logger.log_error(err_msg)
 
             raise
@@ -296,39 +368,81 @@ class Runner(object):
         finally:
             self.validation_results = self.session_context.validation_results
 
-    def _run_testcase(self, testcase_dict):
-        """ run single testcase.
+    def _init_testcase(self, testcase_dict):
+        """ initialize runner of nested testcase, each teststeps in one testcase (YAML/JSON)
+            share the same session.
+
+        Returns:
+            tuple: (test_runner, teststeps)
+
         """
         self.meta_datas = []
         config = testcase_dict.get("config", {})
+        test_runner = type(self)(config, self.http_client_session)
+        return test_runner, testcase_dict.get("teststeps", [])
 
-        # each teststeps in one testcase (YAML/JSON) share the same session.
-        test_runner = Runner(config, self.http_client_session)
+    @contextlib.contextmanager
+    def _testcase_step_context(self, test_runner, test_dict):
+        """ context of running teststep of nested testcase with test_runner, meta_datas of
+            teststep are collected and exception is logged for locust stat.
+        """
+        # override current teststep variables with former testcase output variables
+        former_output_variables = self.session_context.test_variables_mapping
+        if former_output_variables:
+            test_dict.setdefault("variables", {})
+            test_dict["variables"].update(former_output_variables)
 
-        tests = testcase_dict.get("teststeps", [])
+        try:
+            yield
+        except Exception:
+            # log exception request_type and name for locust stat
+            self.exception_request_type = test_runner.exception_request_type
+            self.exception_name = test_runner.exception_name
+            raise
+        finally:
+            _meta_datas = test_runner.meta_datas
+            self.meta_datas.append(_meta_datas)
 
-        for index, test_dict in enumerate(tests):
+    def _finish_testcase(self, test_runner):
+        """ export variables of nested testcase to current session.
+        """
+        self.session_context.update_session_variables(
+            test_runner.export_variables(test_runner.export)
+        )
 
-            # override current teststep variables with former testcase output variables
-            former_output_variables = self.session_context.test_variables_mapping
-            if former_output_variables:
-                test_dict.setdefault("variables", {})
-                test_dict["variables"].update(former_output_variables)
+    def _run_testcase(self, testcase_dict):
+        """ run single testcase.
+        """
+        test_runner, tests = self._init_testcase(testcase_dict)
 
-            try:
+        for test_dict in tests:
+            with self._testcase_step_context(test_runner, test_dict):
                 test_runner.run_test(test_dict)
-            except Exception:
-                # log exception request_type and name for locust stat
-                self.exception_request_type = test_runner.exception_request_type
-                self.exception_name = test_runner.exception_name
-                raise
-            finally:
-                _meta_datas = test_runner.meta_datas
-                self.meta_datas.append(_meta_datas)
 
-        self.session_context.update_session_variables(
-            test_runner.export_variables(test_runner.export)
-        )
+        self._finish_testcase(test_runner)
+
+    def _prepare_nested_testcase(self, test_dict):
+        """ pass session variables to config variables of nested testcase.
+        """
+        test_dict.setdefault("config", {}).setdefault("variables", {})
+        test_dict["config"]["variables"].update(
+            self.session_context.session_variables_mapping)
+
+    @contextlib.contextmanager
+    def _api_test_context(self, test_dict):
+        """ context of running api teststep, details are recorded if test failed,
+            and meta_datas are got once finished.
+        """
+        try:
+            yield
+        except Exception:
+            # log exception request_type and name for locust stat
+            self.exception_request_type = test_dict["request"]["method"]
+            self.exception_name = test_dict.get("name")
+            self._record_test_details()
+            raise
+        finally:
+            self.meta_datas = self._get_test_data()
 
     def run_test(self, test_dict):
         """ run single teststep of testcase.
@@ -366,21 +480,12 @@ class Runner(object):
         self.meta_datas = None
         if "teststeps" in test_dict:
             # nested testcase
-            test_dict.setdefault("config", {}).setdefault("variables", {})
-            test_dict["config"]["variables"].update(
-                self.session_context.session_variables_mapping)
+            self._prepare_nested_testcase(test_dict)
             self._run_testcase(test_dict)
         else:
             # api
-            try:
+            with self._api_test_context(test_dict):
                 self._run_test(test_dict)
-            except Exception:
-                # log exception request_type and name for locust stat
-                self.exception_request_type = test_dict["request"]["method"]
-                self.exception_name = test_dict.get("name")
-                raise
-            finally:
-                self.meta_datas = self.__get_test_data()
 
     def export_variables(self, output_variables_list):
         """ export current testcase variables
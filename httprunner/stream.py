@@ -0,0 +1,264 @@
+# encoding: utf-8
+
+"""
+httprunner.stream
+~~~~~~~~~~~~~~~~~
+
+Optional incremental extraction of streamed JSON response body. When teststep request
+is sent with `stream: true`, json fields referenced by extractors and validators are
+picked up while bytes arrive, and response body is never loaded in memory as a whole.
+This module requires ijson, install with:
+
+    pip install httprunner[stream]
+
+Examples:
+    >>> # teststep in YAML/JSON testcase
+    - test:
+        name: export all users
+        request:
+            url: /api/export
+            method: GET
+            stream: true
+        extract:
+            - first_uid: content.users.0.id
+        validate:
+            - eq: ["status_code", 200]
+            - eq: ["content.total", 100000]
+
+"""
+
+from decimal import Decimal
+
+from httprunner import exceptions, logger
+from httprunner.compat import basestring
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# read streamed response body by chunks of 64KB
+CHUNK_SIZE = 64 * 1024
+
+# response body fields, e.g. content.users.0.id
+BODY_FIELDS = ("content", "text", "json")
+
+
+def get_body_queries(fields, regex_compile):
+    """ get queries on response body from extractor and validator fields.
+
+    Args:
+        fields (list): extract fields, e.g. ["status_code", "content.users.0.id"]
+        regex_compile: compiled regex to match text extractor
+
+    Returns:
+        list: queries on response body, e.g. ["users.0.id"].
+            None if the whole response body is required, e.g. content, regex extractor.
+
+    """
+    queries = []
+    for field in fields:
+        if not isinstance(field, basestring):
+            # variable/function reference, e.g. $token
+            continue
+
+        if regex_compile.match(field):
+            # regex is matched with response text
+            return None
+
+        top_query, _, sub_query = field.partition(".")
+        if top_query not in BODY_FIELDS:
+            continue
+
+        if not sub_query:
+            return None
+
+        if sub_query not in queries:
+            queries.append(sub_query)
+
+    return queries
+
+
+class ResponseStream(object):
+    """ file-like object reading decoded response body by chunks, used by ijson.
+    """
+    def __init__(self, resp_obj, chunk_size=CHUNK_SIZE):
+        self._chunks = resp_obj.iter_content(chunk_size)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        # ijson reads with fixed buffer size, thus one chunk is returned at most
+        if size == 0:
+            # ijson checks whether bytes or str is returned with read(0)
+            return b""
+
+        for chunk in self._chunks:
+            if chunk:
+                self.bytes_read += len(chunk)
+                return chunk
+
+        return b""
+
+
+class ValueBuilder(object):
+    """ build json value from ijson events, numbers are converted the same as json.loads.
+    """
+    def __init__(self):
+        self.value = None
+        self._containers = []
+        self._key = None
+
+    def _add(self, value):
+        if not self._containers:
+            self.value = value
+        elif isinstance(self._containers[-1], list):
+            self._containers[-1].append(value)
+        else:
+            self._containers[-1][self._key] = value
+
+    def event(self, event, value):
+        if event == "map_key":
+            self._key = value
+        elif event == "start_map":
+            container = {}
+            self._add(container)
+            self._containers.append(container)
+        elif event == "start_array":
+            container = []
+            self._add(container)
+            self._containers.append(container)
+        elif event in ("end_map", "end_array"):
+            self._containers.pop()
+        else:
+            if isinstance(value, Decimal):
+                value = float(value)
+            self._add(value)
+
+
+def _resolve_scalar_children(value, parent_path, pending_paths, resolved):
+    """ resolve queries on scalar value, only string index is valid, e.g. name.0
+    """
+    for query_path in list(pending_paths):
+        if query_path[:len(parent_path)] != parent_path:
+            continue
+
+        # not found in response body if not resolved
+        pending_paths.discard(query_path)
+        if not isinstance(value, basestring) or len(query_path) != len(parent_path) + 1:
+            continue
+
+        try:
+            resolved[query_path] = value[int(query_path[-1])]
+        except (ValueError, IndexError):
+            continue
+
+
+def extract_json_fields(resp_obj, queries, chunk_size=CHUNK_SIZE):
+    """ parse streamed response body incrementally, only values of queries are kept.
+        Reading stops once all queries are resolved, and response is closed.
+
+    Args:
+        resp_obj (instance): requests.Response instance, sent with stream=True
+        queries (list): json queries joined by delimiter, e.g. ["users.0.id", "total"]
+        chunk_size (int): size of chunks read from response
+
+    Returns:
+        dict: resolved queries mapping, queries not found in response body are excluded.
+
+            {
+                "users.0.id": 1000,
+                "total": 100000
+            }
+
+    Raises:
+        exceptions.ParamsError: ijson is not installed.
+        exceptions.ExtractFailure: response body is not valid json.
+
+    """
+    if ijson is None:
+        raise exceptions.ParamsError(
+            "ijson is required for streaming extraction, install with: "
+            "pip install httprunner[stream]"
+        )
+
+    # query => path tuple, e.g. "users.0.id" => ("users", "0", "id")
+    query_paths = {query: tuple(query.split(".")) for query in queries}
+    pending_paths = set(query_paths.values())
+    # scalar value of parent path may be indexed, e.g. "name.0" is the first charactor of name
+    parent_paths = set(
+        query_path[:index]
+        for query_path in pending_paths
+        for index in range(len(query_path))
+    )
+
+    resolved = {}
+    # current path of json value, array index is converted to string
+    path = []
+    # stack of containers, None for object, current index for array
+    indexes = []
+    # builders of matched values, [(path, builder)]
+    builders = []
+
+    stream = ResponseStream(resp_obj, chunk_size)
+    try:
+        if not pending_paths:
+            return {}
+
+        for _, event, value in ijson.parse(stream):
+            if event == "map_key":
+                path[-1] = value
+                for _, builder in builders:
+                    builder.event(event, value)
+                continue
+
+            if event in ("end_map", "end_array"):
+                path.pop()
+                indexes.pop()
+            else:
+                current_path = tuple(path)
+                if current_path in pending_paths:
+                    builders.append((current_path, ValueBuilder()))
+                elif current_path in parent_paths and event not in ("start_map", "start_array"):
+                    _resolve_scalar_children(value, current_path, pending_paths, resolved)
+
+            for _, builder in builders:
+                builder.event(event, value)
+
+            if event == "start_map":
+                path.append(None)
+                indexes.append(None)
+                continue
+            elif event == "start_array":
+                path.append("0")
+                indexes.append(0)
+                continue
+
+            # json value is completed
+            current_path = tuple(path)
+            if builders and builders[-1][0] == current_path:
+                _, builder = builders.pop()
+                resolved[current_path] = builder.value
+                pending_paths.discard(current_path)
+
+            if indexes and indexes[-1] is not None:
+                indexes[-1] += 1
+                path[-1] = str(indexes[-1])
+
+            if not pending_paths:
+                break
+
+    except ijson.JSONError as ex:
+        err_msg = u"Failed to parse streamed response body as json! => {}".format(ex)
+        logger.log_error(err_msg)
+        raise exceptions.ExtractFailure(err_msg)
+
+    finally:
+        resp_obj.close()
+
+    logger.log_debug("streamed response body: {} bytes read".format(stream.bytes_read))
+
+    return {
+        query: resolved[query_path]
+        for query, query_path in query_paths.items()
+        if query_path in resolved
+    }
@@ -11,7 +11,7 @@ import string
 from datetime import datetime
 
 from httprunner import exceptions, logger
-from httprunner.compat import basestring, bytes, is_py2
+from httprunner.compat import ChainMap, basestring, bytes, is_py2
 from httprunner.exceptions import ParamsError
 
 absolute_http_url_regexp = re.compile(r"^https?://", re.I)
@@ -67,7 +67,7 @@ def query_json(json_content, query, delimiter='.'):
 
     Args:
         json_content (dict/list/string): content to be queried.
-        query (str): query string.
+        query (str/list): query string, or query keys already split by delimiter.
         delimiter (str): delimiter symbol.
 
     Returns:
@@ -96,10 +96,12 @@ def query_json(json_content, query, delimiter='.'):
         >>> Guangzhou
 
     """
+    query_keys = query.split(delimiter) if isinstance(query, basestring) else query
+
     raise_flag = False
-    response_body = u"response body: {}\n".format(json_content)
+    origin_content = json_content
     try:
-        for key in query.split(delimiter):
+        for key in query_keys:
             if isinstance(json_content, (list, basestring)):
                 json_content = json_content[int(key)]
             elif isinstance(json_content, dict):
@@ -112,8 +114,9 @@ def query_json(json_content, query, delimiter='.'):
         raise_flag = True
 
     if raise_flag:
-        err_msg = u"Failed to extract! => {}\n".format(query)
-        err_msg += response_body
+        # format response body only when failed, it may be large
+        err_msg = u"Failed to extract! => {}\n".format(delimiter.join(query_keys))
+        err_msg += u"response body: {}\n".format(origin_content)
         logger.log_error(err_msg)
         raise exceptions.ExtractFailure(err_msg)
 
@@ -283,7 +286,7 @@ def ensure_mapping_format(variables):
 
         return variables_dict
 
-    elif isinstance(variables, dict):
+    elif isinstance(variables, (dict, ChainMap)):
         return variables
 
     else:
@@ -495,7 +498,8 @@ testcases:
         "__pycache__/*",
         "*.pyc",
         ".python-version",
-        "logs/*"
+        "logs/*",
+        ".httprunner_cache/*"
     ])
     demo_debugtalk_content = """
 import time
@@ -665,6 +669,17 @@ def _prepare_dump_info(project_mapping, tag_name):
     return pwd_dir_path, dump_file_name
 
 
+def get_dump_file_path(project_mapping, tag_name):
+    """ get path of dump file located in PWD/logs folder, logs folder is created if not exists.
+    """
+    pwd_dir_path, dump_file_name = _prepare_dump_info(project_mapping, tag_name)
+    logs_dir_path = os.path.join(pwd_dir_path, "logs")
+    if not os.path.isdir(logs_dir_path):
+        os.makedirs(logs_dir_path)
+
+    return os.path.join(logs_dir_path, dump_file_name)
+
+
 def dump_logs(json_data, project_mapping, tag_name):
     """ dump tests data to json file.
         the dumped file is located in PWD/logs folder.
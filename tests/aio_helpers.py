@@ -0,0 +1,44 @@
+""" coroutines used by test_aio, kept in a separate module since async syntax can not be
+    compiled by Python 2, this module is imported by test_aio only on Python 3.5+.
+"""
+import asyncio
+
+from httprunner.aio import AsyncHttpSession, AsyncRunner
+
+
+async def request(method, url, session_kwargs=None, **kwargs):
+    """ send request with new AsyncHttpSession, initialized with session_kwargs.
+
+    Returns:
+        tuple: (session, response)
+
+    """
+    session = AsyncHttpSession(**(session_kwargs or {}))
+    try:
+        return session, await session.request(method, url, **kwargs)
+    finally:
+        await session.close()
+
+
+async def run_teststeps(parsed_testcase, teststeps):
+    """ run teststeps with new AsyncRunner of parsed testcase.
+
+    Returns:
+        tuple: (runner, meta_datas of each teststep)
+
+    """
+    test_runner = AsyncRunner(parsed_testcase["config"])
+    try:
+        meta_datas = []
+        for test_dict in teststeps:
+            await test_runner.run_test(test_dict)
+            meta_datas.append(test_runner.meta_datas)
+        return test_runner, meta_datas
+    finally:
+        await test_runner.close()
+
+
+async def run_concurrently(*coroutines):
+    """ gather coroutines in running event loop.
+    """
+    return await asyncio.gather(*coroutines)
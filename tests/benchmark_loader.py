@@ -0,0 +1,59 @@
+# encoding: utf-8
+
+""" benchmark of loading YAML/JSON test files, compare pure python loader with
+    the loader used by httprunner (libyaml CSafeLoader if available).
+
+Usage:
+    $ python -m tests.benchmark_loader [rounds]
+
+"""
+
+import io
+import json
+import os
+import sys
+import time
+
+import yaml
+from httprunner import loader
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def pure_python_load_file(file_path):
+    """ load test file the way before libyaml loader is used.
+    """
+    with io.open(file_path, encoding='utf-8') as stream:
+        if file_path.endswith(".json"):
+            return json.load(stream)
+
+        return yaml.load(stream, Loader=yaml.FullLoader)
+
+
+def benchmark(load_func, files, rounds):
+    start_at = time.time()
+    for _ in range(rounds):
+        for file_path in files:
+            load_func(file_path)
+
+    duration = time.time() - start_at
+    return len(files) * rounds / duration
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    files = loader.load_folder_files(tests_dir)
+
+    print("yaml loader: {}, json: {}".format(
+        loader.YamlLoader.__name__, loader.json.__name__))
+    print("{} files, {} rounds".format(len(files), rounds))
+
+    before = benchmark(pure_python_load_file, files, rounds)
+    after = benchmark(loader.load_file, files, rounds)
+    print("before: {:.1f} files/sec".format(before))
+    print("after:  {:.1f} files/sec".format(after))
+    print("speedup: {:.2f}x".format(after / before))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# encoding: utf-8
+
+""" micro benchmark of LazyString rendering, compare walking parsed args on each
+    call (before) with the compiled render plan (after).
+
+Usage:
+    $ python -m tests.benchmark_parser [number]
+
+"""
+
+import sys
+import timeit
+
+from httprunner import parser
+from tests.debugtalk import sum_two
+
+variables_mapping = {
+    "base_url": "http://127.0.0.1:5000",
+    "uid": 1000,
+    "token": "ZVLsGVx7wNVTfpTo",
+    "a": 1,
+    "b": 2
+}
+functions_mapping = {
+    "sum_two": sum_two
+}
+raw_strings = [
+    "application/json",
+    "$token",
+    "${sum_two($a, $b)}",
+    "/api/users/$uid?token=$token",
+    "$base_url/api/users/${sum_two($uid, $a)}",
+]
+
+
+def legacy_to_value(lazy_string, variables_mapping):
+    """ LazyString.to_value before render plan is compiled.
+    """
+    args = []
+    for arg in lazy_string._args:
+        if isinstance(arg, parser.LazyFunction):
+            func_args = parser.parse_lazy_data(arg._args, variables_mapping)
+            func_kwargs = parser.parse_lazy_data(arg._kwargs, variables_mapping)
+            arg.cache_key = (arg.func_name, repr(func_args), repr(func_kwargs))
+            value = arg._func(*func_args, **func_kwargs)
+            parser.function_results_cache.set(arg.cache_key, value)
+            args.append(value)
+        else:
+            args.append(parser.get_mapping_variable(arg, variables_mapping))
+
+    if lazy_string._string == "{}":
+        return args[0]
+    else:
+        return lazy_string._string.format(*args)
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print("{:<45} {:>12} {:>12}".format("raw string", "before (ns)", "after (ns)"))
+    for raw_string in raw_strings:
+        lazy_string = parser.LazyString(
+            raw_string, functions_mapping, set(variables_mapping.keys()))
+        assert legacy_to_value(lazy_string, variables_mapping) \
+            == lazy_string.to_value(variables_mapping)
+
+        before = timeit.timeit(
+            lambda: legacy_to_value(lazy_string, variables_mapping), number=number)
+        after = timeit.timeit(
+            lambda: lazy_string.to_value(variables_mapping), number=number)
+        print("{:<45} {:>12.0f} {:>12.0f}".format(
+            raw_string, before / number * 1e9, after / number * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import unittest
+
+from httprunner import exceptions, loader, parser
+from httprunner.client import HttpSession
+from requests.exceptions import ConnectionError
+from tests.base import ApiServerUnittest
+
+AsyncRunner = None
+if sys.version_info >= (3, 5):
+    import asyncio
+
+    try:
+        from httprunner.aio import AsyncHttpSession, AsyncRunner
+        from tests import aio_helpers
+    except ImportError:
+        pass
+
+
+@unittest.skipIf(AsyncRunner is None, "aiohttp is not installed")
+class TestAsyncRunner(ApiServerUnittest):
+
+    def setUp(self):
+        loader.load_project_tests(os.path.join(os.getcwd(), "tests"))
+        self.loop = asyncio.new_event_loop()
+        self.reset_all()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def reset_all(self):
+        url = "%s/api/reset-all" % self.host
+        headers = self.get_authenticated_headers()
+        return self.api_client.get(url, headers=headers)
+
+    def test_async_http_session_request(self):
+        session, resp = self.loop.run_until_complete(aio_helpers.request(
+            "POST",
+            "{}/api/get-token".format(self.host),
+            name="get token",
+            headers={
+                "user_agent": "iOS/10.3",
+                "device_sn": "HZfFBh6tU59EdXJ",
+                "os_platform": "ios",
+                "app_version": "2.8.6"
+            },
+            json={"sign": "5188962c489d1a35effa99e9346dd5efd4fdabad"}
+        ))
+        self.assertIsInstance(session, HttpSession)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.json()["token"]), 16)
+        self.assertEqual(resp.headers["content-type"], "application/json")
+
+        meta_data = session.meta_data
+        self.assertEqual(meta_data["name"], "get token")
+        self.assertEqual(meta_data["data"][0]["request"]["method"], "POST")
+        self.assertIn(b"sign", meta_data["data"][0]["request"]["body"])
+        self.assertEqual(meta_data["data"][0]["response"]["status_code"], 200)
+        self.assertIn("token", meta_data["data"][0]["response"]["json"])
+        self.assertGreater(meta_data["stat"]["response_time_ms"], 0)
+        self.assertGreater(meta_data["stat"]["content_size"], 0)
+
+    def test_async_http_session_hosts(self):
+        session, resp = self.loop.run_until_complete(aio_helpers.request(
+            "GET",
+            "http://api.example.com:5000/",
+            session_kwargs={"dns_cache": 60, "hosts": {"API.example.com.": "127.0.0.1"}}
+        ))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(session.resolver.ttl, 60)
+        # requests transport adapters are not set up for aiohttp
+        self.assertEqual(session.adapters, {})
+
+    def test_async_http_session_unsupported_options(self):
+        with self.assertRaises(exceptions.ParamsError):
+            AsyncHttpSession(http2=True)
+
+        with self.assertRaises(exceptions.ParamsError):
+            AsyncHttpSession(dns_cache="abc")
+
+    def test_async_http_session_connection_error(self):
+        # same as HttpSession, connection error is raised when recording response
+        with self.assertRaises(ConnectionError):
+            self.loop.run_until_complete(
+                aio_helpers.request("GET", "http://127.0.0.1:5999/api/users"))
+
+    def test_run_testcases_concurrently(self):
+        testcase_file_path = os.path.join(
+            os.getcwd(), 'tests/data/demo_testcase_hardcode.yml')
+        tests_mapping = loader.load_tests(testcase_file_path)
+        parsed_testcase = parser.parse_tests(tests_mapping)[0]
+
+        results = self.loop.run_until_complete(aio_helpers.run_concurrently(*[
+            aio_helpers.run_teststeps(parsed_testcase, parsed_testcase["teststeps"][:1])
+            for _ in range(5)
+        ]))
+        self.assertEqual(len(results), 5)
+        for _, meta_datas in results:
+            self.assertEqual(meta_datas[0]["data"][0]["response"]["status_code"], 200)
+            self.assertEqual(meta_datas[0]["validators"][0]["check_result"], "pass")
+
+    def test_run_nested_testcase(self):
+        testcase_file_path = os.path.join(
+            os.getcwd(), 'tests/testcases/create_user.yml')
+        tests_mapping = loader.load_tests(testcase_file_path)
+        parsed_testcase = parser.parse_tests(tests_mapping)[0]
+
+        test_runner, _ = self.loop.run_until_complete(
+            aio_helpers.run_teststeps(parsed_testcase, parsed_testcase["teststeps"]))
+        exported = test_runner.export_variables(test_runner.export)
+        self.assertEqual(len(exported["session_token"]), 16)
@@ -1,12 +1,17 @@
+import base64
+import gzip
+import json
 import os
 import re
 import shutil
+import tempfile
 import time
 import unittest
+from xml.etree import ElementTree
 
-from httprunner import exceptions, loader, parser
+from httprunner import compat, exceptions, loader, parser, report
 from httprunner.api import HttpRunner, prepare_locust_tests
-from tests.api_server import HTTPBIN_SERVER
+from tests.api_server import HTTPBIN_SERVER, get_sign
 from tests.base import ApiServerUnittest
 
 
@@ -179,6 +184,286 @@ class TestHttpRunner(ApiServerUnittest):
         self.assertEqual(len(token2), 16)
         self.assertEqual(token1, token2)
 
+    def _gen_get_token_tests_mapping(self):
+        testcases = []
+        for index in range(4):
+            testcases.append({
+                "config": {
+                    "name": "get token {}".format(index),
+                    "variables": {
+                        "device_sn": "WORKERS_{}".format(index)
+                    }
+                },
+                "teststeps": [
+                    {
+                        "name": "get token with $device_sn",
+                        "request": {
+                            "url": "http://127.0.0.1:5000/api/get-token",
+                            "method": "POST",
+                            "headers": {
+                                "user_agent": "iOS/10.3",
+                                "device_sn": "$device_sn",
+                                "os_platform": "ios",
+                                "app_version": "2.8.6"
+                            },
+                            "json": {
+                                "sign": "${get_sign($device_sn, ios, 2.8.6)}"
+                            }
+                        },
+                        "validate": [
+                            {"eq": ["status_code", 200]},
+                            {"len_eq": ["content.token", 16]}
+                        ]
+                    }
+                ]
+            })
+
+        tests_mapping = {
+            "project_mapping": {
+                "functions": {
+                    "get_sign": get_sign
+                }
+            },
+            "testcases": testcases
+        }
+        return tests_mapping
+
+    def test_run_testcases_with_workers(self):
+        tests_mapping = self._gen_get_token_tests_mapping()
+        runner = HttpRunner(workers=2)
+        runner.run_tests(tests_mapping)
+        summary = runner.summary
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["stat"]["testcases"]["total"], 4)
+        self.assertEqual(summary["stat"]["testcases"]["success"], 4)
+        self.assertEqual(summary["stat"]["teststeps"]["total"], 4)
+        self.assertEqual(
+            [detail["name"] for detail in summary["details"]],
+            ["get token 0", "get token 1", "get token 2", "get token 3"]
+        )
+
+    def test_run_testcases_with_workers_own_results(self):
+        tests_mapping = self._gen_get_token_tests_mapping()
+        # make the last testcase fail
+        tests_mapping["testcases"][3]["teststeps"][0]["validate"].append(
+            {"eq": ["status_code", 201]}
+        )
+        runner = HttpRunner(workers=2)
+        stream = compat.StringIO()
+        runner.unittest_runner.stream = unittest.runner._WritelnDecorator(stream)
+        parsed_testcases = parser.parse_tests(tests_mapping)
+        tests_results = runner._run_suite(runner._add_tests(parsed_testcases))
+
+        results = [result for _, result in tests_results]
+        self.assertEqual(len(set(id(result) for result in results)), 4)
+        self.assertEqual([result.testsRun for result in results], [1, 1, 1, 1])
+        self.assertEqual(
+            [result.wasSuccessful() for result in results],
+            [True, True, True, False]
+        )
+        # output of each testcase is written to runner stream in order
+        output = stream.getvalue()
+        self.assertTrue(output.startswith(".\n.\n.\nF\n"))
+        self.assertEqual(output.count("FAIL: "), 1)
+
+    def test_run_testcases_with_processes(self):
+        tests_mapping = self._gen_get_token_tests_mapping()
+        runner = HttpRunner(processes=2)
+        runner.run_tests(tests_mapping)
+        summary = runner.summary
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["stat"]["testcases"]["total"], 4)
+        self.assertEqual(summary["stat"]["testcases"]["success"], 4)
+        self.assertEqual(summary["stat"]["teststeps"]["total"], 4)
+        self.assertEqual(
+            [detail["name"] for detail in summary["details"]],
+            ["get token 0", "get token 1", "get token 2", "get token 3"]
+        )
+        self.assertEqual(
+            summary["details"][1]["records"][0]["meta_datas"]["name"],
+            "get token with WORKERS_1"
+        )
+
+    def test_run_path_with_processes_loads_debugtalk(self):
+        runner = HttpRunner(processes=2)
+        runner.run_path("tests/testcases/setup.yml")
+        summary = runner.summary
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["stat"]["teststeps"]["total"], 2)
+
+    def test_run_testcases_with_processes_unpicklable_functions(self):
+        tests_mapping = self._gen_get_token_tests_mapping()
+        tests_mapping["project_mapping"]["functions"]["get_sign"] = \
+            lambda *args: get_sign(*args)
+        runner = HttpRunner(processes=2)
+        with self.assertRaises(exceptions.ParamsError) as cm:
+            runner.run_tests(tests_mapping)
+
+        self.assertIn("debugtalk.py", str(cm.exception))
+
+    def test_run_testcases_with_result_sinks(self):
+        logs_dir = os.path.join(os.getcwd(), "tests", "logs")
+        os.makedirs(logs_dir)
+        junit_path = os.path.join(logs_dir, "junit.xml")
+        json_lines_path = os.path.join(logs_dir, "results.jsonl")
+
+        for kwargs in [{"workers": 2}, {"processes": 2}]:
+            tests_mapping = self._gen_get_token_tests_mapping()
+            # make the last testcase fail
+            tests_mapping["testcases"][3]["teststeps"][0]["validate"].append(
+                {"eq": ["status_code", 201]}
+            )
+            sinks = [report.JUnitXMLSink(junit_path), report.JSONLinesSink(json_lines_path)]
+            runner = HttpRunner(result_sinks=sinks, **kwargs)
+            runner.run_tests(tests_mapping)
+            for sink in sinks:
+                sink.close()
+
+            testsuites = ElementTree.parse(junit_path).getroot()
+            self.assertEqual(
+                sorted(testsuite.get("name") for testsuite in testsuites),
+                ["get token 0", "get token 1", "get token 2", "get token 3"]
+            )
+            failed_testsuite = testsuites.find("testsuite[@name='get token 3']")
+            self.assertEqual(failed_testsuite.get("tests"), "1")
+            self.assertEqual(failed_testsuite.get("failures"), "1")
+            self.assertIn("ValidationFailure", failed_testsuite.find("testcase/failure").text)
+
+            with open(json_lines_path) as f:
+                results = [json.loads(line) for line in f]
+            self.assertEqual(len(results), 4)
+            self.assertEqual(
+                sorted(result["testcase"] for result in results if result["status"] == "failure"),
+                ["get token 3"]
+            )
+            self.assertEqual(results[0]["name"][:len("get token with")], "get token with")
+
+        shutil.rmtree(logs_dir)
+
+    def test_run_concurrency_invalid(self):
+        with self.assertRaises(exceptions.ParamsError):
+            HttpRunner(workers=0)
+
+        with self.assertRaises(exceptions.ParamsError):
+            HttpRunner(workers="abc")
+
+        with self.assertRaises(exceptions.ParamsError):
+            HttpRunner(processes=0)
+
+    def test_run_testcases_with_record_level(self):
+        tests_mapping = self._gen_get_token_tests_mapping()
+        # make the last testcase fail
+        tests_mapping["testcases"][3]["teststeps"][0]["validate"].append(
+            {"eq": ["status_code", 201]}
+        )
+        runner = HttpRunner(record_level="summary")
+        runner.run_tests(tests_mapping)
+        summary = runner.summary
+        self.assertEqual(summary["stat"]["testcases"]["success"], 3)
+
+        # passed teststep only records summary
+        req_resp = summary["details"][0]["records"][0]["meta_datas"]["data"][0]
+        self.assertEqual(req_resp["request"]["method"], "POST")
+        self.assertEqual(req_resp["response"]["status_code"], 200)
+        self.assertNotIn("headers", req_resp["request"])
+        self.assertNotIn("json", req_resp["response"])
+
+        # failed teststep records full details
+        req_resp = summary["details"][3]["records"][0]["meta_datas"]["data"][0]
+        self.assertIn("headers", req_resp["request"])
+        self.assertIn("json", req_resp["response"])
+
+        runner = HttpRunner(record_level="none")
+        runner.run_tests(self._gen_get_token_tests_mapping())
+        meta_datas = runner.summary["details"][0]["records"][0]["meta_datas"]
+        self.assertEqual(meta_datas["data"], [])
+        self.assertGreater(meta_datas["stat"]["response_time_ms"], 0)
+
+        with self.assertRaises(exceptions.ParamsError):
+            HttpRunner(record_level="all")
+
+    def test_run_testcases_with_report_details(self):
+        tests_mapping = self._gen_get_token_tests_mapping()
+        # make the last testcase fail
+        tests_mapping["testcases"][3]["teststeps"][0]["validate"].append(
+            {"eq": ["status_code", 201]}
+        )
+        runner = HttpRunner(report_details="failures", report_body_limit=10)
+        runner.run_tests(tests_mapping)
+        summary = runner.summary
+        self.assertEqual(summary["stat"]["testcases"]["success"], 3)
+
+        # passed teststep is reduced to summary in report
+        req_resp = summary["details"][0]["records"][0]["meta_datas"]["data"][0]
+        self.assertEqual(req_resp["request"]["method"], "POST")
+        self.assertEqual(req_resp["response"]["status_code"], 200)
+        self.assertNotIn("headers", req_resp["request"])
+        self.assertNotIn("json", req_resp["response"])
+
+        # failed teststep keeps full details, long body is truncated
+        req_resp = summary["details"][3]["records"][0]["meta_datas"]["data"][0]
+        self.assertIn("headers", req_resp["request"])
+        self.assertIn("json", req_resp["response"])
+        self.assertTrue(
+            req_resp["request"]["body"].startswith("{&#34;sign&#34;: &#34; ... OMITTED"))
+
+        with self.assertRaises(exceptions.ParamsError):
+            HttpRunner(report_details="none")
+
+    def test_run_testcases_with_report_body_limit(self):
+        testcases = [
+            {
+                "config": {"name": "post large json"},
+                "teststeps": [
+                    {
+                        "name": "post large json",
+                        "request": {
+                            "url": "{}/anything".format(HTTPBIN_SERVER),
+                            "method": "POST",
+                            "json": {"content": "x" * 5000}
+                        },
+                        "validate": [{"eq": ["status_code", 200]}]
+                    }
+                ]
+            }
+        ]
+        runner = HttpRunner(report_body_limit=1000)
+        runner.run_tests({"testcases": testcases})
+        req_resp = runner.summary["details"][0]["records"][0]["meta_datas"]["data"][0]
+
+        # large json bodies are truncated as strings
+        response_json = req_resp["response"]["json"]
+        self.assertIn(" ... OMITTED ", response_json)
+        self.assertLess(len(response_json), 1200)
+        self.assertIn(" ... OMITTED ", req_resp["request"]["body"])
+
+        # headers are kept as mapping
+        self.assertIsInstance(req_resp["response"]["headers"], dict)
+
+    def test_run_testcases_with_shared_connections(self):
+        runner = HttpRunner(workers=2, share_connections=True)
+        runner.run_tests(self._gen_get_token_tests_mapping())
+        summary = runner.summary
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["stat"]["testcases"]["success"], 4)
+        self.assertEqual(runner._http_adapters[None]._pool_maxsize, 10)
+        self.assertEqual(len(runner._http_adapters[None].poolmanager.pools), 1)
+
+        runner = HttpRunner(pool_maxsize=2, share_connections=True)
+        session_a = runner._create_http_session()
+        session_b = runner._create_http_session()
+        self.assertIs(session_a.shared_adapter, session_b.shared_adapter)
+        self.assertEqual(session_a.shared_adapter._pool_maxsize, 2)
+        self.assertIsNot(session_a.cookies, session_b.cookies)
+
+        # connections to overridden hosts are not shared with other testcases
+        session_c = runner._create_http_session({"hosts": {"api.example.com": "127.0.0.1"}})
+        self.assertIsNot(session_c.shared_adapter, session_a.shared_adapter)
+        self.assertEqual(session_c.shared_adapter.resolver.hosts, {"api.example.com": "127.0.0.1"})
+
+        with self.assertRaises(exceptions.ParamsError):
+            HttpRunner(pool_maxsize=0)
+
     def test_html_report(self):
         report_save_dir = os.path.join(os.getcwd(), 'reports', "demo")
         runner = HttpRunner(failfast=True, report_dir=report_save_dir)
@@ -190,6 +475,38 @@ class TestHttpRunner(ApiServerUnittest):
         self.assertGreater(len(os.listdir(report_save_dir)), 0)
         shutil.rmtree(report_save_dir)
 
+    def test_html_report_with_stream_report(self):
+        report_save_dir = os.path.join(os.getcwd(), 'reports', "demo")
+        runner = HttpRunner(save_tests=True, report_dir=report_save_dir, stream_report=True)
+        report_path = runner.run("tests/testsuites/create_users.yml")
+        summary = runner.summary
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["stat"]["teststeps"]["total"], 4)
+
+        # testcase summaries are stringified and loaded from store
+        details = summary["details"]
+        self.assertIsInstance(details, report.ResultStore)
+        self.assertEqual(len(details), 2)
+        self.assertEqual(
+            [testcase_summary["name"] for testcase_summary in details],
+            ["create user 1000 and check result.", "create user 1001 and check result."]
+        )
+        self.assertIn("meta_datas_expanded", details[1]["records"][0])
+        self.assertEqual(len(runner.get_vars_out()), 2)
+
+        with open(report_path) as f:
+            content = f.read()
+        self.assertIn("create user 1001 and check result.", content)
+
+        summary_path = os.path.join(os.getcwd(), "tests", "logs", "create_users.summary.json")
+        with open(summary_path) as f:
+            dumped_summary = json.load(f)
+        self.assertEqual(dumped_summary["stat"], summary["stat"])
+        self.assertEqual(dumped_summary["details"][1], details[1])
+
+        shutil.rmtree(report_save_dir)
+        shutil.rmtree(os.path.join(os.getcwd(), "tests", "logs"))
+
     def test_log_file(self):
         log_file_path = os.path.join(os.getcwd(), 'reports', "test_log_file.log")
         runner = HttpRunner(failfast=True, log_file=log_file_path)
@@ -254,6 +571,63 @@ class TestHttpRunner(ApiServerUnittest):
             "abc"
         )
 
+    def test_html_report_with_lazy_report(self):
+        report_save_dir = os.path.join(os.getcwd(), 'reports', "lazy")
+        runner = HttpRunner(report_dir=report_save_dir, lazy_report=True)
+        report_path = runner.run("tests/testsuites/create_users.yml")
+        self.assertTrue(runner.summary["success"])
+
+        # index page contains aggregates only
+        with open(report_path) as f:
+            content = f.read()
+        self.assertIn("create user 1001 and check result.", content)
+        self.assertNotIn('class="overlay"', content)
+
+        chunks_dir_name = os.path.splitext(os.path.basename(report_path))[0]
+        chunk_name = "{}/testcase_2.js".format(chunks_dir_name)
+        self.assertIn('data-chunk="{}"'.format(chunk_name), content)
+
+        with open(os.path.join(report_save_dir, chunk_name)) as f:
+            chunk = f.read()
+        matched = re.match(r'httprunnerReport.loadChunk\(2, "(.*)"\);$', chunk.strip())
+        records = json.loads(
+            gzip.decompress(base64.b64decode(matched.group(1))).decode("utf-8"))
+        self.assertEqual(
+            records,
+            json.loads(json.dumps(runner.summary["details"][1]["records"], default=str))
+        )
+        self.assertIn("meta_datas_expanded", records[0])
+
+        shutil.rmtree(report_save_dir)
+
+    def test_html_report_template_cache(self):
+        template = report.get_report_template()
+        self.assertIs(report.get_report_template(), template)
+
+        report_save_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_save_dir)
+        template_path = os.path.join(report_save_dir, "custom_template.html")
+        with open(template_path, "w") as f:
+            f.write("v1: {{ stat.testcases.total }}")
+
+        # custom templates share the same cache with default template
+        custom_template = report.get_report_template(template_path)
+        self.assertIs(report.get_report_template(template_path), custom_template)
+        environment = report.get_template_environment()
+        self.assertIs(custom_template.environment, environment)
+        self.assertIs(template.environment, environment)
+
+        # template is reloaded after modified
+        with open(template_path, "w") as f:
+            f.write("v2: {{ stat.testcases.total }}")
+        mtime = os.path.getmtime(template_path) + 1
+        os.utime(template_path, (mtime, mtime))
+
+        runner = HttpRunner(report_template=template_path, report_dir=report_save_dir)
+        report_path = runner.run("tests/testcases/setup.yml")
+        with open(report_path) as f:
+            self.assertEqual(f.read(), "v2: 1")
+
     def test_html_report_repsonse_image(self):
         report_save_dir = os.path.join(os.getcwd(), 'reports', "demo")
         runner = HttpRunner(failfast=True, report_dir=report_save_dir)
@@ -0,0 +1,77 @@
+import time
+import unittest
+
+from httprunner import cache, parser
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_lru_cache(self):
+        lru_cache = cache.LRUCache(maxsize=2)
+        lru_cache.set("a", 1)
+        lru_cache.set("b", 2)
+        self.assertEqual(lru_cache.get("a"), (True, 1))
+
+        # b is least recently used
+        lru_cache.set("c", 3)
+        self.assertEqual(lru_cache.get("b"), (False, None))
+        self.assertEqual(lru_cache.get("a"), (True, 1))
+        self.assertEqual(lru_cache.get("c"), (True, 3))
+        self.assertEqual(
+            lru_cache.stats,
+            {"hits": 3, "misses": 1, "size": 2, "maxsize": 2}
+        )
+
+        lru_cache.clear()
+        self.assertEqual(len(lru_cache), 0)
+
+    def test_lru_cache_ttl(self):
+        lru_cache = cache.LRUCache(maxsize=2, ttl=0.1)
+        lru_cache.set("a", 1)
+        lru_cache.set("b", 2, ttl=10)
+        time.sleep(0.15)
+        self.assertEqual(lru_cache.get("a"), (False, None))
+        self.assertEqual(lru_cache.get("b"), (True, 2))
+
+
+class TestCacheableFunction(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+        @cache.cacheable
+        def get_token(user):
+            self.calls.append(user)
+            return "token_{}_{}".format(user, len(self.calls))
+
+        def get_timestamp(user):
+            self.calls.append(user)
+            return len(self.calls)
+
+        self.functions_mapping = {
+            "get_token": get_token,
+            "get_timestamp": get_timestamp
+        }
+        parser.function_results_cache.clear()
+
+    def test_cacheable_function(self):
+        lazy_string = parser.LazyString(
+            "${get_token($user)}", self.functions_mapping, {"user"})
+        self.assertEqual(lazy_string.to_value({"user": "a"}), "token_a_1")
+        self.assertEqual(lazy_string.to_value({"user": "a"}), "token_a_1")
+        self.assertEqual(lazy_string.to_value({"user": "b"}), "token_b_2")
+        self.assertEqual(self.calls, ["a", "b"])
+        self.assertEqual(parser.function_results_cache.stats["hits"], 1)
+
+    def test_not_cacheable_function(self):
+        lazy_string = parser.LazyString(
+            "${get_timestamp($user)}", self.functions_mapping, {"user"})
+        self.assertEqual(lazy_string.to_value({"user": "a"}), 1)
+        self.assertEqual(lazy_string.to_value({"user": "a"}), 2)
+        self.assertEqual(len(parser.function_results_cache), 0)
+
+        # functions in config are cached
+        lazy_string = parser.LazyString(
+            "${get_timestamp($user)}", self.functions_mapping, {"user"}, cached=True)
+        self.assertEqual(lazy_string.to_value({"user": "a"}), 3)
+        self.assertEqual(lazy_string.to_value({"user": "a"}), 3)
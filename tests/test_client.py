@@ -1,4 +1,7 @@
-from httprunner.client import HttpSession
+from httprunner import exceptions
+from httprunner.client import (HttpSession, PreparedJSON, create_http_adapter,
+                               use_prepared_body)
+from httprunner.connection import dns_cache
 from httprunner.compat import bytes
 from tests.api_server import HTTPBIN_SERVER
 from tests.base import ApiServerUnittest
@@ -84,3 +87,120 @@ class TestHttpClient(ApiServerUnittest):
         self.assertEqual(redirect_request.url, "https://github.com")
         self.assertEqual(redirect_request._cookies["a"], "1")
         self.assertEqual(redirect_request._cookies["b"], "2")
+
+    def test_request_with_record_level(self):
+        url = "{}/api/users/1000".format(self.host)
+        api_client = HttpSession(record_level="summary")
+        api_client.get(url, headers=self.headers)
+        req_resp = api_client.meta_data["data"][0]
+        self.assertEqual(req_resp["request"]["url"], url)
+        self.assertEqual(req_resp["response"]["status_code"], 404)
+        self.assertNotIn("headers", req_resp["response"])
+
+        api_client.record_details()
+        req_resp = api_client.meta_data["data"][0]
+        self.assertIn("headers", req_resp["response"])
+        self.assertIn("json", req_resp["response"])
+
+        api_client = HttpSession(record_level="none")
+        api_client.get(url, headers=self.headers)
+        self.assertEqual(api_client.meta_data["data"], [])
+
+        with self.assertRaises(ValueError):
+            HttpSession(record_level="all")
+
+    def test_request_with_shared_adapter(self):
+        http_adapter = create_http_adapter(pool_maxsize=4)
+        session_a = HttpSession(http_adapter=http_adapter)
+        session_b = HttpSession(http_adapter=http_adapter)
+        self.assertIs(session_a.get_adapter(HTTPBIN_SERVER), http_adapter)
+        self.assertIs(session_b.get_adapter(self.host), http_adapter)
+
+        # connection pool is shared, while cookies are kept in each session
+        session_a.get("{}/cookies/set?a=1".format(HTTPBIN_SERVER))
+        resp = session_b.get("{}/cookies".format(HTTPBIN_SERVER))
+        self.assertEqual(resp.json()["cookies"], {})
+        self.assertEqual(session_a.cookies.get("a"), "1")
+        self.assertEqual(len(http_adapter.poolmanager.pools), 1)
+
+        # shared adapter is not closed with session
+        session_a.close()
+        self.assertEqual(len(http_adapter.poolmanager.pools), 1)
+
+        api_client = HttpSession(pool_connections=2, pool_maxsize=4, keep_alive=False)
+        self.assertEqual(api_client.get_adapter(self.host)._pool_maxsize, 4)
+        resp = api_client.get(self.host)
+        self.assertEqual(resp.request.headers["Connection"], "close")
+
+    def test_request_timing_breakdown(self):
+        api_client = HttpSession()
+        api_client.get("{}/delay/1".format(HTTPBIN_SERVER))
+        stat = api_client.meta_data["stat"]
+        # whole seconds are kept
+        self.assertGreaterEqual(stat["elapsed_ms"], 1000)
+        self.assertGreaterEqual(stat["ttfb_ms"], 1000)
+        self.assertGreater(stat["connect_ms"], 0)
+        self.assertGreaterEqual(stat["dns_ms"], 0)
+        self.assertEqual(stat["tls_ms"], 0)
+        self.assertGreaterEqual(stat["download_ms"], 0)
+        self.assertLessEqual(
+            stat["dns_ms"] + stat["connect_ms"] + stat["ttfb_ms"] + stat["download_ms"],
+            stat["response_time_ms"]
+        )
+
+        # phases of redirection hops are summed up
+        api_client.get("{}/redirect/2".format(HTTPBIN_SERVER))
+        stat = api_client.meta_data["stat"]
+        self.assertGreater(stat["ttfb_ms"], 0)
+        self.assertLessEqual(stat["ttfb_ms"], stat["response_time_ms"])
+
+        # response body is not downloaded when streamed
+        api_client.get("{}/stream-bytes/1024".format(HTTPBIN_SERVER), stream=True)
+        self.assertEqual(api_client.meta_data["stat"]["download_ms"], "N/A")
+        self.assertGreater(api_client.meta_data["stat"]["ttfb_ms"], 0)
+
+    def test_request_with_dns_options(self):
+        dns_cache.clear()
+        api_client = HttpSession(
+            dns_cache=True,
+            hosts={"HTTPBIN.example.com": "127.0.0.1"},
+            keep_alive=False
+        )
+        url = "http://httpbin.example.com:3458/get"
+        resp = api_client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["headers"]["Host"], "httpbin.example.com:3458")
+
+        # resolved addresses are cached in process
+        api_client.get(url)
+        self.assertEqual(dns_cache.stats["misses"], 1)
+        self.assertEqual(dns_cache.stats["hits"], 1)
+
+        with self.assertRaises(exceptions.ParamsError):
+            HttpSession(dns_cache="60")
+
+        with self.assertRaises(exceptions.ParamsError):
+            HttpSession(hosts=["api.example.com"])
+
+    def test_request_with_prepared_json_body(self):
+        json_body = PreparedJSON({"name": "user1", "password": "123456"})
+        request_kwargs = {"json": json_body, "headers": self.headers}
+        prepared_kwargs = use_prepared_body(request_kwargs, self.api_client.headers)
+        self.assertIs(request_kwargs["json"], json_body)
+        self.assertNotIn("json", prepared_kwargs)
+        self.assertEqual(prepared_kwargs["headers"]["Content-Type"], "application/json")
+
+        url = "{}/api/users/1000".format(self.host)
+        resp = self.api_client.post(url, **prepared_kwargs)
+        self.assertEqual(201, resp.status_code)
+        # request body is the same as serialized by requests
+        resp = self.api_client.post(url, json=dict(json_body), headers=self.headers)
+        self.assertEqual(resp.request.body, json_body.serialized)
+
+        # content type specified in session headers is kept
+        prepared_kwargs = use_prepared_body({"json": json_body}, {"content-type": "text/plain"})
+        self.assertNotIn("headers", prepared_kwargs)
+
+        # data takes precedence over json
+        request_kwargs = {"json": json_body, "data": "abc"}
+        self.assertIs(use_prepared_body(request_kwargs), request_kwargs)
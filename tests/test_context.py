@@ -43,6 +43,34 @@ class TestContext(ApiServerUnittest):
         self.assertEqual(len(variables_mapping["authorization"]), 32)
         self.assertEqual(variables_mapping["data"], 'user1')
 
+    def test_init_test_variables_scopes(self):
+        self.context.update_session_variables({"TOKEN": "session_token"})
+        variables = {
+            "TOKEN": "step_token",
+            "authorization": "$SECRET_KEY-$TOKEN"
+        }
+        variables = parser.prepare_lazy_data(variables, {}, set(variables.keys()) | {"SECRET_KEY"})
+        self.context.init_test_variables(variables)
+        variables_mapping = self.context.test_variables_mapping
+
+        # extracted variable > teststep variable
+        self.assertEqual(variables_mapping["TOKEN"], "session_token")
+        self.assertEqual(variables_mapping["authorization"], "DebugTalk-session_token")
+
+        # test variables are only valid in current test
+        self.context.update_test_variables("authorization", "abc")
+        self.assertEqual(variables_mapping["authorization"], "abc")
+        self.context.init_test_variables(variables)
+        self.assertEqual(
+            self.context.test_variables_mapping["authorization"],
+            "DebugTalk-session_token"
+        )
+
+        # session variables override test variables
+        self.context.update_test_variables("TOKEN", "abc")
+        self.context.update_session_variables({"TOKEN": "new_token"})
+        self.assertEqual(self.context.test_variables_mapping["TOKEN"], "new_token")
+
     def test_update_seesion_variables(self):
         self.context.update_session_variables({"TOKEN": "debugtalk"})
         self.assertEqual(
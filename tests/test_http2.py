@@ -0,0 +1,92 @@
+import os
+import unittest
+
+from httprunner import loader, parser, runner
+from httprunner.client import HttpSession
+from requests.exceptions import ConnectionError
+from tests.api_server import HTTPBIN_SERVER
+from tests.base import ApiServerUnittest
+
+try:
+    from httprunner.http2 import HTTP2Adapter
+except (ImportError, SyntaxError):
+    HTTP2Adapter = None
+
+
+@unittest.skipIf(HTTP2Adapter is None, "httpx is not installed")
+class TestHTTP2Adapter(ApiServerUnittest):
+
+    def setUp(self):
+        self.reset_all()
+
+    def reset_all(self):
+        url = "%s/api/reset-all" % self.host
+        headers = self.get_authenticated_headers()
+        return self.api_client.get(url, headers=headers)
+
+    def test_http2_session_request(self):
+        session = HttpSession(http2=True)
+        self.assertIsInstance(session.get_adapter(self.host), HTTP2Adapter)
+
+        resp = session.request(
+            "POST",
+            "{}/api/get-token".format(self.host),
+            name="get token",
+            headers={
+                "user_agent": "iOS/10.3",
+                "device_sn": "HZfFBh6tU59EdXJ",
+                "os_platform": "ios",
+                "app_version": "2.8.6"
+            },
+            json={"sign": "5188962c489d1a35effa99e9346dd5efd4fdabad"}
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.json()["token"]), 16)
+        self.assertEqual(resp.headers["content-type"], "application/json")
+
+        meta_data = session.meta_data
+        self.assertEqual(meta_data["name"], "get token")
+        self.assertEqual(meta_data["data"][0]["request"]["method"], "POST")
+        self.assertIn(b"sign", meta_data["data"][0]["request"]["body"])
+        self.assertEqual(meta_data["data"][0]["response"]["status_code"], 200)
+        self.assertIn("token", meta_data["data"][0]["response"]["json"])
+        self.assertGreater(meta_data["stat"]["content_size"], 0)
+
+    def test_http2_session_redirect_and_cookies(self):
+        http_adapter = HTTP2Adapter()
+        session_a = HttpSession(http_adapter=http_adapter)
+        session_b = HttpSession(http_adapter=http_adapter)
+
+        resp = session_a.get("{}/cookies/set?a=1".format(HTTPBIN_SERVER))
+        self.assertEqual(len(resp.history), 1)
+        self.assertEqual(resp.json()["cookies"], {"a": "1"})
+        self.assertEqual(len(session_a.meta_data["data"]), 2)
+
+        # cookies are kept in each session
+        resp = session_b.get("{}/cookies".format(HTTPBIN_SERVER))
+        self.assertEqual(resp.json()["cookies"], {})
+
+        resp = session_a.get("{}/stream-bytes/1024".format(HTTPBIN_SERVER), stream=True)
+        self.assertEqual(len(b"".join(resp.iter_content(100))), 1024)
+        http_adapter.close()
+
+    def test_http2_session_connection_error(self):
+        session = HttpSession(http2=True)
+        # same as HttpSession, connection error is raised when recording response
+        with self.assertRaises(ConnectionError):
+            session.request("GET", "http://127.0.0.1:5999/api/users")
+
+    def test_run_testcase_with_http2(self):
+        testcase_file_path = os.path.join(
+            os.getcwd(), 'tests/data/demo_testcase_hardcode.yml')
+        tests_mapping = loader.load_tests(testcase_file_path)
+        parsed_testcase = parser.parse_tests(tests_mapping)[0]
+
+        test_runner = runner.Runner(parsed_testcase["config"], HttpSession(http2=True))
+        for test_dict in parsed_testcase["teststeps"]:
+            test_runner.run_test(test_dict)
+
+        self.assertEqual(
+            test_runner.meta_datas["validators"][0]["check_result"],
+            "pass"
+        )
@@ -1,8 +1,9 @@
 
 import os
+import shutil
 import unittest
 
-from httprunner import exceptions, loader, validator
+from httprunner import cache, exceptions, loader, parser, validator
 
 
 class TestFileLoader(unittest.TestCase):
@@ -453,6 +454,50 @@ class TestSuiteLoader(unittest.TestCase):
         testcase_list_2 = tests_mapping["testcases"]
         self.assertEqual(len(testcase_list_1), len(testcase_list_2))
 
+    def test_load_tests_with_cache(self):
+        path = os.path.join(
+            os.getcwd(), 'tests/data/demo_testcase_layer.yml')
+        cache_dir = os.path.join(os.getcwd(), "tests", cache.CACHE_DIR_NAME)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+
+        tests_mapping = loader.load_tests(path, cache=True)
+        testcase = tests_mapping["testcases"][0]
+        self.assertNotIn("parsed_testcases", testcase)
+        self.assertIn(path, testcase["cache"]["files"])
+        parsed_testcases = parser.parse_tests(tests_mapping)
+
+        # load parsed testcases from cache
+        tests_mapping = loader.load_tests(path, cache=True)
+        testcase = tests_mapping["testcases"][0]
+        self.assertEqual(testcase["type"], "testcase")
+        self.assertEqual(
+            parser.parse_tests(tests_mapping)[0]["config"]["name"],
+            parsed_testcases[0]["config"]["name"]
+        )
+        self.assertEqual(
+            len(testcase["parsed_testcases"][0]["teststeps"]),
+            len(parsed_testcases[0]["teststeps"])
+        )
+
+        # cache is invalid if test file changed
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+        self.addCleanup(os.utime, path, (stat.st_atime, stat.st_mtime))
+        tests_mapping = loader.load_tests(path, cache=True)
+        self.assertNotIn("parsed_testcases", tests_mapping["testcases"][0])
+
+    def test_load_tests_folder_path_concurrently(self):
+        path = os.path.join(os.getcwd(), 'tests')
+        tests_mapping = loader.load_tests(path)
+        tests_mapping_concurrently = loader.load_tests(path, workers=4)
+
+        for test_type in ["testcases", "testsuites", "apis"]:
+            self.assertEqual(
+                [test["path"] for test in tests_mapping[test_type]],
+                [test["path"] for test in tests_mapping_concurrently[test_type]]
+            )
+
     def test_load_tests_path_not_exist(self):
         # absolute folder path
         path = os.path.join(os.getcwd(), 'tests/data_not_exist')
@@ -464,6 +509,13 @@ class TestSuiteLoader(unittest.TestCase):
         with self.assertRaises(exceptions.FileNotFound):
             loader.load_tests(path)
 
+    def test_load_api_folder_concurrently(self):
+        path = os.path.join(os.getcwd(), "tests", "api")
+        self.assertEqual(
+            loader.load_api_folder(path, workers=4),
+            loader.load_api_folder(path)
+        )
+
     def test_load_api_folder(self):
         path = os.path.join(os.getcwd(), "tests", "api")
         api_definition_mapping = loader.load_api_folder(path)
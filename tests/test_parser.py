@@ -1,9 +1,12 @@
+import json
 import os
+import pickle
 import re
+import threading
 import time
 import unittest
 
-from httprunner import exceptions, loader, parser
+from httprunner import cache, client, exceptions, loader, parser, response
 from tests.debugtalk import gen_random_string, sum_two
 
 
@@ -442,6 +445,73 @@ class TestParserBasic(unittest.TestCase):
         self.assertEqual(var._string, "ABC{}DEF{}")
         self.assertEqual(var.to_value(variables_mapping), "ABC97DEF4")
 
+    def test_lazy_string_render_plans(self):
+        variables_mapping = {
+            "var_1": "abc",
+            "var_3": 123
+        }
+        check_variables_set = {"var_1", "var_3", "var_x"}
+        functions_mapping = {
+            "sum_two": sum_two
+        }
+
+        var = parser.LazyString("ABC$$var_1{}", functions_mapping, check_variables_set)
+        self.assertEqual(var.to_value(variables_mapping), "ABC$var_1{}")
+
+        var = parser.LazyString("$var_3", functions_mapping, check_variables_set)
+        self.assertEqual(var.to_value(variables_mapping), 123)
+
+        var = parser.LazyString("${sum_two($var_3, 1)}", functions_mapping, check_variables_set)
+        self.assertEqual(var.to_value(variables_mapping), 124)
+
+        var = parser.LazyString("/$var_1/${sum_two($var_3, 1)}", functions_mapping, check_variables_set)
+        self.assertEqual(var.to_value(variables_mapping), "/abc/124")
+
+        for raw_string in ["$var_x", "A$var_1$var_x", "A${sum_two($var_3, 1)}$var_x"]:
+            var = parser.LazyString(raw_string, functions_mapping, check_variables_set)
+            with self.assertRaises(exceptions.VariableNotFound):
+                var.to_value(variables_mapping)
+
+        # compiled renderer is rebuilt after unpickling
+        var = pickle.loads(pickle.dumps(var))
+        self.assertEqual(var.to_value({"var_3": 1, "var_x": "X"}), "A2X")
+
+    def test_lazy_string_cacheable_function_concurrently(self):
+        lock = threading.Lock()
+        both_called = threading.Event()
+        calls = []
+
+        @cache.cacheable
+        def echo(x):
+            # both calls are in progress before any result is cached
+            with lock:
+                calls.append(x)
+                if len(calls) == 2:
+                    both_called.set()
+            both_called.wait(5)
+            return "echo_{}".format(x)
+
+        parser.function_results_cache.clear()
+        self.addCleanup(parser.function_results_cache.clear)
+        lazy_string = parser.LazyString("${echo($x)}", {"echo": echo}, {"x"})
+
+        results = {}
+
+        def render(x):
+            results[x] = lazy_string.to_value({"x": x})
+
+        threads = [threading.Thread(target=render, args=(x,)) for x in ["a", "b"]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {"a": "echo_a", "b": "echo_b"})
+        # cached results are kept under their own arguments
+        self.assertEqual(lazy_string.to_value({"x": "a"}), "echo_a")
+        self.assertEqual(lazy_string.to_value({"x": "b"}), "echo_b")
+        self.assertEqual(sorted(calls), ["a", "b"])
+
     def test_parse_variable(self):
         """ variable format ${var} and $var
         """
@@ -674,6 +744,86 @@ class TestParserBasic(unittest.TestCase):
         with self.assertRaises(exceptions.VariableNotFound):
             parser.parse_variables_mapping(prepared_variables)
 
+    def test_parse_variables_mapping_circular_reference(self):
+        variables = {
+            "varA": "$varB",
+            "varB": "123$varC",
+            "varC": "${sum_two($varA, 1)}"
+        }
+        functions = {
+            "sum_two": sum_two
+        }
+        prepared_variables = parser.prepare_lazy_data(variables, functions, variables.keys())
+        with self.assertRaises(exceptions.VariableNotFound) as cm:
+            parser.parse_variables_mapping(prepared_variables)
+
+        self.assertIn("varA -> varB -> varC -> varA", str(cm.exception))
+
+    def test_get_variables_resolution_order(self):
+        variables = {
+            "varA": "123$varB",
+            "varB": "456$varC",
+            "varC": "${sum_two($a, $b)}",
+            "a": 1,
+            "b": 2
+        }
+        functions = {
+            "sum_two": sum_two
+        }
+        prepared_variables = parser.prepare_lazy_data(variables, functions, variables.keys())
+        self.assertEqual(
+            parser.get_variables_resolution_order(prepared_variables),
+            ["a", "b", "varC", "varB", "varA"]
+        )
+
+    def test_variables_resolution_computed_once(self):
+        variables = {
+            "varA": "123$varB",
+            "varB": "456$varC",
+            "varC": "${sum_two($a, $b)}",
+            "a": 1,
+            "b": 2
+        }
+        functions = {
+            "sum_two": sum_two
+        }
+        prepared_variables = parser.prepare_lazy_data(variables, functions, variables.keys())
+        resolution = parser.VariablesResolution()
+        resolution_order = resolution.get_order(frozenset(), prepared_variables)
+        self.assertEqual(resolution_order, ["a", "b", "varC", "varB", "varA"])
+
+        # cached order is reused without resolving references again
+        prepared_variables.pop("a")
+        self.assertIs(
+            resolution.get_order(frozenset(), prepared_variables),
+            resolution_order
+        )
+
+        # shadowed variable names are resolved separately
+        self.assertEqual(
+            resolution.get_order(frozenset(["a"]), prepared_variables, {"a": 3}),
+            ["b", "varC", "varB", "varA"]
+        )
+        self.assertEqual(len(resolution.orders), 2)
+
+    def test_parse_variables_mapping_with_resolution_order(self):
+        variables = {
+            "varA": "123$varB",
+            "varB": "456$varC",
+            "varC": "${sum_two($a, $b)}",
+            "a": 1,
+            "b": 2
+        }
+        functions = {
+            "sum_two": sum_two
+        }
+        prepared_variables = parser.prepare_lazy_data(variables, functions, variables.keys())
+        parsed_variables = parser.parse_variables_mapping(
+            prepared_variables,
+            resolution_order=["a", "b", "varC", "varB", "varA"]
+        )
+        self.assertEqual(parsed_variables["varA"], "1234563")
+
     def test_parse_variables_mapping_not_found(self):
         variables = {
             "varA": "123$varB",
@@ -905,6 +1055,88 @@ class TestParser(unittest.TestCase):
         self.assertEqual(test_dict1["variables"]["PROJECT_KEY"].raw_string, "${ENV(PROJECT_KEY)}")
         self.assertIsInstance(parsed_testcases[0]["config"]["name"], parser.LazyString)
 
+    def test_parse_tests_compile_extractors(self):
+        tests_mapping = {
+            "testcases": [
+                {
+                    "config": {"name": "compile extractors"},
+                    "teststeps": [
+                        {
+                            "name": "get token",
+                            "variables": {"expected_status_code": 200},
+                            "request": {"url": "/api/get-token", "method": "POST"},
+                            "extract": [
+                                {"token": "content.token"},
+                                {"session_id": "LB(.*)RB"}
+                            ],
+                            "validate": [
+                                {"eq": ["status_code", "$expected_status_code"]},
+                                {"eq": ["$token", "abc"]}
+                            ]
+                        }
+                    ]
+                }
+            ]
+        }
+        parsed_testcases = parser.parse_tests(tests_mapping)
+        test_dict = parsed_testcases[0]["teststeps"][0]
+
+        token_extractor = test_dict["extract"][0]["token"]
+        self.assertIsInstance(token_extractor, response.Extractor)
+        self.assertEqual(token_extractor.sub_keys, ["token"])
+        self.assertIsNotNone(test_dict["extract"][1]["session_id"].regex)
+
+        check_item, expect_item = test_dict["validate"][0].get_args()
+        self.assertIsInstance(check_item, response.Extractor)
+        self.assertEqual(check_item.top_query, "status_code")
+        self.assertIsInstance(expect_item, parser.LazyString)
+
+        # variable reference is not compiled
+        check_item, _ = test_dict["validate"][1].get_args()
+        self.assertIsInstance(check_item, parser.LazyString)
+
+    def test_parse_tests_prepare_static_json_body(self):
+        def build_teststep(json_body, **kwargs):
+            teststep = {
+                "name": "create user",
+                "variables": {"uid": 1000},
+                "request": {"url": "/api/users", "method": "POST", "json": json_body}
+            }
+            teststep.update(kwargs)
+            return teststep
+
+        tests_mapping = {
+            "project_mapping": {
+                "functions": {"modify_request_json": lambda request, os_platform: None}
+            },
+            "testcases": [
+                {
+                    "config": {"name": "static json body"},
+                    "teststeps": [
+                        build_teststep({"name": "user1", "tags": ["a", 1, None], "$$": 1.5}),
+                        build_teststep({"name": "user1", "uid": "$uid"}),
+                        build_teststep(
+                            {"name": "user1"},
+                            setup_hooks=["${modify_request_json($request, android)}"]
+                        ),
+                        build_teststep(["user1"])
+                    ]
+                }
+            ]
+        }
+        teststeps = parser.parse_tests(tests_mapping)[0]["teststeps"]
+
+        json_body = teststeps[0]["request"]["json"]
+        self.assertIsInstance(json_body, client.PreparedJSON)
+        self.assertEqual(json_body, {"name": "user1", "tags": ["a", 1, None], "$": 1.5})
+        self.assertEqual(json.loads(json_body.serialized.decode("utf-8")), json_body)
+        # static json body is not evaluated again
+        self.assertIs(parser.parse_lazy_data(teststeps[0]["request"], {})["json"], json_body)
+
+        # json body with variables, or modified by hooks
+        for teststep in teststeps[1:]:
+            self.assertNotIsInstance(teststep["request"]["json"], client.PreparedJSON)
+
     def test_parse_tests_override_variables(self):
         tests_mapping = {
             'testcases': [
@@ -1,5 +1,7 @@
+import unittest
+
 import requests
-from httprunner import built_in, exceptions, loader, response
+from httprunner import built_in, client, exceptions, loader, response
 from httprunner.compat import basestring, bytes
 from tests.api_server import HTTPBIN_SERVER
 from tests.base import ApiServerUnittest
@@ -21,6 +23,21 @@ class TestResponse(ApiServerUnittest):
         self.assertIn('Content-Length', resp_obj.headers)
         self.assertIn('success', resp_obj.json)
 
+    def test_parse_response_object_json_decoded_once(self):
+        api_client = client.HttpSession()
+        resp = api_client.get("http://127.0.0.1:5000/api/users")
+        recorded_json = api_client.meta_data["data"][0]["response"]["json"]
+
+        resp_obj = response.ResponseObject(resp)
+        self.assertIs(resp_obj.json, recorded_json)
+        self.assertIs(resp_obj.extract_field("content"), recorded_json)
+
+        resp = requests.get("http://127.0.0.1:5000/")
+        resp_obj = response.ResponseObject(resp)
+        with self.assertRaises(ValueError):
+            client.get_response_json(resp)
+        self.assertEqual(resp_obj.extract_field("content"), resp.text)
+
     def test_parse_response_object_content(self):
         url = "http://127.0.0.1:5000/"
         resp = requests.get(url)
@@ -355,6 +372,68 @@ class TestResponse(ApiServerUnittest):
             "abcRB78"
         )
 
+    def test_extract_response_with_compiled_extractor(self):
+        resp = requests.post(
+            url="{}/anything".format(HTTPBIN_SERVER),
+            json={"person": {"cities": ["Guangzhou", "Shenzhen"]}}
+        )
+        resp_obj = response.ResponseObject(resp)
+
+        extractor = response.Extractor("content.json.person.cities.1")
+        self.assertEqual(extractor.top_query, "content")
+        self.assertEqual(extractor.sub_keys, ["json", "person", "cities", "1"])
+        self.assertEqual(extractor, "content.json.person.cities.1")
+        self.assertEqual(resp_obj.extract_field(extractor), "Shenzhen")
+
+        extractor = response.Extractor("headers.Content-Type")
+        self.assertIsNone(extractor.regex)
+        self.assertEqual(resp_obj.extract_field(extractor), "application/json")
+
+        extractor = response.Extractor(r'"url": "(.*)"')
+        self.assertIsNotNone(extractor.regex)
+        self.assertEqual(
+            resp_obj.extract_field(extractor),
+            "{}/anything".format(HTTPBIN_SERVER)
+        )
+
+        # field in other types is not compiled
+        self.assertEqual(response.compile_extractor({"a": 1}), {"a": 1})
+
+    @unittest.skipIf(response.jmespath is None, "jmespath is not installed")
+    def test_extract_response_with_jmespath(self):
+        resp = requests.post(
+            url="{}/anything".format(HTTPBIN_SERVER),
+            json={
+                "users": [
+                    {"name": "Leo", "age": 29, "cities": ["Guangzhou", "Shenzhen"]},
+                    {"name": "Lucy", "age": 18, "cities": ["Beijing"]}
+                ]
+            }
+        )
+        resp_obj = response.ResponseObject(resp)
+
+        extract_binds_dict = resp_obj.extract_response([
+            {"adult_names": "jmespath: json.users[?age > `20`].name"},
+            {"all_cities": "jmespath: json.users[*].cities[]"},
+            {"users_count": "jmespath:length(json.users)"},
+            {"not_exist": "jmespath: json.admins[0]"}
+        ])
+        self.assertEqual(extract_binds_dict["adult_names"], ["Leo"])
+        self.assertEqual(
+            extract_binds_dict["all_cities"],
+            ["Guangzhou", "Shenzhen", "Beijing"]
+        )
+        self.assertEqual(extract_binds_dict["users_count"], 2)
+        self.assertIsNone(extract_binds_dict["not_exist"])
+
+        with self.assertRaises(exceptions.ParamsError):
+            response.Extractor("jmespath: json.users[?")
+
+        resp = requests.get("{}/html".format(HTTPBIN_SERVER))
+        resp_obj = response.ResponseObject(resp)
+        with self.assertRaises(exceptions.ExtractFailure):
+            resp_obj.extract_field("jmespath: json.users")
+
     def test_extract_text_response_exception(self):
         resp = requests.post(
             url="{}/anything".format(HTTPBIN_SERVER),
@@ -0,0 +1,100 @@
+import io
+import unittest
+
+import requests
+from httprunner import exceptions, parser, runner, stream
+from tests.base import ApiServerUnittest
+
+
+def build_response(body):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.raw = io.BytesIO(body)
+    return resp
+
+
+@unittest.skipIf(stream.ijson is None, "ijson is not installed")
+class TestStreamExtraction(ApiServerUnittest):
+
+    def test_extract_json_fields(self):
+        body = b'{"items": [{"id": 1, "name": "ab"}, {"id": 2.5, "tags": [1, [2, 3]]}], ' \
+            b'"name": "xyz", "total": 2}'
+        queries = [
+            "items.0.id", "items.1", "items.1.tags.1.0",
+            "items.0.name.1", "name.2", "name.x", "items.5.id", "total"
+        ]
+        resolved = stream.extract_json_fields(build_response(body), queries, chunk_size=4)
+        self.assertEqual(
+            resolved,
+            {
+                "items.0.id": 1,
+                "items.1": {"id": 2.5, "tags": [1, [2, 3]]},
+                "items.1.tags.1.0": 2,
+                "items.0.name.1": "b",
+                "name.2": "z",
+                "total": 2
+            }
+        )
+
+        with self.assertRaises(exceptions.ExtractFailure):
+            stream.extract_json_fields(build_response(b"<html></html>"), ["items"])
+
+    def test_get_body_queries(self):
+        from httprunner.response import text_extractor_regexp_compile
+        self.assertEqual(
+            stream.get_body_queries(
+                ["status_code", "content.token", "json.token", "$token", "text.0"],
+                text_extractor_regexp_compile
+            ),
+            ["token", "0"]
+        )
+        self.assertIsNone(
+            stream.get_body_queries(["content"], text_extractor_regexp_compile))
+        self.assertIsNone(
+            stream.get_body_queries([r"LB(.*)RB"], text_extractor_regexp_compile))
+
+    def test_run_test_with_stream(self):
+        teststep = {
+            "name": "get token with streamed response",
+            "request": {
+                "url": "{}/api/get-token".format(self.host),
+                "method": "POST",
+                "headers": {
+                    "user_agent": "iOS/10.3",
+                    "device_sn": "HZfFBh6tU59EdXJ",
+                    "os_platform": "ios",
+                    "app_version": "2.8.6"
+                },
+                "json": {"sign": "5188962c489d1a35effa99e9346dd5efd4fdabad"},
+                "stream": True
+            },
+            "extract": [
+                {"token": "content.token"}
+            ],
+            "validate": [
+                {"eq": ["status_code", 200]},
+                {"eq": ["content.success", True]}
+            ]
+        }
+        tests_mapping = {
+            "testcases": [
+                {
+                    "config": {"name": "streamed response"},
+                    "teststeps": [teststep]
+                }
+            ]
+        }
+        parsed_testcase = parser.parse_tests(tests_mapping)[0]
+        test_runner = runner.Runner(parsed_testcase["config"])
+        test_runner.run_test(parsed_testcase["teststeps"][0])
+
+        self.assertEqual(len(test_runner.export_variables(["token"])["token"]), 16)
+        meta_data = test_runner.meta_datas
+        self.assertEqual(
+            meta_data["data"][0]["response"]["text"],
+            "streamed response body (OMITTED)"
+        )
+        self.assertEqual(
+            [result["check_result"] for result in meta_data["validators"]],
+            ["pass", "pass"]
+        )